@@ -0,0 +1,105 @@
+# Copyright 2023 The chainmetareader Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import logging
+import queue
+import random
+from logging.handlers import QueueHandler, QueueListener
+from time import perf_counter
+
+from chainmeta_reader import metrics
+
+access_logger = logging.getLogger("chainmeta.access")
+
+
+class AccessLogMiddleware:
+    """ASGI middleware logging one line per HTTP request to ``access_logger``.
+
+    The method, path, status, latency and response size are recorded as the
+    response is sent, without buffering or copying it, so streaming responses
+    are streamed as is. Only a ``sample_rate`` fraction of the successful
+    requests is logged, requests failing with a 4xx or 5xx status always are.
+    With ``log_error_bodies``, the first ``max_body_bytes`` of the body of
+    failed requests are logged too.
+    """
+
+    def __init__(
+        self,
+        app,
+        *,
+        sample_rate: float = 1.0,
+        log_error_bodies: bool = False,
+        max_body_bytes: int = 1024,
+    ):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.log_error_bodies = log_error_bodies
+        self.max_body_bytes = max_body_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = perf_counter()
+        status = 500
+        size = 0
+        error_body = bytearray()
+
+        async def _send(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                body = message.get("body", b"")
+                size += len(body)
+                if self.log_error_bodies and status >= 400:
+                    error_body.extend(body[: self.max_body_bytes - len(error_body)])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            latency = perf_counter() - start
+            if metrics.is_enabled():
+                metrics.observe("http_request", latency)
+                metrics.count(f"http_responses_{status // 100}xx")
+            if status >= 400 or random.random() < self.sample_rate:
+                self._log(scope, status, latency, size, error_body)
+
+    def _log(self, scope, status: int, latency: float, size: int, body: bytearray):
+        if not access_logger.isEnabledFor(logging.INFO):
+            return
+        args = (scope["method"], scope["path"], status, latency * 1000, size)
+        if body:
+            access_logger.info(
+                "%s %s %d %.1fms %dB %r", *args, body.decode(errors="replace")
+            )
+        else:
+            access_logger.info("%s %s %d %.1fms %dB", *args)
+
+
+def start_queued_logging(*handlers: logging.Handler) -> QueueListener:
+    """Send the access log records to ``handlers`` from a background thread.
+
+    Requests only put the records in a queue, formatting and writing them is
+    done by the returned listener, which must be stopped on shutdown to flush
+    the queue.
+    """
+
+    records: queue.Queue = queue.Queue(-1)
+    access_logger.addHandler(QueueHandler(records))
+    access_logger.setLevel(logging.INFO)
+    access_logger.propagate = False
+    listener = QueueListener(records, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
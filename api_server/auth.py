@@ -0,0 +1,145 @@
+# Copyright 2023 The chainmetareader Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import threading
+from time import monotonic
+from typing import Dict, Optional, Tuple
+
+from chainmeta_reader import db
+from chainmeta_reader.logger import logger
+
+
+class TokenVerifier:
+    """Verify API tokens against the api_token table, caching the answers.
+
+    All valid tokens are loaded at once and reloaded every
+    ``refresh_interval`` seconds, so that the tokens in use are verified
+    without querying the database. Tokens unknown to the last reload are
+    looked up individually, valid ones are cached for ``ttl`` seconds and
+    invalid ones for ``negative_ttl`` seconds. A token revoked by setting its
+    status is rejected after the next reload at the latest.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl: float = 300.0,
+        negative_ttl: float = 30.0,
+        refresh_interval: float = 300.0,
+        max_negative: int = 100_000,
+    ):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.refresh_interval = refresh_interval
+        self.max_negative = max_negative
+        self._lock = threading.Lock()
+        self._refreshed_at: Optional[float] = None
+        self._valid: Dict[str, Tuple[str, float]] = {}
+        self._invalid: Dict[str, float] = {}
+
+    def refresh(self):
+        """Reload all valid tokens from the database."""
+
+        now = monotonic()
+        self._replace(db.find_valid_tokens(), now)
+
+    async def refresh_async(self):
+        """Like refresh(), with the asynchronous engine."""
+
+        now = monotonic()
+        self._replace(await db.find_valid_tokens_async(), now)
+
+    def _replace(self, tokens: Dict[str, str], now: float):
+        expires_at = now + max(self.ttl, self.refresh_interval)
+        with self._lock:
+            self._valid = {t: (b, expires_at) for t, b in tokens.items()}
+            self._invalid = {}
+            self._refreshed_at = now
+        logger.debug(f"Loaded {len(tokens)} valid API tokens")
+
+    def _claim_refresh(self, now: float) -> bool:
+        """Return whether the caller is due to refresh the tokens. A single
+        caller gets True, concurrent callers keep using the cache during the
+        refresh, and a failed refresh is only retried after
+        ``refresh_interval`` seconds."""
+
+        with self._lock:
+            refreshed_at = self._refreshed_at
+            due = refreshed_at is None or now - refreshed_at > self.refresh_interval
+            if due:
+                self._refreshed_at = now
+            return due
+
+    def _cached(self, token: str, now: float) -> Optional[bool]:
+        with self._lock:
+            valid = self._valid.get(token)
+            if valid is not None and valid[1] > now:
+                return True
+            invalid = self._invalid.get(token)
+            if invalid is not None and invalid > now:
+                return False
+            return None
+
+    def _remember(self, token: str, api_token: dict, now: float) -> bool:
+        with self._lock:
+            if api_token:
+                self._valid[token] = (api_token["belongs_to"], now + self.ttl)
+                return True
+            self._valid.pop(token, None)
+            if len(self._invalid) >= self.max_negative:
+                self._invalid.clear()
+            self._invalid[token] = now + self.negative_ttl
+            return False
+
+    def verify(self, token: str) -> bool:
+        now = monotonic()
+        if self._claim_refresh(now):
+            try:
+                self.refresh()
+            except Exception as e:
+                # Tokens are still looked up individually until the next try
+                logger.error(f"Failed to refresh API tokens: {e}")
+
+        cached = self._cached(token, now)
+        if cached is not None:
+            return cached
+        return self._remember(token, db.find_valid_token(token), now)
+
+    async def verify_async(self, token: str) -> bool:
+        """Like verify(), with the asynchronous engine."""
+
+        now = monotonic()
+        if self._claim_refresh(now):
+            try:
+                await self.refresh_async()
+            except Exception as e:
+                logger.error(f"Failed to refresh API tokens: {e}")
+
+        cached = self._cached(token, now)
+        if cached is not None:
+            return cached
+        return self._remember(token, await db.find_valid_token_async(token), now)
+
+    def invalidate(self, token: Optional[str] = None):
+        """Forget the cached answer for ``token``, or for all tokens."""
+
+        with self._lock:
+            if token is None:
+                self._valid.clear()
+                self._invalid.clear()
+                self._refreshed_at = None
+            else:
+                self._valid.pop(token, None)
+                self._invalid.pop(token, None)
+
+
+token_verifier = TokenVerifier()
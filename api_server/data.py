@@ -0,0 +1,174 @@
+# Copyright 2023 The chainmetareader Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import asyncio
+import os
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from functools import partial
+from typing import AsyncIterator, Dict, List, Optional, Union
+
+from api_server.auth import token_verifier
+from chainmeta_reader import db, metrics
+from chainmeta_reader.db import SearchKey
+from chainmeta_reader.index import LabelIndex, LabelLookup
+from chainmeta_reader.logger import logger
+from chainmeta_reader.metadata import ChainmetaItem
+from chainmeta_reader.utils import chunked
+
+"""This module provides the data access of the API endpoints.
+
+Queries never block the event loop: they use the asynchronous engine once
+db.init_async_db() has been called, and otherwise run in a thread pool of
+CHAINMETA_API_DB_THREADS threads, which bounds the number of concurrent
+queries.
+
+Searches by address are served from the label index once it has been loaded
+with refresh_label_index(), or from a snapshot set with set_label_index().
+Addresses missing from the index, which may have been labelled since it was
+built, and other searches query the database.
+"""
+
+_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("CHAINMETA_API_DB_THREADS", "8")),
+    thread_name_prefix="chainmeta-db",
+)
+
+
+async def _run_blocking(fn, *args, **kw):
+    return await asyncio.get_running_loop().run_in_executor(
+        _executor, partial(fn, *args, **kw)
+    )
+
+
+_label_index: Optional[LabelLookup] = None
+
+
+async def refresh_label_index():
+    """Build a new label index from the database, and replace the current one
+    once it is built."""
+
+    global _label_index
+    if db.is_async_db_initialized():
+        index = await LabelIndex.from_database_async()
+    else:
+        index = await _run_blocking(LabelIndex.from_database)
+    _label_index = index
+
+
+async def refresh_label_index_periodically(interval: float):
+    """Refresh the label index every ``interval`` seconds, until cancelled. The
+    current index is kept when a refresh fails."""
+
+    while True:
+        try:
+            await refresh_label_index()
+        except Exception:
+            logger.exception("Failed to refresh the label index")
+        await asyncio.sleep(interval)
+
+
+def set_label_index(index: Optional[LabelLookup]):
+    global _label_index
+    _label_index = index
+
+
+def _search_index(filter: dict) -> Optional[List[ChainmetaItem]]:
+    index = _label_index
+    items = index.search(filter) if index is not None else None
+    if items is not None:
+        metrics.count("label_index_hits" if items else "label_index_misses")
+    return items or None
+
+
+async def search(filter: dict) -> List[ChainmetaItem]:
+    items = _search_index(filter)
+    if items is not None:
+        return items
+    if db.is_async_db_initialized():
+        return [i async for i in db.search_chainmeta_async(filter=filter)]
+    return await _run_blocking(lambda: list(db.search_chainmeta(filter=filter)))
+
+
+async def _iter_blocking(filter: dict, chunk_size: int) -> AsyncIterator[ChainmetaItem]:
+    items = db.search_chainmeta(filter=filter)
+    chunks = chunked(items, chunk_size)
+    reading: Optional[Future] = None
+
+    def _close():
+        # The generator cannot be closed while a read cancelled by the client
+        # is still running in another thread
+        if reading is not None:
+            wait([reading])
+        items.close()
+
+    try:
+        while True:
+            reading = _executor.submit(partial(next, chunks, None))
+            chunk = await asyncio.wrap_future(reading)
+            if chunk is None:
+                return
+            for item in chunk:
+                yield item
+    finally:
+        # Closed even if the stream is cancelled again while waiting
+        await asyncio.shield(asyncio.wrap_future(_executor.submit(_close)))
+
+
+async def _iter_list(items: List[ChainmetaItem]) -> AsyncIterator[ChainmetaItem]:
+    for item in items:
+        yield item
+
+
+def iter_search(filter: dict, *, chunk_size: int = 100) -> AsyncIterator[ChainmetaItem]:
+    """Search lazily, for streaming responses. Without the asynchronous engine,
+    items are read from the database ``chunk_size`` at a time."""
+
+    items = _search_index(filter)
+    if items is not None:
+        return _iter_list(items)
+    if db.is_async_db_initialized():
+        return db.search_chainmeta_async(filter=filter)
+    return _iter_blocking(filter, chunk_size)
+
+
+async def search_many(keys: List[SearchKey]) -> Dict[SearchKey, List[ChainmetaItem]]:
+    index = _label_index
+    if index is None:
+        return await _search_many_db(keys)
+
+    results = index.lookup_many(keys)
+    missing = [k for k, items in results.items() if not items]
+    metrics.count("label_index_hits", len(results) - len(missing))
+    metrics.count("label_index_misses", len(missing))
+    if missing:
+        results.update(await _search_many_db(missing))
+    return results
+
+
+async def _search_many_db(
+    keys: List[SearchKey],
+) -> Dict[SearchKey, List[ChainmetaItem]]:
+    if db.is_async_db_initialized():
+        return await db.search_chainmeta_many_async(keys)
+    return await _run_blocking(db.search_chainmeta_many, keys)
+
+
+async def verify_token(token: str) -> bool:
+    if db.is_async_db_initialized():
+        return await token_verifier.verify_async(token)
+    return await _run_blocking(token_verifier.verify, token)
+
+
+async def find_token(token: str) -> Dict[str, Union[str, None]]:
+    if db.is_async_db_initialized():
+        return await db.find_valid_token_async(token)
+    return await _run_blocking(db.find_valid_token, token)
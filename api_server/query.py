@@ -10,14 +10,30 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-from typing import Optional
+from typing import List, Optional
 
 from fastapi import APIRouter, Header, Query
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
 
-from chainmeta_reader import db, search_chainmeta
+from api_server import data
+from api_server.auth import token_verifier
+from api_server.streaming import accepts_ndjson, ndjson_chunks_async, ndjson_media_type
+from chainmeta_reader import db
 
 router = APIRouter()
 
+max_batch_keys = 1000
+
+
+class BatchKey(BaseModel):
+    address: str
+    chain: Optional[str] = None
+
+
+class BatchQuery(BaseModel):
+    keys: List[BatchKey]
+
 
 @router.get("/v1/query")
 @router.get("/search_chainmeta")
@@ -25,39 +41,67 @@ router = APIRouter()
 async def search(
     chain: str = Query(None),
     address: str = Query(None),
+    stream: bool = Query(False),
     token: Optional[str] = Header(None),
+    accept: Optional[str] = Header(None),
 ):
+    """Search chain metadata by address.
+
+    Results are returned as a JSON array, or streamed as newline delimited
+    JSON while they are read from the database with ``stream=true`` or an
+    Accept header listing ``application/x-ndjson``.
+    """
+
     if token is None:
         return "missing required header [TOKEN]"
-    if not is_token_valid(token):
+    if not await is_token_valid(token):
         return "header [TOKEN] is not exist or invalid"
     if address is None:
         return "missing parameter address"
     if chain is None:
-        results = search_chainmeta(filter={"address": address})
+        filter = {"address": address}
     else:
-        results = search_chainmeta(
-            filter={
-                "address": address,
-                "chain": chain,
-            }
+        filter = {
+            "address": address,
+            "chain": chain,
+        }
+    if stream or accepts_ndjson(accept):
+        return StreamingResponse(
+            ndjson_chunks_async(data.iter_search(filter)), media_type=ndjson_media_type
         )
-    return results
+    return await data.search(filter)
+
+
+@router.post("/v1/query/batch")
+async def search_batch(query: BatchQuery, token: Optional[str] = Header(None)):
+    if token is None:
+        return "missing required header [TOKEN]"
+    if not await is_token_valid(token):
+        return "header [TOKEN] is not exist or invalid"
+    if len(query.keys) > max_batch_keys:
+        return f"too many keys, at most {max_batch_keys} are allowed"
+    results = await data.search_many([(k.chain, k.address) for k in query.keys])
+    return [
+        {
+            "chain": k.chain,
+            "address": k.address,
+            "results": results[(k.chain, k.address)],
+        }
+        for k in query.keys
+    ]
 
 
 # @router.get("/add_token")
 async def add_token(token: str = Query(None), belongs_to: str = Query(None)):
     db.add_api_token(token, belongs_to)
+    token_verifier.invalidate(token)
 
 
 @router.get("/find_valid_token")
 async def find_token(token: str = Query(None)):
-    api_token: dict = db.find_valid_token(token)
+    api_token: dict = await data.find_token(token)
     return api_token
 
 
-def is_token_valid(token) -> bool:
-    api_token: dict = db.find_valid_token(token)
-    if not api_token:
-        return False
-    return True
+async def is_token_valid(token) -> bool:
+    return await data.verify_token(token)
@@ -0,0 +1,70 @@
+# Copyright 2023 The chainmetareader Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import json
+from dataclasses import asdict
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator, Optional
+
+from chainmeta_reader.metadata import ChainmetaItem
+from chainmeta_reader.utils import achunked, chunked
+
+ndjson_media_type = "application/x-ndjson"
+
+
+def accepts_ndjson(accept: Optional[str]) -> bool:
+    """Whether an Accept header lists the newline delimited JSON media type.
+
+    Media ranges are compared without their parameters, such as
+    ``; charset=utf-8``, and are skipped if their quality is 0. Wildcards do
+    not match, as JSON arrays remain the default.
+    """
+
+    if not accept:
+        return False
+    for media_range in accept.split(","):
+        media_type, *params = (p.strip() for p in media_range.split(";"))
+        if media_type.lower() != ndjson_media_type:
+            continue
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    if float(value) == 0:
+                        break
+                except ValueError:
+                    pass
+        else:
+            return True
+    return False
+
+
+def ndjson_chunks(
+    items: Iterable[ChainmetaItem], *, chunk_size: int = 100
+) -> Iterator[str]:
+    """Encode items as newline delimited JSON, one object per line.
+
+    Items are consumed lazily and encoded ``chunk_size`` at a time, so a
+    response can be sent while the items are still being read from the
+    database.
+    """
+
+    for chunk in chunked(items, chunk_size):
+        yield "".join(json.dumps(asdict(i)) + "\n" for i in chunk)
+
+
+async def ndjson_chunks_async(
+    items: AsyncIterable[ChainmetaItem], *, chunk_size: int = 100
+) -> AsyncIterator[str]:
+    """Like ndjson_chunks(), for asynchronous iterables."""
+
+    async for chunk in achunked(items, chunk_size):
+        yield "".join(json.dumps(asdict(i)) + "\n" for i in chunk)
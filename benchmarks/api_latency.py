@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+
+# Copyright 2023 The chainmetareader Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Load test of the data access of the API endpoints: measure the latency of
+address lookups arriving at a steady rate while slow queries run on the same
+event loop, on SQLite.
+
+Slow queries wait on the database, like queries on a loaded server do, using
+a sleep() function registered on the SQLite connections. The "blocking" mode
+calls the synchronous database functions from the coroutines as the
+endpoints used to, "thread" and "async" use api_server.data with the thread
+pool and with the asynchronous engine respectively.
+
+Usage: python -m benchmarks.api_latency --rows 20000 --slow-every 10
+"""
+
+import asyncio
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from time import perf_counter
+from typing import Callable, Coroutine, List
+
+import click
+from sqlalchemy import event, text
+
+from api_server import data
+from chainmeta_reader import db
+
+from .upload import generate_items, setup_database
+
+slow_query = text("SELECT sleep(:seconds)")
+
+
+def register_sleep(engine):
+    @event.listens_for(engine, "connect")
+    def _connect(dbapi_connection, connection_record):
+        dbapi_connection.create_function("sleep", 1, time.sleep)
+
+    # Connections opened before have no sleep()
+    engine.dispose()
+
+
+async def blocking_search(filter: dict) -> list:
+    return list(db.search_chainmeta(filter=filter))
+
+
+def _slow_query(seconds: float):
+    assert db._read_session_maker is not None
+    with db._read_session_maker() as session:
+        session.execute(slow_query, {"seconds": seconds})
+
+
+async def blocking_slow_query(seconds: float):
+    _slow_query(seconds)
+
+
+async def thread_slow_query(seconds: float):
+    await data._run_blocking(_slow_query, seconds)
+
+
+async def async_slow_query(seconds: float):
+    assert db._async_session_maker is not None
+    async with db._async_session_maker() as session:
+        await session.execute(slow_query, {"seconds": seconds})
+
+
+async def load_test(
+    search: Callable[[dict], Coroutine],
+    slow_query: Callable[[float], Coroutine],
+    *,
+    rows: int,
+    requests: int,
+    interval: float,
+    slow_every: int,
+    slow_seconds: float,
+) -> List[float]:
+    latencies: List[float] = []
+
+    async def _lookup(i: int, arrival: float):
+        address = f"0x{i * 7919 % rows:040x}"
+        await search({"chain": "ethereum_mainnet", "address": address})
+        latencies.append(perf_counter() - arrival)
+
+    start = perf_counter()
+    tasks: List[asyncio.Task] = []
+    for i in range(requests):
+        # Requests arrive on schedule, a blocked event loop delays them
+        arrival = start + i * interval
+        await asyncio.sleep(max(0.0, arrival - perf_counter()))
+        if i % slow_every == 0:
+            tasks.append(asyncio.create_task(slow_query(slow_seconds)))
+        else:
+            tasks.append(asyncio.create_task(_lookup(i, arrival)))
+    await asyncio.gather(*tasks)
+    return latencies
+
+
+@click.command()
+@click.option("--rows", default=20_000, help="Items in the table.")
+@click.option("--requests", default=400, help="Requests, lookups or slow queries.")
+@click.option("--interval", default=0.005, help="Seconds between requests.")
+@click.option("--slow-every", default=10, help="One slow query every N requests.")
+@click.option("--slow-seconds", default=0.2, help="Duration of a slow query.")
+def benchmark(
+    rows: int, requests: int, interval: float, slow_every: int, slow_seconds: float
+):
+    kw: dict = dict(
+        rows=rows,
+        requests=requests,
+        interval=interval,
+        slow_every=slow_every,
+        slow_seconds=slow_seconds,
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp).joinpath("chainmeta.db")
+        setup_database(db_path)
+        register_sleep(db._engines["read"])
+        db.upload_chainmeta(generate_items(rows), batch_size=1000, max_concurrency=1)
+
+        report(
+            "blocking",
+            asyncio.run(load_test(blocking_search, blocking_slow_query, **kw)),
+        )
+        report("thread", asyncio.run(load_test(data.search, thread_slow_query, **kw)))
+
+        db.init_async_db(f"sqlite+aiosqlite:///{db_path}")
+        register_sleep(db._engines["async"])
+        report("async", asyncio.run(load_test(data.search, async_slow_query, **kw)))
+        db.dispose_db()
+
+
+def report(mode: str, latencies: List[float]):
+    quantiles = statistics.quantiles(latencies, n=100)
+    click.echo(
+        f"{mode:>8}: p50 {quantiles[49] * 1000:8.1f}ms  "
+        f"p99 {quantiles[98] * 1000:8.1f}ms  max {max(latencies) * 1000:8.1f}ms"
+    )
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,82 @@
+# Copyright 2023 The chainmetareader Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compare loading and flattening generated documents as items and as columns.
+
+Both modes load, validate and translate the artifact and flatten it into the
+values of the database records, without uploading them.
+
+Usage: python -m benchmarks.columnar --rows 10000000
+"""
+
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict
+
+import click
+
+import chainmeta_reader
+from benchmarks.generator import schemas, write_document
+from chainmeta_reader import db
+from chainmeta_reader.utils import chunked
+
+
+def run_items(document: Path, chunk_size: int) -> int:
+    with open(document) as f:
+        items = chainmeta_reader.iter_load(
+            f, artifact_base_path=document.parent, chunk_size=chunk_size
+        )
+        return sum(len(db.flatten_values(c)) for c in chunked(items, chunk_size))
+
+
+def run_columns(document: Path, chunk_size: int) -> int:
+    with open(document) as f:
+        tables = chainmeta_reader.iter_load_columns(
+            f, artifact_base_path=document.parent, chunk_rows=chunk_size
+        )
+        return sum(len(db.flatten_columns(t)["tag"]) for t in tables)
+
+
+@click.command()
+@click.option("--rows", default=1_000_000, help="Number of items to generate.")
+@click.option(
+    "--schema",
+    "schema_name",
+    default="chaintool",
+    type=click.Choice(sorted(schemas)),
+    help="Schema of the generated document.",
+)
+@click.option("--chunk-size", default=100_000, help="Number of rows per chunk.")
+@click.option("--repeat", default=3, help="Report the best of N runs.")
+def benchmark(rows: int, schema_name: str, chunk_size: int, repeat: int):
+    runs: Dict[str, Callable[[Path, int], int]] = {
+        "items": run_items,
+        "columns": run_columns,
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        document = write_document(Path(tmp), schema_name, rows)
+        for name, run in runs.items():
+            elapsed = float("inf")
+            for _ in range(repeat):
+                start = time.perf_counter()
+                records = run(document, chunk_size)
+                elapsed = min(elapsed, time.perf_counter() - start)
+            click.echo(
+                f"{name:>7}: {rows} rows, {records} records in {elapsed:.2f}s, "
+                f"{rows / elapsed:,.0f} rows/s"
+            )
+
+
+if __name__ == "__main__":
+    benchmark()
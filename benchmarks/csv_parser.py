@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+
+# Copyright 2023 The chainmetareader Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compare the streaming csv artifact parser with the original implementation.
+
+Usage: python -m benchmarks.csv_parser --rows 20000000
+"""
+
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+import click
+
+from chainmeta_reader.artifact import csv_iter_parser
+
+sample_artifact = (
+    Path(__file__)
+    .parent.parent.resolve()
+    .joinpath("tests", "data", "artifacts", "chaintool_artifact_sample.csv")
+)
+
+
+def legacy_csv_parser(c: str) -> object:
+    """The csv parser as it was before the streaming parser was introduced."""
+
+    meta_data = []
+    try:
+        rows = c.split("\n")
+        filed_names = rows[0].split("\t")
+        for i in range(1, len(rows)):
+            row = rows[i]
+            if not row:
+                continue
+            dic: Dict[str, Optional[str]] = {}
+            arr = row.split("\t")
+            for j in range(0, len(filed_names)):
+                if arr[j] == "":
+                    dic[filed_names[j]] = None
+                else:
+                    dic[filed_names[j]] = arr[j]
+            meta_data.append(dic)
+        return meta_data
+    finally:
+        return meta_data
+
+
+def generate_artifact(path: str, rows: int, *, seed: int = 0):
+    """Write a chaintool-style artifact by resampling the sample artifact with
+    random addresses."""
+
+    rng = random.Random(seed)
+    with open(sample_artifact) as f:
+        header, *samples = [line.rstrip("\n").split("\t") for line in f if line]
+    address_idx = header.index("address")
+    with open(path, "w") as f:
+        f.write("\t".join(header) + "\n")
+        for _ in range(rows):
+            row = list(rng.choice(samples))
+            row[address_idx] = "0x%040x" % rng.getrandbits(160)
+            f.write("\t".join(row) + "\n")
+
+
+def run_legacy(path: str) -> int:
+    with open(path) as f:
+        return len(legacy_csv_parser(f.read()))  # type: ignore
+
+
+def run_streaming(path: str) -> int:
+    with open(path) as f:
+        return sum(1 for _ in csv_iter_parser(f))
+
+
+def measure(
+    fn: Callable[[str], int], path: str, *, memory: bool, repeat: int = 1
+) -> dict:
+    elapsed = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        n = fn(path)
+        elapsed = min(elapsed, time.perf_counter() - start)
+
+    peak = None
+    if memory:
+        tracemalloc.start()
+        fn(path)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return {"rows": n, "seconds": elapsed, "peak_bytes": peak}
+
+
+@click.command()
+@click.option("--rows", default=1_000_000, help="Number of rows to generate.")
+@click.option("--file", "path", default=None, help="Use an existing artifact.")
+@click.option("--repeat", default=3, help="Report the best of N runs.")
+@click.option("--memory/--no-memory", default=True, help="Measure peak memory.")
+@click.option("--legacy/--no-legacy", default=True, help="Run the old parser.")
+def benchmark(rows: int, path: Optional[str], repeat: int, memory: bool, legacy: bool):
+    tmp = None
+    if path is None:
+        tmp = tempfile.NamedTemporaryFile(suffix=".csv", delete=False)
+        tmp.close()
+        path = tmp.name
+        click.echo(f"Generating {rows} rows into {path}")
+        generate_artifact(path, rows)
+
+    try:
+        size = os.path.getsize(path)
+        click.echo(f"Artifact size: {size / 2**20:.1f} MiB")
+        runs = [("streaming", run_streaming)]
+        if legacy:
+            runs.insert(0, ("legacy", run_legacy))
+        for name, fn in runs:
+            r = measure(fn, path, memory=memory, repeat=repeat)
+            line = (
+                f"{name:>10}: {r['rows']} rows in {r['seconds']:.2f}s, "
+                f"{r['rows'] / r['seconds']:,.0f} rows/s"
+            )
+            if r["peak_bytes"] is not None:
+                line += f", peak {r['peak_bytes'] / 2**20:,.1f} MiB"
+            click.echo(line)
+    finally:
+        if tmp is not None:
+            os.unlink(path)
+
+
+if __name__ == "__main__":
+    benchmark()
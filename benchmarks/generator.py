@@ -0,0 +1,146 @@
+# Copyright 2023 The chainmetareader Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Generate valid synthetic chain metadata documents and artifacts.
+
+Documents are generated for each registered schema with a generator below:
+the common schema, as published by coinbase or goplus in examples/, and the
+chaintool TSV schema. The output only depends on the number of rows and the
+seed.
+"""
+
+import json
+import random
+from pathlib import Path
+from typing import Callable, Dict, Iterator
+
+from chainmeta_reader.config import default_config
+from chainmeta_reader.contrib.chaintool import ChaintoolTranslator
+
+common_schema_path = "https://github.com/openchainmeta/chainmetareader/chainmeta_reader/schemas/artifact_schema.json"  # noqa: E501
+chaintool_schema_path = "https://github.com/openchainmeta/chainmetareader/chainmeta_reader/schemas/chaintool_schema.json"  # noqa: E501
+
+_chains = sorted(i.key for i in default_config.Chains)
+_entities = sorted(i.key for i in default_config.Entities)
+_categories = sorted(i.key for i in default_config.Categories)
+_sources = sorted(i.key for i in default_config.Sources)
+
+
+def _address(rng: random.Random, chain: str) -> str:
+    if chain == "bitcoin_mainnet":
+        return "bc1q%038x" % rng.getrandbits(152)
+    return "0x%040x" % rng.getrandbits(160)
+
+
+def iter_common_items(
+    rows: int, *, seed: int = 0, submitted_by: str = "benchmark"
+) -> Iterator[dict]:
+    """Yield raw items of the common artifact schema."""
+
+    rng = random.Random(seed)
+    for i in range(rows):
+        chain = rng.choice(_chains)
+        yield {
+            "chain": chain,
+            "address": _address(rng, chain),
+            "entity": rng.choice(_entities) if i % 4 else None,
+            "name": f"Label {i}" if i % 3 else None,
+            "categories": rng.sample(_categories, rng.randint(1, 3)),
+            "source": rng.choice(_sources),
+            "submitted_by": submitted_by,
+            "submitted_on": "2023-04-04",
+        }
+
+
+def iter_chaintool_rows(rows: int, *, seed: int = 0) -> Iterator[Dict[str, str]]:
+    """Yield raw rows of the chaintool schema, empty values are empty strings
+    as in the TSV artifacts."""
+
+    rng = random.Random(seed)
+    chains = {"BTC": "bitcoin_mainnet", "ETH": "ethereum_mainnet"}
+    # Chaintool publishes some categories under their own names
+    categories = [ChaintoolTranslator.denormalize_category(c) for c in _categories]
+    for i in range(rows):
+        chain = rng.choice(sorted(chains))
+        yield {
+            "submitted_by": "Chaintool",
+            "address": _address(rng, chains[chain]),
+            "chain": chain,
+            "entity": rng.choice(_entities) if i % 4 else "",
+            "entity_name": f"Label {i}" if i % 3 else "",
+            "categories": ",".join(rng.sample(categories, rng.randint(1, 3))),
+            "source": "ground truth",
+            "tagged_on": "2023-04-04",
+        }
+
+
+def _write_json_artifact(path: Path, rows: int, seed: int):
+    # Written item by item, so that large artifacts do not have to fit in memory
+    with open(path, "w") as f:
+        f.write("[\n")
+        for i, item in enumerate(iter_common_items(rows, seed=seed)):
+            f.write(",\n" if i else "")
+            f.write(json.dumps(item))
+        f.write("\n]\n")
+
+
+def _write_chaintool_artifact(path: Path, rows: int, seed: int):
+    with open(path, "w") as f:
+        for i, row in enumerate(iter_chaintool_rows(rows, seed=seed)):
+            if i == 0:
+                f.write("\t".join(row) + "\n")
+            f.write("\t".join(row.values()) + "\n")
+
+
+# Schema name: (schema path, artifact file format, provider, artifact writer)
+schemas: Dict[str, tuple] = {
+    "common": (common_schema_path, "json", "coinbase", _write_json_artifact),
+    "chaintool": (chaintool_schema_path, "csv", "chaintool", _write_chaintool_artifact),
+}
+
+
+def write_document(folder: Path, schema: str, rows: int, *, seed: int = 0) -> Path:
+    """Write a document of ``schema`` with a single artifact of ``rows`` items
+    to ``folder``, which is the artifact base path of the document."""
+
+    schema_path, fileformat, provider, write_artifact = schemas[schema]
+    write: Callable[[Path, int, int], None] = write_artifact
+    artifact = f"{schema}_{rows}_{seed}_artifact.{fileformat}"
+    write(folder.joinpath(artifact), rows, seed)
+
+    document = {
+        "community": "openchainmeta",
+        "provider": {
+            "provider_name": provider,
+            "provider_id": "ocm000000",
+            "provider_signature": "",
+        },
+        "version": "v1",
+        "revision": 1,
+        "introduction": "",
+        "chainmetadata": {
+            "schema": schema_path,
+            "artifact": [
+                {
+                    "artifact_type": "local file",
+                    "path": f"file:///{artifact}",
+                    "fileformat": fileformat,
+                    "signature": "",
+                }
+            ],
+        },
+    }
+    path = folder.joinpath(f"{schema}_{rows}_{seed}.json")
+    with open(path, "w") as f:
+        json.dump(document, f, indent=4)
+    return path
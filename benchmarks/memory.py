@@ -0,0 +1,62 @@
+# Copyright 2023 The chainmetareader Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compare the memory used by ChainmetaItem and CompactChainmetaItem.
+
+Usage: python -m benchmarks.memory --rows 10000000
+"""
+
+import json
+import time
+import tracemalloc
+from typing import Callable
+
+import click
+
+from benchmarks.generator import iter_common_items
+from chainmeta_reader.compact import CompactChainmetaItem
+from chainmeta_reader.metadata import ChainmetaItem
+
+
+def measure(build: Callable[[dict], object], artifact: str) -> dict:
+    """Build items from a JSON artifact, as loaded by the library: each value
+    is a new string. Return the memory held by the items once built."""
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    items = [build(d) for d in json.loads(artifact)]
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del items
+    return {"seconds": elapsed, "bytes": current}
+
+
+@click.command()
+@click.option("--rows", default=1_000_000, help="Number of items to hold.")
+def benchmark(rows: int):
+    artifact = json.dumps(list(iter_common_items(rows)))
+    runs = {
+        "dataclass": lambda d: ChainmetaItem(**d),
+        "compact": CompactChainmetaItem.from_dict,
+    }
+    for name, build in runs.items():
+        r = measure(build, artifact)
+        click.echo(
+            f"{name:>9}: {rows} items in {r['bytes'] / 2**20:,.1f} MiB, "
+            f"{r['bytes'] / rows:.0f} bytes/item, built in {r['seconds']:.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+
+# Copyright 2023 The chainmetareader Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compare search_chainmeta() with the original id cursor pagination, and with
+keyset pagination over records grouped into items in Python, on SQLite tables
+of increasing size.
+
+Then time single pages, the first, middle and last ones, of keyset pagination
+and of the same query paginated with OFFSET: keyset pages take a constant
+time, while OFFSET pages get slower the further they are in the table.
+
+Usage: python -m benchmarks.search --rows 10000 --rows 100000
+"""
+
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+import click
+from sqlalchemy import Select, tuple_
+
+from chainmeta_reader import db
+from chainmeta_reader.metadata import ChainmetaItem
+
+from .upload import generate_items, setup_database
+
+
+def _group_key(r: db.ChainmetaRecord):
+    return r.chain, r.address, r.source, r.submitted_by
+
+
+def legacy_search(*, page_size: int) -> Iterator[ChainmetaItem]:
+    """search_chainmeta() as it was before keyset pagination, without filter."""
+
+    assert db._read_session_maker is not None
+    with db._read_session_maker() as session:
+        remaining_results: List[db.ChainmetaRecord] = []
+        cursor = None
+        while True:
+            query = session.query(db.ChainmetaRecord)
+            if cursor:
+                query = query.filter(db.ChainmetaRecord.id > cursor)
+            batch_results = (
+                query.order_by(
+                    db.ChainmetaRecord.chain,
+                    db.ChainmetaRecord.address,
+                    db.ChainmetaRecord.source,
+                    db.ChainmetaRecord.submitted_by,
+                    db.ChainmetaRecord.id,
+                )
+                .limit(page_size)
+                .all()
+            )
+            if not batch_results:
+                break
+            if len(batch_results) < page_size:
+                remaining_results += batch_results
+                break
+            last_record = batch_results[-1]
+            cursor = last_record.id
+            last_key = _group_key(last_record)
+            batch_results = remaining_results + batch_results
+            yield from db.reduce(
+                [r for r in batch_results if _group_key(r) != last_key]
+            )
+            remaining_results = [r for r in batch_results if _group_key(r) == last_key]
+        yield from db.reduce(remaining_results)
+
+
+def record_search(*, page_size: int) -> Iterator[ChainmetaItem]:
+    """Keyset pagination over records, grouped into items with db.reduce()."""
+
+    assert db._read_session_maker is not None
+    sort_columns = (
+        db.ChainmetaRecord.chain,
+        db.ChainmetaRecord.address,
+        db.ChainmetaRecord.source,
+        db.ChainmetaRecord.submitted_by,
+        db.ChainmetaRecord.id,
+    )
+    with db._read_session_maker() as session:
+        remaining_results: List[db.ChainmetaRecord] = []
+        cursor = None
+        while True:
+            query = session.query(db.ChainmetaRecord)
+            if cursor:
+                query = query.filter(tuple_(*sort_columns) > tuple_(*cursor))
+            batch_results = query.order_by(*sort_columns).limit(page_size).all()
+
+            batch_results = remaining_results + batch_results
+            if len(batch_results) - len(remaining_results) < page_size:
+                yield from db.reduce(batch_results)
+                return
+
+            last_record = batch_results[-1]
+            cursor = (*_group_key(last_record), last_record.id)
+            last_key = _group_key(last_record)
+            yield from db.reduce(
+                [r for r in batch_results if _group_key(r) != last_key]
+            )
+            remaining_results = [r for r in batch_results if _group_key(r) == last_key]
+
+
+def offset_page_select(page_size: int, page: int) -> Select:
+    """Page of items of search_chainmeta(), without filter, selected with
+    OFFSET instead of keyset pagination."""
+
+    return (
+        db._item_select()
+        .group_by(*db._group_columns)
+        .order_by(*db._group_columns)
+        .limit(page_size)
+        .offset(page * page_size)
+    )
+
+
+def page_cursors(page_size: int) -> List[Optional[tuple]]:
+    """Return the keyset cursor of each page of search_chainmeta(), without
+    filter."""
+
+    assert db._read_session_maker is not None
+    cursors: List[Optional[tuple]] = [None]
+    with db._read_session_maker() as session:
+        while True:
+            rows = session.execute(db._page_select({}, page_size, cursors[-1])).all()
+            cursor = db._next_cursor(rows, page_size)
+            if cursor is None:
+                return cursors
+            cursors.append(cursor)
+
+
+def time_pages(page_size: int, *, repeat: int) -> Dict[str, Dict[int, float]]:
+    """Return the best time to read the first, middle and last pages, with
+    keyset pagination and with OFFSET, in seconds."""
+
+    assert db._read_session_maker is not None
+    cursors = page_cursors(page_size)
+    pages = sorted({0, len(cursors) // 2, len(cursors) - 1})
+    selects: Dict[str, Callable[[int], Select]] = {
+        "keyset": lambda p: db._page_select({}, page_size, cursors[p]),
+        "offset": lambda p: offset_page_select(page_size, p),
+    }
+
+    timings: Dict[str, Dict[int, float]] = {}
+    with db._read_session_maker() as session:
+        for name, page_select in selects.items():
+            timings[name] = {}
+            for page in pages:
+                best = float("inf")
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    session.execute(page_select(page)).all()
+                    best = min(best, time.perf_counter() - start)
+                timings[name][page] = best
+    return timings
+
+
+@click.command()
+@click.option(
+    "--rows", multiple=True, default=[5_000, 20_000], help="Items in the table."
+)
+@click.option("--page-size", default=100, help="Records per page.")
+@click.option("--legacy/--no-legacy", default=True, help="Run the old search.")
+@click.option("--repeat", default=5, help="Best of N reads of each page.")
+def benchmark(rows: List[int], page_size: int, legacy: bool, repeat: int):
+    runs: Dict[str, Callable[[], Iterator[ChainmetaItem]]] = {
+        "keyset": lambda: db.search_chainmeta(page_size=page_size)
+    }
+    runs["records"] = lambda: record_search(page_size=page_size)
+    if legacy:
+        runs["legacy"] = lambda: legacy_search(page_size=page_size)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in rows:
+            setup_database(Path(tmp).joinpath(f"{n}.db"))
+            db.upload_chainmeta(generate_items(n), batch_size=1000, max_concurrency=1)
+
+            for name, search in runs.items():
+                start = time.perf_counter()
+                results = set((r.chain, r.address, r.submitted_by) for r in search())
+                elapsed = time.perf_counter() - start
+                click.echo(
+                    f"{n:>8} items {name:>7}: {len(results)} of {n} items found "
+                    f"in {elapsed:.2f}s, {len(results) / elapsed:.0f} items/s"
+                )
+
+            for name, pages in time_pages(page_size, repeat=repeat).items():
+                latencies = ", ".join(
+                    f"page {p}: {seconds * 1000:.2f}ms" for p, seconds in pages.items()
+                )
+                click.echo(f"{n:>8} items {name:>7}: {latencies}")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,284 @@
+# Copyright 2023 The chainmetareader Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Time each stage of the ingest and query pipeline on generated documents.
+
+The document is streamed with iter_load(): the load, validate and translate
+stages are timed by the metrics of the library, and each chunk of items is
+flattened and uploaded to a SQLite database as it is loaded. The items are
+then searched with a full scan and looked up by address, in the database, in
+a label index and in a snapshot. Only a sample of the items is kept in
+memory, so that documents of 1e7 rows fit.
+Results are written as JSON, and compared against the results of a previous
+run with ``--baseline``: the command fails if a stage got slower by more
+than ``--threshold``.
+
+Usage: python -m benchmarks.suite --rows 1000 --rows 100000 --output results.json
+"""
+
+import json
+import platform
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import click
+
+import chainmeta_reader
+from benchmarks.generator import schemas, write_document
+from benchmarks.upload import setup_database
+from chainmeta_reader import db, metrics
+from chainmeta_reader.db import SearchKey
+from chainmeta_reader.index import LabelIndex
+from chainmeta_reader.snapshot import LabelSnapshot, write_snapshot
+from chainmeta_reader.utils import chunked
+
+# Stages timed by the library metrics while loading a document
+_load_stages = {
+    "load": ["artifact_load"],
+    "validate": ["artifact_validate", "common_validate"],
+    "translate": ["translate"],
+}
+
+# Number of addresses looked up in the lookup stages
+lookup_keys = 1000
+# Number of items loaded, flattened and uploaded at a time
+chunk_rows = 100_000
+_lookup_stages = ["lookup", "index_lookup", "snapshot_lookup"]
+
+
+def _timed(run: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    run()
+    return time.perf_counter() - start
+
+
+def _add_timed(timings: Dict[str, float], stage: str, run: Callable[[], object]):
+    timings[stage] = timings.get(stage, 0.0) + _timed(run)
+
+
+def run_once(folder: Path, schema: str, rows: int, *, seed: int) -> Dict[str, float]:
+    """Run the pipeline once on a generated document, return the time spent in
+    each stage, in seconds.
+
+    The document is loaded, flattened and uploaded ``chunk_rows`` items at a
+    time, the time of each chunk adds up to the time of the stage. Only a
+    sample of the keys to look up is kept in memory, the label index is
+    built from the database.
+    """
+
+    document = write_document(folder, schema, rows, seed=seed)
+    timings: Dict[str, float] = {}
+    setup_database(folder.joinpath(f"{document.stem}.db"))
+
+    rng = random.Random(seed)
+    keys: List[SearchKey] = []
+    submitted_by = ""
+    loaded = 0
+
+    enabled = metrics.is_enabled()
+    metrics.enable()
+    metrics.reset()
+    try:
+        with open(document) as f:
+            items = chainmeta_reader.iter_load(f, artifact_base_path=folder)
+            for chunk in chunked(items, chunk_rows):
+                # The metrics only time the load stages, flatten and upload are
+                # timed here
+                metrics.enable(False)
+                _add_timed(timings, "flatten", lambda: db.flatten_values(chunk))
+                # SQLite does not support concurrent writes
+                _add_timed(
+                    timings,
+                    "upload",
+                    lambda: db.upload_chainmeta(chunk, max_concurrency=1),
+                )
+                metrics.enable()
+
+                submitted_by = submitted_by or chunk[0].submitted_by
+                # Reservoir sample of the keys to look up
+                for i in chunk:
+                    loaded += 1
+                    if len(keys) < lookup_keys:
+                        keys.append((i.chain, i.address))
+                    else:
+                        j = rng.randrange(loaded)
+                        if j < lookup_keys:
+                            keys[j] = (i.chain, i.address)
+        stages = metrics.snapshot().stages
+    finally:
+        metrics.enable(enabled)
+    for stage, names in _load_stages.items():
+        timings[stage] = sum(stages[n].total for n in names if n in stages)
+    timings.setdefault("flatten", 0.0)
+    timings.setdefault("upload", 0.0)
+
+    timings["search"] = _timed(
+        lambda: sum(
+            1 for _ in db.search_chainmeta(filter={"submitted_by": submitted_by})
+        )
+    )
+    timings["lookup"] = _timed(lambda: db.search_chainmeta_many(keys))
+
+    start = time.perf_counter()
+    index = LabelIndex.from_database()
+    timings["index_build"] = time.perf_counter() - start
+    timings["index_lookup"] = _timed(lambda: index.lookup_many(keys))
+
+    path = folder.joinpath(f"{document.stem}.snap")
+    timings["snapshot_write"] = _timed(lambda: write_snapshot(path, index))
+    with LabelSnapshot(path) as snapshot:
+        timings["snapshot_lookup"] = _timed(lambda: snapshot.lookup_many(keys))
+
+    db.dispose_db()
+    return timings
+
+
+def run_suite(
+    schema_names: List[str], rows: List[int], *, seed: int, repeat: int
+) -> List[dict]:
+    """Run the pipeline ``repeat`` times per schema and number of rows, keep
+    the best time of each stage."""
+
+    results = []
+    for schema in schema_names:
+        for n in rows:
+            best: Dict[str, float] = {}
+            for _ in range(repeat):
+                with tempfile.TemporaryDirectory() as tmp:
+                    timings = run_once(Path(tmp), schema, n, seed=seed)
+                for stage, seconds in timings.items():
+                    best[stage] = min(best.get(stage, seconds), seconds)
+            for stage, seconds in best.items():
+                items = min(n, lookup_keys) if stage in _lookup_stages else n
+                results.append(
+                    {
+                        "schema": schema,
+                        "rows": n,
+                        "stage": stage,
+                        "seconds": seconds,
+                        "items_per_second": items / seconds if seconds else None,
+                    }
+                )
+    return results
+
+
+ResultKey = Tuple[str, int, str]
+
+
+def find_regressions(
+    results: List[dict], baseline: List[dict], *, threshold: float
+) -> List[str]:
+    """Compare results against a baseline, return a description of the stages
+    which are slower than the baseline by more than ``threshold``, a ratio."""
+
+    def _key(r: dict) -> ResultKey:
+        return r["schema"], r["rows"], r["stage"]
+
+    previous = {_key(r): r["seconds"] for r in baseline}
+    regressions = []
+    for r in results:
+        before: Optional[float] = previous.get(_key(r))
+        if before is not None and r["seconds"] > before * (1 + threshold):
+            regressions.append(
+                f"{r['schema']} {r['rows']} rows {r['stage']}: "
+                f"{r['seconds']:.4f}s, was {before:.4f}s"
+            )
+    return regressions
+
+
+@click.command()
+@click.option(
+    "--rows",
+    multiple=True,
+    type=int,
+    default=[1000, 10_000],
+    show_default=True,
+    help="Number of items of the generated documents, can be repeated.",
+)
+@click.option(
+    "--schema",
+    "schema_names",
+    multiple=True,
+    type=click.Choice(sorted(schemas)),
+    help="Schema of the generated documents, can be repeated, all by default.",
+)
+@click.option("--seed", default=0, show_default=True, help="Seed of the generator.")
+@click.option(
+    "--repeat",
+    default=3,
+    show_default=True,
+    help="Number of runs, the best time of each stage is kept.",
+)
+@click.option(
+    "--output", type=click.Path(dir_okay=False), help="Write the results as JSON."
+)
+@click.option(
+    "--baseline",
+    type=click.Path(exists=True, dir_okay=False),
+    help="Results of a previous run to compare against.",
+)
+@click.option(
+    "--threshold",
+    default=0.2,
+    type=click.FloatRange(min=0),
+    show_default=True,
+    help="Fail if a stage is slower than the baseline by more than this ratio.",
+)
+def benchmark(
+    rows: List[int],
+    schema_names: List[str],
+    seed: int,
+    repeat: int,
+    output: Optional[str],
+    baseline: Optional[str],
+    threshold: float,
+):
+    results = run_suite(
+        list(schema_names) or sorted(schemas), list(rows), seed=seed, repeat=repeat
+    )
+    for r in results:
+        click.echo(
+            f"{r['schema']:>9} {r['rows']:>9} {r['stage']:>15}: "
+            f"{r['seconds']:.4f}s, {r['items_per_second'] or 0:,.0f} items/s"
+        )
+
+    if output:
+        with open(output, "w") as f:
+            json.dump(
+                {
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "seed": seed,
+                    "repeat": repeat,
+                    "results": results,
+                },
+                f,
+                indent=4,
+            )
+
+    if baseline:
+        with open(baseline) as f:
+            regressions = find_regressions(
+                results, json.load(f)["results"], threshold=threshold
+            )
+        for regression in regressions:
+            click.echo(f"regression: {regression}", err=True)
+        if regressions:
+            raise click.ClickException(f"{len(regressions)} stages regressed")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,103 @@
+# Copyright 2023 The chainmetareader Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compare the chaintool translator, row by row and by batch, with the original
+implementation.
+
+Usage: python -m benchmarks.translator --rows 10000000
+"""
+
+import re
+import time
+from typing import Callable, Dict, List
+
+import click
+
+from benchmarks.generator import iter_chaintool_rows
+from chainmeta_reader.contrib.chaintool import ChaintoolTranslator
+from chainmeta_reader.metadata import ChainmetaItem
+
+
+def _legacy_key(key: str) -> str:
+    return re.sub("[^a-zA-Z0-9_]", "_", key).lower()
+
+
+def _legacy_category(category: str) -> str:
+    category = {
+        "Financial Services": "business_or_services",
+        "Services": "business_or_services",
+        "Exchange": "cex",
+        "Law Enforcement": "le",
+        "Coinswapper": "coin_swapper",
+        "Financial Crime": "financial_crime",
+        "Constrainted": "constrained_by_service",
+        "High Risk": "high_risk",
+        "Dapp": "dapp",
+    }.get(category, category)
+    return _legacy_key(category)
+
+
+def legacy_to_common_schema(raw_metadata: Dict[str, str]) -> ChainmetaItem:
+    """ChaintoolTranslator.to_common_schema() as it was before normalized
+    values were memoized."""
+
+    return ChainmetaItem(
+        chain={
+            "ETH": "ethereum_mainnet",
+            "BTC": "bitcoin_mainnet",
+        }.get(raw_metadata["chain"], raw_metadata["chain"]),
+        address=raw_metadata["address"],
+        entity=(
+            None
+            if raw_metadata["entity"] is None
+            else _legacy_key(raw_metadata["entity"])
+        ),
+        name=raw_metadata["entity_name"],
+        categories=[_legacy_category(i) for i in raw_metadata["categories"].split(",")],
+        source=_legacy_key(raw_metadata["source"]),
+        submitted_by=raw_metadata["submitted_by"],
+        submitted_on=raw_metadata["tagged_on"],
+    )
+
+
+def measure(translate: Callable[[List[dict]], list], rows: List[dict], repeat: int):
+    elapsed = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        items = translate(rows)
+        elapsed = min(elapsed, time.perf_counter() - start)
+        del items
+    return elapsed
+
+
+@click.command()
+@click.option("--rows", default=1_000_000, help="Number of rows to translate.")
+@click.option("--seed", default=0, help="Seed of the generator.")
+@click.option("--repeat", default=3, help="Report the best of N runs.")
+def benchmark(rows: int, seed: int, repeat: int):
+    raw = list(iter_chaintool_rows(rows, seed=seed))
+    translator = ChaintoolTranslator()
+    runs: Dict[str, Callable[[list], list]] = {
+        "legacy": lambda r: [legacy_to_common_schema(i) for i in r],
+        "row": lambda r: [translator.to_common_schema(i) for i in r],
+        "batch": translator.to_common_schema_batch,
+    }
+    for name, translate in runs.items():
+        seconds = measure(translate, raw, repeat)
+        click.echo(
+            f"{name:>6}: {rows} rows in {seconds:.2f}s, {rows / seconds:,.0f} rows/s"
+        )
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+
+# Copyright 2023 The chainmetareader Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compare bulk uploads against the original one query per record uploads on
+SQLite.
+
+Usage: python -m benchmarks.upload --rows 20000
+"""
+
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List
+
+import click
+
+from chainmeta_reader import db
+from chainmeta_reader.metadata import ChainmetaItem
+
+
+def legacy_upload(
+    session_maker: Callable, items: List[ChainmetaItem], *, batch_size: int
+) -> int:
+    """The upload as it was before bulk inserts: one SELECT per record."""
+
+    total = 0
+    for start in range(0, len(items), batch_size):
+        with session_maker() as session:
+            for record in db.flatten(items[start : start + batch_size]):
+                with session.no_autoflush:
+                    found = (
+                        session.query(db.ChainmetaRecord)
+                        .filter_by(
+                            chain=record.chain,
+                            address=record.address,
+                            namespace=record.namespace,
+                            scope=record.scope,
+                            tag=record.tag,
+                            source=record.source,
+                            submitted_by=record.submitted_by,
+                        )
+                        .first()
+                    )
+                if found is None:
+                    total += 1
+                    session.add(record)
+            session.commit()
+    return total
+
+
+def generate_items(rows: int) -> List[ChainmetaItem]:
+    return [
+        ChainmetaItem(
+            chain="ethereum_mainnet",
+            address=f"0x{i:040x}",
+            entity="uniswap",
+            name=f"Uniswap {i}",
+            categories=["dex", "defi"],
+            source="ground_truth",
+            submitted_by="benchmark",
+            submitted_on="2023-04-04",
+        )
+        for i in range(rows)
+    ]
+
+
+def setup_database(path: Path) -> Callable:
+    db.init_db(f"sqlite:///{path}")
+    assert db._session_maker is not None
+    with db._session_maker() as session:
+        db.mapper_registry.metadata.create_all(session.get_bind())
+    return db._session_maker
+
+
+@click.command()
+@click.option("--rows", default=20_000, help="Number of items to upload.")
+@click.option("--batch-size", default=200, help="Number of items per batch.")
+def benchmark(rows: int, batch_size: int):
+    items = generate_items(rows)
+    runs = {
+        "legacy": lambda s: legacy_upload(s, items, batch_size=batch_size),
+        "bulk": lambda s: db.upload_chainmeta(
+            items, batch_size=batch_size, max_concurrency=1
+        ),
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, upload in runs.items():
+            for phase in ["insert", "re-upload"]:
+                session_maker = setup_database(Path(tmp).joinpath(f"{name}.db"))
+                start = time.perf_counter()
+                n = upload(session_maker)
+                elapsed = time.perf_counter() - start
+                click.echo(
+                    f"{name:>7} {phase:>9}: {n} records inserted in {elapsed:.2f}s, "
+                    f"{rows / elapsed:,.0f} items/s"
+                )
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+
+# Copyright 2023 The chainmetareader Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compare the compiled common artifact validator with plain jsonschema.
+
+Usage: python -m benchmarks.validator --rows 1000000
+"""
+
+import time
+from pathlib import Path
+from typing import List
+
+import click
+from jsonschema import Draft7Validator
+
+from benchmarks.generator import iter_common_items
+from chainmeta_reader.config import default_config
+from chainmeta_reader.constants import ArtifactSchemaFile, Field, SchemaFolder
+from chainmeta_reader.validator import (
+    IValidator,
+    JsonValidator,
+    common_artifact_validator,
+    type_checker,
+    value_checker,
+)
+
+artifact_schema = (
+    Path(__file__)
+    .parent.parent.resolve()
+    .joinpath("chainmeta_reader", SchemaFolder, ArtifactSchemaFile)
+)
+
+
+def legacy_validator() -> IValidator:
+    """The common artifact validator as it was before it was compiled: jsonschema
+    with enum types checked against sets of KeyedItem."""
+
+    type_checker = Draft7Validator.TYPE_CHECKER.redefine_many(
+        {
+            Field.CATEGORY.value: value_checker(default_config.Categories),
+            Field.ENTITY.value: value_checker(default_config.Entities),
+            Field.SOURCE.value: value_checker(default_config.Sources),
+            Field.CHAIN.value: value_checker(default_config.Chains),
+        }
+    )
+    return JsonValidator(schema=artifact_schema, type_checker=type_checker)
+
+
+def generate_items(rows: int, *, seed: int = 0) -> List[dict]:
+    return list(iter_common_items(rows, seed=seed))
+
+
+@click.command()
+@click.option("--rows", default=200_000, help="Number of items to validate.")
+@click.option("--repeat", default=3, help="Report the best of N runs.")
+def benchmark(rows: int, repeat: int):
+    items = generate_items(rows)
+    validators = {
+        "legacy": legacy_validator(),
+        "jsonschema": JsonValidator(schema=artifact_schema, type_checker=type_checker),
+        "compiled": common_artifact_validator,
+    }
+
+    baseline = None
+    for name, validator in validators.items():
+        elapsed = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            validator.validate(items)
+            elapsed = min(elapsed, time.perf_counter() - start)
+        baseline = baseline or elapsed
+        click.echo(
+            f"{name:>10}: {rows} items in {elapsed:.2f}s, "
+            f"{rows / elapsed:,.0f} items/s, {baseline / elapsed:.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -12,30 +12,78 @@
 # limitations under the License.
 import json
 import os
+from contextlib import ExitStack
+from importlib import import_module
 from pathlib import Path
-from typing import Optional, Union
+from typing import TYPE_CHECKING, Iterator, List, Optional, Tuple, Union
 
+from chainmeta_reader import metrics
+from chainmeta_reader.artifact import ArtifactPart
+from chainmeta_reader.artifact import iter_load as artifact_iter_load
+from chainmeta_reader.artifact import iter_load_columns as artifact_iter_load_columns
 from chainmeta_reader.artifact import load as artifact_load
-from chainmeta_reader.db import init_db
-from chainmeta_reader.db import search_chainmeta as search_chainmeta
-from chainmeta_reader.db import upload_chainmeta
-from chainmeta_reader.schema import resolve as schema_resolve
-from chainmeta_reader.validator import (
-    common_artifact_validator,
-    common_metadata_validator,
-)
+from chainmeta_reader.artifact import split as artifact_split
+from chainmeta_reader.columnar import Columns
+from chainmeta_reader.metadata import ChainmetaItem
+from chainmeta_reader.utils import chunked
 
+if TYPE_CHECKING:
+    from chainmeta_reader.contrib.chaintool import ChaintoolTranslator
+    from chainmeta_reader.db import (  # noqa: F401
+        init_db,
+        search_chainmeta,
+        search_chainmeta_many,
+        upload_chainmeta,
+        upload_columns,
+    )
+    from chainmeta_reader.schema import Schema
+
+"""Importing the package is cheap: the database, the schemas, the validators and
+the config are set up on first use. The modules below, which import SQLAlchemy
+and jsonschema, are imported by the functions using them.
+"""
+
+# Attributes of the package imported on first use, and their module
+_lazy_attributes = {
+    "init_db": "chainmeta_reader.db",
+    "search_chainmeta": "chainmeta_reader.db",
+    "search_chainmeta_many": "chainmeta_reader.db",
+    "upload_chainmeta": "chainmeta_reader.db",
+    "upload_columns": "chainmeta_reader.db",
+    "ChaintoolTranslator": "chainmeta_reader.contrib.chaintool",
+}
+
+
+def __getattr__(name: str):
+    if name in _lazy_attributes:
+        value = globals()[name] = getattr(import_module(_lazy_attributes[name]), name)
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def set_connection_string(connection_string: Optional[str] = None, **kw):
+    """Initialize the database connection, see init_db() for the pool options.
+
+    Without this call, the database is initialized from the CHAINMETA_DB_CONN
+    environment variable when it is first used.
+    """
+
+    from chainmeta_reader import db
 
-def set_connection_string(connection_string: Optional[str] = None):
     if not connection_string:
         connection_string = os.environ.get("CHAINMETA_DB_CONN")
 
     if connection_string:
-        init_db(connection_string)
+        db.init_db(connection_string, **kw)
 
 
 def validate(
-    fp, *, ignore_unrecognized=True, artifact_base_path: Union[str, Path, None], **kw
+    fp,
+    *,
+    ignore_unrecognized=True,
+    artifact_base_path: Union[str, Path, None],
+    workers: int = 1,
+    **kw,
 ):
     """Validate ``fp`` (a ``.read()``-supporting file-like object containing
     an open chain metadata document) against the open chain metadata rule set.
@@ -45,6 +93,8 @@ def validate(
         fp.read(),
         ignore_unrecognized=ignore_unrecognized,
         artifact_base_path=artifact_base_path,
+        workers=workers,
+        **kw,
     )
 
 
@@ -53,12 +103,41 @@ def validates(
     *,
     ignore_unrecognized=True,
     artifact_base_path: Union[str, Path, None],
+    workers: int = 1,
+    chunk_bytes: int = 64 << 20,
     **kw,
 ):
     """Validate ``s`` (a ``str``, ``bytes`` or ``bytearray`` instance containing
     an open chain metadata document) against the open chain metadata rule set.
+
+    With ``workers > 1``, artifacts are loaded, validated and translated in a
+    pool of ``workers`` processes. Csv artifacts larger than ``chunk_bytes`` are
+    split into parts that are processed independently. Results are merged in
+    document order, and an error raised while processing an artifact has its
+    path set as the ``artifact`` attribute.
     """
 
+    with metrics.timed("validates"):
+        return _validates(
+            s,
+            ignore_unrecognized=ignore_unrecognized,
+            artifact_base_path=artifact_base_path,
+            workers=workers,
+            chunk_bytes=chunk_bytes,
+        )
+
+
+def _validates(
+    s: str,
+    *,
+    ignore_unrecognized: bool,
+    artifact_base_path: Union[str, Path, None],
+    workers: int,
+    chunk_bytes: int,
+):
+    from chainmeta_reader.schema import resolve as schema_resolve
+    from chainmeta_reader.validator import common_metadata_validator
+
     metadata = json.loads(s)
 
     # Global validation
@@ -74,28 +153,124 @@ def validates(
     if not schema:
         return metadata
 
+    base_path: Optional[Path] = Path(artifact_base_path) if artifact_base_path else None
+    parts = [
+        (artifact, part)
+        for artifact in artifacts
+        for part in (
+            artifact_split(
+                artifact["path"],
+                fileformat=artifact["fileformat"],
+                base_path=base_path,
+                chunk_bytes=chunk_bytes,
+            )
+            if workers > 1
+            else [None]
+        )
+    ]
+
     loaded_artifacts: list = []
+    common_schema: list = []
+    with ExitStack() as stack:
+        if workers > 1:
+            from concurrent.futures import ProcessPoolExecutor
 
-    base_path: Optional[Path] = Path(artifact_base_path) if artifact_base_path else None
-    for artifact in artifacts:
+            executor = stack.enter_context(ProcessPoolExecutor(max_workers=workers))
+            stack.callback(executor.shutdown, cancel_futures=True)
+            results = [
+                executor.submit(_load_artifact_in_worker, raw_schema, a, base_path, p)
+                for a, p in parts
+            ]
+        for i, (artifact, part) in enumerate(parts):
+            try:
+                if workers > 1:
+                    loaded_artifact, common = results[i].result()
+                else:
+                    loaded_artifact, common = _load_artifact(
+                        raw_schema, artifact, base_path, part
+                    )
+            except Exception as e:
+                setattr(e, "artifact", artifact["path"])
+                raise
+            loaded_artifacts += loaded_artifact
+            common_schema += common
+
+    metadata["chainmetadata"]["raw_artifact"] = loaded_artifacts
+    metadata["chainmetadata"]["artifact"] = common_schema
+
+    return metadata
+
+
+def _load_artifact(
+    raw_schema: str,
+    artifact: dict,
+    base_path: Optional[Path],
+    part: Optional[ArtifactPart],
+) -> Tuple[list, list]:
+    """Load, validate and translate a single artifact, or a part of it.
+
+    This runs in worker processes when loading with ``workers > 1``, hence the
+    schema is resolved by path rather than passed in.
+    """
+
+    from chainmeta_reader.schema import resolve as schema_resolve
+
+    schema = schema_resolve(raw_schema)
+    assert schema is not None
+
+    with metrics.timed("artifact_load"):
         loaded_artifact = artifact_load(
             artifact["path"],
             fileformat=artifact["fileformat"],
             base_path=base_path,
+            part=part,
         )
+    if not isinstance(loaded_artifact, list):
         schema.validator.validate(loaded_artifact)
-        if isinstance(loaded_artifact, list):
-            loaded_artifacts += loaded_artifact
-    metadata["chainmetadata"]["raw_artifact"] = loaded_artifacts
-    common_schema = [schema.translator.to_common_schema(a) for a in loaded_artifacts]
-    common_artifact_validator.validate([c.__dict__ for c in common_schema])
-    metadata["chainmetadata"]["artifact"] = common_schema
+        return [], []
+    return loaded_artifact, _translate(schema, loaded_artifact)
 
-    return metadata
+
+def _translate(schema: "Schema", raw_items: list) -> list:
+    """Validate raw artifact items and translate them to the common schema."""
+
+    from chainmeta_reader.validator import common_artifact_validator
+
+    with metrics.timed("artifact_validate"):
+        schema.validator.validate(raw_items)
+    with metrics.timed("translate"):
+        common_schema: list = schema.translator.to_common_schema_batch(raw_items)
+    with metrics.timed("common_validate"):
+        common_artifact_validator.validate([c.__dict__ for c in common_schema])
+    metrics.count("items_loaded", len(common_schema))
+    return common_schema
+
+
+def _load_artifact_in_worker(*args) -> Tuple[list, list]:
+    from jsonschema import ValidationError
+
+    try:
+        return _load_artifact(*args)
+    except ValidationError as e:
+        # Validation errors hold references to the validator, which cannot be
+        # pickled back to the parent process, keep only the error details.
+        raise ValidationError(
+            e.message,
+            validator=e.validator,
+            path=e.path,
+            schema_path=e.schema_path,
+            instance=e.instance,
+            validator_value=e.validator_value,
+        ) from None
 
 
 def load(
-    fp, *, ignore_unrecognized=True, artifact_base_path: Union[str, Path, None], **kw
+    fp,
+    *,
+    ignore_unrecognized=True,
+    artifact_base_path: Union[str, Path, None],
+    workers: int = 1,
+    **kw,
 ):
     """Deserialize ``fp`` (a ``.read()``-supporting file-like object containing
     an open chain metadata document) to a Python object.
@@ -105,6 +280,7 @@ def load(
         fp.read(),
         ignore_unrecognized=ignore_unrecognized,
         artifact_base_path=artifact_base_path,
+        workers=workers,
         **kw,
     )
 
@@ -114,28 +290,218 @@ def loads(
     *,
     ignore_unrecognized=True,
     artifact_base_path: Union[str, Path, None],
+    workers: int = 1,
     **kw,
 ):
     """Deserialize ``s`` (a ``str``, ``bytes`` or ``bytearray`` instance containing
     an open chain metadata document) to a Python object.
+
+    See validates() for the ``workers`` option.
     """
     return validates(
         s,
         ignore_unrecognized=ignore_unrecognized,
         artifact_base_path=artifact_base_path,
+        workers=workers,
         **kw,
     )
 
 
-set_connection_string()
+def _iter_artifacts(
+    schema: "Schema",
+    artifacts: List[dict],
+    *,
+    base_path: Optional[Path],
+    chunk_size: int,
+) -> Iterator[ChainmetaItem]:
+    for artifact in artifacts:
+        raw_items = artifact_iter_load(
+            artifact["path"],
+            fileformat=artifact["fileformat"],
+            base_path=base_path,
+        )
+        for chunk in chunked(raw_items, chunk_size):
+            yield from _translate(schema, chunk)
+
+
+def iter_load(
+    fp,
+    *,
+    ignore_unrecognized=True,
+    artifact_base_path: Union[str, Path, None],
+    chunk_size: int = 1000,
+    **kw,
+) -> Iterator[ChainmetaItem]:
+    """Deserialize ``fp`` (a ``.read()``-supporting file-like object containing
+    an open chain metadata document) to an iterator of ChainmetaItem.
+    """
+
+    return iter_loads(
+        fp.read(),
+        ignore_unrecognized=ignore_unrecognized,
+        artifact_base_path=artifact_base_path,
+        chunk_size=chunk_size,
+        **kw,
+    )
+
+
+def iter_loads(
+    s: str,
+    *,
+    ignore_unrecognized=True,
+    artifact_base_path: Union[str, Path, None],
+    chunk_size: int = 1000,
+    **kw,
+) -> Iterator[ChainmetaItem]:
+    """Deserialize ``s`` (a ``str``, ``bytes`` or ``bytearray`` instance containing
+    an open chain metadata document) to an iterator of ChainmetaItem.
+
+    Artifacts are read, validated and translated ``chunk_size`` items at a time,
+    so memory usage is bounded regardless of the size of the artifacts. The
+    document itself is validated immediately, artifact errors are raised while
+    iterating.
+    """
+
+    schema, artifacts = _resolve_document(s, ignore_unrecognized=ignore_unrecognized)
+    if not schema:
+        return iter(())
+
+    base_path: Optional[Path] = Path(artifact_base_path) if artifact_base_path else None
+    return _iter_artifacts(
+        schema, artifacts, base_path=base_path, chunk_size=chunk_size
+    )
+
+
+def _resolve_document(
+    s: str, *, ignore_unrecognized: bool
+) -> Tuple[Optional["Schema"], List[dict]]:
+    """Validate a document, return the schema and the artifacts of the
+    document."""
+
+    from chainmeta_reader.schema import resolve as schema_resolve
+    from chainmeta_reader.validator import common_metadata_validator
+
+    metadata = json.loads(s)
+
+    # Global validation
+    common_metadata_validator.validate(metadata)
+    raw_schema = metadata["chainmetadata"]["schema"]
+    artifacts = metadata["chainmetadata"]["artifact"]
+
+    schema = schema_resolve(raw_schema)
+    if not schema and not ignore_unrecognized:
+        raise ValueError(f"schema {raw_schema} not registered")
+    return schema, artifacts
+
+
+def _translate_columns(schema: "Schema", columns: Columns) -> Columns:
+    """Validate raw artifact columns and translate them to the common schema,
+    see _translate()."""
+
+    from chainmeta_reader.validator import common_artifact_validator
+
+    with metrics.timed("artifact_validate"):
+        schema.validator.validate_columns(columns)
+    with metrics.timed("translate"):
+        common_schema = schema.translator.to_common_columns(columns)
+    with metrics.timed("common_validate"):
+        common_artifact_validator.validate_columns(common_schema)
+    metrics.count("items_loaded", len(common_schema))
+    return common_schema
+
+
+def _iter_artifact_columns(
+    schema: "Schema",
+    artifacts: List[dict],
+    *,
+    base_path: Optional[Path],
+    chunk_rows: int,
+) -> Iterator[Columns]:
+    for artifact in artifacts:
+        if artifact["fileformat"].lower() == "csv":
+            for columns in artifact_iter_load_columns(
+                artifact["path"],
+                fileformat=artifact["fileformat"],
+                base_path=base_path,
+                chunk_rows=chunk_rows,
+            ):
+                yield _translate_columns(schema, columns)
+            continue
+
+        raw_items = artifact_iter_load(
+            artifact["path"],
+            fileformat=artifact["fileformat"],
+            base_path=base_path,
+        )
+        for chunk in chunked(raw_items, chunk_rows):
+            raw_columns = Columns.from_rows(chunk)
+            if raw_columns is None:
+                # Items with different fields are translated row by row
+                yield Columns.from_items(_translate(schema, chunk))
+            else:
+                yield _translate_columns(schema, raw_columns)
+
+
+def iter_load_columns(
+    fp,
+    *,
+    ignore_unrecognized=True,
+    artifact_base_path: Union[str, Path, None],
+    chunk_rows: int = 100_000,
+) -> Iterator[Columns]:
+    """Deserialize ``fp`` (a ``.read()``-supporting file-like object containing
+    an open chain metadata document) to an iterator of columns of the common
+    schema.
+    """
+
+    return iter_loads_columns(
+        fp.read(),
+        ignore_unrecognized=ignore_unrecognized,
+        artifact_base_path=artifact_base_path,
+        chunk_rows=chunk_rows,
+    )
+
+
+def iter_loads_columns(
+    s: str,
+    *,
+    ignore_unrecognized=True,
+    artifact_base_path: Union[str, Path, None],
+    chunk_rows: int = 100_000,
+) -> Iterator[Columns]:
+    """Deserialize ``s`` (a ``str``, ``bytes`` or ``bytearray`` instance containing
+    an open chain metadata document) to an iterator of columns of the common
+    schema, for bulk loads with upload_columns().
+
+    Like iter_loads(), artifacts are read, validated and translated
+    ``chunk_rows`` rows at a time, as columns rather than as objects: csv
+    artifacts are never loaded as dicts, and the columns with few distinct
+    values are validated and translated once per distinct value.
+    """
+
+    schema, artifacts = _resolve_document(s, ignore_unrecognized=ignore_unrecognized)
+    if not schema:
+        return iter(())
+
+    base_path: Optional[Path] = Path(artifact_base_path) if artifact_base_path else None
+    return _iter_artifact_columns(
+        schema, artifacts, base_path=base_path, chunk_rows=chunk_rows
+    )
+
 
 __all__ = [
     "validate",
     "validates",
     "load",
     "loads",
+    "iter_load",
+    "iter_loads",
+    "iter_load_columns",
+    "iter_loads_columns",
     "upload_chainmeta",
+    "upload_columns",
     "search_chainmeta",
+    "search_chainmeta_many",
     "ChaintoolTranslator",
     "set_connection_string",
 ]
@@ -11,22 +11,52 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import io
 import json
+import mmap
+import os
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Optional, no_type_check
+from typing import IO, Callable, Dict, Iterator, List, Optional, no_type_check
+
+from chainmeta_reader.columnar import Column, Columns
 
 file_prefix = "file:///"
 
 
-def local_loader(uri: str, *, base_path: Optional[Path] = None) -> str:
+@dataclass(frozen=True)
+class ArtifactPart:
+    """A line-aligned byte range of a csv artifact, see split()."""
+
+    field_names: List[str]
+    start: int
+    end: int
+    first_line: int
+
+
+def local_path(uri: str, *, base_path: Optional[Path] = None) -> Path:
     if not base_path:
         raise ValueError("missing artifact base path for local artifact file")
     relative_path = uri[len(file_prefix) :]
-    resolved_path = base_path.joinpath(relative_path)
-    with open(resolved_path) as f:
+    return base_path.joinpath(relative_path)
+
+
+def local_loader(uri: str, *, base_path: Optional[Path] = None) -> str:
+    with open(local_path(uri, base_path=base_path)) as f:
         return f.read()
 
 
+def local_opener(
+    uri: str, *, base_path: Optional[Path] = None, part: Optional[ArtifactPart] = None
+) -> IO[str]:
+    resolved_path = local_path(uri, base_path=base_path)
+    if part is None:
+        return open(resolved_path)
+    with open(resolved_path, "rb") as f:
+        f.seek(part.start)
+        return io.TextIOWrapper(io.BytesIO(f.read(part.end - part.start)))
+
+
 @no_type_check
 def s3_loader(uri: str, **kw) -> str:
     pass
@@ -42,26 +72,159 @@ def json_parser(c: str) -> object:
 
 
 def csv_parser(c: str) -> object:
-    meta_data = []
-    try:
-        # first line is header, the separator between fields is '\t'
-        rows = c.split("\n")
-        filed_names = rows[0].split("\t")
-        for i in range(1, len(rows)):
-            row = rows[i]
-            if not row:
+    return list(csv_iter_parser(io.StringIO(c)))
+
+
+class ArtifactParseError(ValueError):
+    """Raised when an artifact file is malformed."""
+
+    def __init__(self, message: str, line: int):
+        super().__init__(f"line {line}: {message}")
+        self.message = message
+        self.line = line
+
+    def __reduce__(self):
+        return ArtifactParseError, (self.message, self.line)
+
+
+def json_iter_parser(f: IO[str]) -> Iterator[object]:
+    # A JSON artifact is a single document, so it has to be decoded as a whole
+    # before its items can be handed out one by one.
+    c = json.load(f)
+    if isinstance(c, list):
+        yield from c
+    else:
+        yield c
+
+
+def csv_iter_parser(
+    f: IO[str],
+    *,
+    separator: str = "\t",
+    block_size: int = 1 << 20,
+    intern_limit: int = 4096,
+    field_names: Optional[List[str]] = None,
+    first_line: int = 1,
+) -> Iterator[Dict[str, Optional[str]]]:
+    """Parse a csv artifact incrementally, yielding one dict per row.
+
+    The first line is the header, unless ``field_names`` is given, in which case
+    ``f`` only contains rows starting at line ``first_line``. The file is read
+    ``block_size`` characters at a time. Values of low-cardinality columns (chain,
+    source, categories, ...) are interned so that repeated values share a single
+    string object; a column stops being interned once it has more than
+    ``intern_limit`` distinct values. Empty values are returned as None.
+    """
+
+    lineno = first_line - 1
+    field_range = range(len(field_names) if field_names else 0)
+    caches: List[Dict[str, Optional[str]]] = [{"": None} for _ in field_range]
+    lookups: List[Callable] = [c.setdefault for c in caches]
+
+    for lines in _iter_blocks(f, block_size):
+        for line in lines:
+            lineno += 1
+            if not line:
+                continue
+            values = line.split(separator)
+
+            if field_names is None:
+                field_names = values
+                field_range = range(len(field_names))
+                caches = [{"": None} for _ in field_names]
+                lookups = [c.setdefault for c in caches]
+                continue
+
+            if len(values) != len(field_range):
+                raise ArtifactParseError(
+                    f"expected {len(field_range)} fields, got {len(values)}",
+                    line=lineno,
+                )
+            row = {}
+            for i in field_range:
+                v = values[i]
+                row[field_names[i]] = lookups[i](v, v)
+            yield row
+
+        for i, cache in enumerate(caches):
+            if len(cache) > intern_limit:
+                # High-cardinality column, e.g. address: stop interning
+                caches[i] = {"": None}
+                lookups[i] = caches[i].get
+
+
+def csv_iter_columns(
+    f: IO[str],
+    *,
+    separator: str = "\t",
+    block_size: int = 1 << 20,
+    chunk_rows: int = 100_000,
+    field_names: Optional[List[str]] = None,
+    first_line: int = 1,
+) -> Iterator[Columns]:
+    """Parse a csv artifact incrementally into columns of ``chunk_rows`` rows,
+    the last one may be shorter.
+
+    Like csv_iter_parser(), without building a dict per row: the values of each
+    chunk are transposed into columns, which are dictionary encoded unless they
+    have many distinct values. Empty values are None.
+    """
+
+    lineno = first_line - 1
+    rows: List[List[str]] = []
+    for lines in _iter_blocks(f, block_size):
+        for line in lines:
+            lineno += 1
+            if not line:
+                continue
+            values = line.split(separator)
+
+            if field_names is None:
+                field_names = values
                 continue
-            dic: Dict[str, Optional[str]] = {}
-            arr = row.split("\t")
-            for j in range(0, len(filed_names)):
-                if arr[j] == "":
-                    dic[filed_names[j]] = None
-                else:
-                    dic[filed_names[j]] = arr[j]
-            meta_data.append(dic)
-        return meta_data
-    finally:
-        return meta_data
+
+            if len(values) != len(field_names):
+                raise ArtifactParseError(
+                    f"expected {len(field_names)} fields, got {len(values)}",
+                    line=lineno,
+                )
+            rows.append(values)
+            if len(rows) >= chunk_rows:
+                yield _csv_columns(field_names, rows)
+                rows = []
+
+    if rows:
+        assert field_names is not None
+        yield _csv_columns(field_names, rows)
+
+
+def _csv_columns(field_names: List[str], rows: List[List[str]]) -> Columns:
+    columns = {}
+    for name, values in zip(field_names, zip(*rows)):
+        column = Column.encode(values)
+        if column.codes is None:
+            columns[name] = Column([v or None for v in column.values])
+        else:
+            columns[name] = column.map(lambda v: v or None)
+    return Columns(columns, len(rows))
+
+
+def _iter_blocks(f: IO[str], block_size: int) -> Iterator[List[str]]:
+    """Read ``f`` ``block_size`` characters at a time, yield the complete
+    lines read with each block."""
+
+    buffer = ""
+    while True:
+        block = f.read(block_size)
+        text = buffer + block
+        lines = text.split("\n")
+        # The last line may be incomplete until the next block is read
+        buffer = lines.pop() if block else ""
+        if "\r" in text:
+            lines = [line.rstrip("\r") for line in lines]
+        yield lines
+        if not block:
+            return
 
 
 parsers = {
@@ -72,9 +235,123 @@ parsers = {
 }
 
 
-def load(uri: str, fileformat: str, *, base_path: Optional[Path] = None) -> object:
+def load(
+    uri: str,
+    fileformat: str,
+    *,
+    base_path: Optional[Path] = None,
+    part: Optional[ArtifactPart] = None,
+) -> object:
+    if part is not None:
+        return list(iter_load(uri, fileformat, base_path=base_path, part=part))
+
     loader = local_loader if uri.lower().startswith(file_prefix) else None
     parser = parsers.get(fileformat)
     if loader and parser:
         return parser(loader(uri, base_path=base_path))
     raise ValueError("unsupported artifact type")
+
+
+def split(
+    uri: str,
+    fileformat: str,
+    *,
+    base_path: Optional[Path] = None,
+    chunk_bytes: int = 64 << 20,
+) -> List[Optional[ArtifactPart]]:
+    """Split an artifact into parts of roughly ``chunk_bytes`` that can be loaded
+    independently with load(..., part=part).
+
+    Only local csv artifacts can be split. Other artifacts, and artifacts smaller
+    than ``chunk_bytes``, are returned as a single ``None`` part, i.e. the whole
+    artifact.
+    """
+
+    if fileformat.lower() != "csv" or not uri.lower().startswith(file_prefix):
+        return [None]
+    resolved_path = local_path(uri, base_path=base_path)
+    size = os.path.getsize(resolved_path)
+    if size <= chunk_bytes:
+        return [None]
+
+    parts: List[Optional[ArtifactPart]] = []
+    with open(resolved_path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            start = m.find(b"\n") + 1
+            if start == 0:
+                return [None]
+            field_names = m[:start].decode().rstrip("\r\n").split("\t")
+            line = 2
+            while start < size:
+                end = m.find(b"\n", start + chunk_bytes - 1)
+                end = size if end < 0 else end + 1
+                parts.append(ArtifactPart(field_names, start, end, line))
+                line += m[start:end].count(b"\n")
+                start = end
+    return parts
+
+
+iter_parsers: Dict[str, Callable[[IO[str]], Iterator[object]]] = {
+    "json": json_iter_parser,
+    "JSON": json_iter_parser,
+    "csv": csv_iter_parser,
+    "CSV": csv_iter_parser,
+}
+
+
+def iter_load(
+    uri: str,
+    fileformat: str,
+    *,
+    base_path: Optional[Path] = None,
+    part: Optional[ArtifactPart] = None,
+) -> Iterator[object]:
+    """Load an artifact lazily, yielding one raw item at a time.
+
+    Unlike load(), the artifact file is read incrementally where the file format
+    allows it, so memory usage does not grow with the size of the artifact.
+    """
+
+    opener = local_opener if uri.lower().startswith(file_prefix) else None
+    parser = iter_parsers.get(fileformat)
+    if not opener or not parser:
+        raise ValueError("unsupported artifact type")
+
+    with opener(uri, base_path=base_path, part=part) as f:
+        if part is None:
+            yield from parser(f)
+        else:
+            yield from csv_iter_parser(
+                f, field_names=part.field_names, first_line=part.first_line
+            )
+
+
+def iter_load_columns(
+    uri: str,
+    fileformat: str,
+    *,
+    base_path: Optional[Path] = None,
+    part: Optional[ArtifactPart] = None,
+    chunk_rows: int = 100_000,
+) -> Iterator[Columns]:
+    """Load a csv artifact lazily, yielding columns of ``chunk_rows`` rows, see
+    csv_iter_columns().
+
+    Only csv artifacts, which are tabular by construction, can be loaded as
+    columns: load other artifacts with iter_load().
+    """
+
+    opener = local_opener if uri.lower().startswith(file_prefix) else None
+    if not opener or fileformat.lower() != "csv":
+        raise ValueError("unsupported artifact type for columnar loading")
+
+    with opener(uri, base_path=base_path, part=part) as f:
+        if part is None:
+            yield from csv_iter_columns(f, chunk_rows=chunk_rows)
+        else:
+            yield from csv_iter_columns(
+                f,
+                chunk_rows=chunk_rows,
+                field_names=part.field_names,
+                first_line=part.first_line,
+            )
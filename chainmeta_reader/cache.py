@@ -0,0 +1,276 @@
+# Copyright 2023 The chainmetareader Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import sys
+import threading
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, fields, replace
+from time import monotonic
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from chainmeta_reader.metadata import ChainmetaItem
+
+"""This module provides an in-process cache of chain metadata search results.
+"""
+
+CacheKey = Tuple[Tuple[str, str], ...]
+
+# Filters that can be cached, they must select a single address
+_cacheable_filters = frozenset(["chain", "address", "submitted_by"])
+_item_fields = [f.name for f in fields(ChainmetaItem)]
+
+
+def filter_key(filter: dict) -> Optional[CacheKey]:
+    """Normalize a search filter into a cache key, or None if the results of
+    the filter should not be cached."""
+
+    if "address" not in filter or not _cacheable_filters.issuperset(filter):
+        return None
+    return tuple(sorted((k, str(v)) for k, v in filter.items()))
+
+
+@dataclass
+class CacheStats:
+    """Snapshot of the state of a label cache."""
+
+    entries: int
+    size_bytes: int
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    invalidations: int
+
+
+@dataclass
+class _Entry:
+    items: List[ChainmetaItem]
+    size: int
+    expires_at: float
+
+
+def _copy(item: ChainmetaItem) -> ChainmetaItem:
+    return replace(item, categories=list(item.categories))
+
+
+def _sizeof(key: CacheKey, items: List[ChainmetaItem]) -> int:
+    """Approximate memory used by a cache entry, strings shared with other
+    entries are counted in each of them."""
+
+    size = sys.getsizeof(items) + sum(sys.getsizeof(v) for _, v in key)
+    for item in items:
+        size += sys.getsizeof(item) + sys.getsizeof(item.categories)
+        size += sum(sys.getsizeof(getattr(item, f)) for f in _item_fields)
+        size += sum(sys.getsizeof(c) for c in item.categories)
+    return size
+
+
+class LabelCache:
+    """Bounded LRU cache of search results with a time to live.
+
+    Results are keyed by normalized filter, see filter_key(). The least
+    recently used entries are evicted once the cache holds more than
+    ``max_bytes``, and entries expire ``ttl`` seconds after being loaded.
+    Entries of an address are invalidated when it is uploaded to, which only
+    covers uploads done by this process: the ``ttl`` bounds how long changes
+    made by other processes go unnoticed.
+    """
+
+    def __init__(self, *, max_bytes: int = 64 << 20, ttl: float = 300.0):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[CacheKey, _Entry]" = OrderedDict()
+        self._keys_by_address: Dict[str, Set[CacheKey]] = defaultdict(set)
+        # Loads in progress, removed when invalidated so that their results,
+        # which may predate the upload, are not cached
+        self._loading: Dict[object, CacheKey] = {}
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get_or_load(
+        self, key: CacheKey, loader: Callable[[], List[ChainmetaItem]]
+    ) -> List[ChainmetaItem]:
+        """Return the cached results for ``key``, calling ``loader`` on a miss.
+
+        The results are copies, they can be modified by the caller.
+        """
+
+        items, token = self._get(key)
+        if items is not None:
+            return items
+        try:
+            items = loader()
+        finally:
+            self._loaded(key, token, items)
+        return items
+
+    async def get_or_load_async(
+        self, key: CacheKey, loader: Callable[[], Awaitable[List[ChainmetaItem]]]
+    ) -> List[ChainmetaItem]:
+        """Like get_or_load(), with a coroutine function as ``loader``."""
+
+        items, token = self._get(key)
+        if items is not None:
+            return items
+        try:
+            items = await loader()
+        finally:
+            self._loaded(key, token, items)
+        return items
+
+    def get_or_load_many(
+        self,
+        keys: List[CacheKey],
+        loader: Callable[[List[CacheKey]], Dict[CacheKey, List[ChainmetaItem]]],
+    ) -> Dict[CacheKey, List[ChainmetaItem]]:
+        """Like get_or_load() for many keys, ``loader`` is called once with the
+        keys missing from the cache, and returns the results of each of them."""
+
+        results, tokens = self._get_many(keys)
+        loaded = None
+        try:
+            loaded = loader(list(tokens)) if tokens else {}
+        finally:
+            self._loaded_many(tokens, loaded)
+        results.update(loaded)
+        return results
+
+    async def get_or_load_many_async(
+        self,
+        keys: List[CacheKey],
+        loader: Callable[
+            [List[CacheKey]], Awaitable[Dict[CacheKey, List[ChainmetaItem]]]
+        ],
+    ) -> Dict[CacheKey, List[ChainmetaItem]]:
+        """Like get_or_load_many(), with a coroutine function as ``loader``."""
+
+        results, tokens = self._get_many(keys)
+        loaded = None
+        try:
+            loaded = await loader(list(tokens)) if tokens else {}
+        finally:
+            self._loaded_many(tokens, loaded)
+        results.update(loaded)
+        return results
+
+    def _get_many(
+        self, keys: List[CacheKey]
+    ) -> Tuple[Dict[CacheKey, List[ChainmetaItem]], Dict[CacheKey, object]]:
+        results = {}
+        tokens = {}
+        for key in keys:
+            items, token = self._get(key)
+            if items is not None:
+                results[key] = items
+            else:
+                tokens[key] = token
+        return results, tokens
+
+    def _loaded_many(
+        self,
+        tokens: Dict[CacheKey, object],
+        loaded: Optional[Dict[CacheKey, List[ChainmetaItem]]],
+    ):
+        for key, token in tokens.items():
+            self._loaded(key, token, loaded.get(key) if loaded is not None else None)
+
+    def _get(self, key: CacheKey) -> Tuple[Optional[List[ChainmetaItem]], object]:
+        """Return copies of the cached results, or None and a token identifying
+        the load of the results on a miss."""
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= monotonic():
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return [_copy(i) for i in entry.items], None
+            self.misses += 1
+            token = object()
+            self._loading[token] = key
+            return None, token
+
+    def _loaded(self, key: CacheKey, token: object, items: Optional[list]):
+        """Cache the results of a load, unless it failed or was invalidated."""
+
+        if items is None:
+            with self._lock:
+                self._loading.pop(token, None)
+            return
+
+        cached = [_copy(i) for i in items]
+        size = _sizeof(key, cached)
+        with self._lock:
+            if self._loading.pop(token, None) is not None and size <= self.max_bytes:
+                self._put(key, cached, size)
+
+    def _put(self, key: CacheKey, items: List[ChainmetaItem], size: int):
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = _Entry(items, size, monotonic() + self.ttl)
+        self._keys_by_address[dict(key)["address"]].add(key)
+        self.size_bytes += size
+        while self.size_bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _remove(self, key: CacheKey):
+        entry = self._entries.pop(key)
+        self.size_bytes -= entry.size
+        address = dict(key)["address"]
+        keys = self._keys_by_address[address]
+        keys.discard(key)
+        if not keys:
+            del self._keys_by_address[address]
+
+    def invalidate(self, chain: str, address: str):
+        """Drop the cached results of filters matching ``address`` on ``chain``."""
+
+        def _matches(key: CacheKey) -> bool:
+            return dict(key).get("chain", chain) == chain
+
+        with self._lock:
+            for token, key in list(self._loading.items()):
+                if dict(key)["address"] == address and _matches(key):
+                    del self._loading[token]
+            for key in list(self._keys_by_address.get(address, ())):
+                if _matches(key):
+                    self._remove(key)
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_address.clear()
+            self._loading.clear()
+            self.size_bytes = 0
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                entries=len(self._entries),
+                size_bytes=self.size_bytes,
+                hits=self.hits,
+                misses=self.misses,
+                evictions=self.evictions,
+                expirations=self.expirations,
+                invalidations=self.invalidations,
+            )
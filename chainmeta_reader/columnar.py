@@ -0,0 +1,201 @@
+# Copyright 2023 The chainmetareader Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from array import array
+from dataclasses import fields
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from chainmeta_reader.metadata import ChainmetaItem
+
+"""This module provides a columnar representation of artifacts, to load them
+in bulk without a Python object per row.
+
+Artifacts are tabular, and most of their columns (chain, entity, source,
+categories, dates, ...) hold a few distinct values. Such columns are
+dictionary encoded: the distinct values are stored once, and each row holds
+the integer code of its value. Checks and translations of these columns run
+once per distinct value rather than once per row. Columns with many distinct
+values, e.g. addresses, are stored as plain lists.
+
+Arrays are stored as tuples, so that they can be dictionary encoded.
+"""
+
+common_fields = [f.name for f in fields(ChainmetaItem)]
+
+# Columns with more distinct values are stored as plain lists
+dictionary_limit = 4096
+_encode_block = 1 << 16
+
+
+def json_value(value: Any) -> Any:
+    """Return a value of a column as it is in a row: arrays as lists."""
+
+    return list(value) if isinstance(value, tuple) else value
+
+
+class Column:
+    """A column of values, dictionary encoded if ``codes`` is not None: the
+    value of row ``i`` is then ``values[codes[i]]``, else ``values[i]``."""
+
+    __slots__ = ("values", "codes")
+
+    def __init__(self, values: List[Any], codes: Optional[array] = None):
+        self.values = values
+        self.codes = codes
+
+    @classmethod
+    def encode(cls, values: Sequence, *, limit: int = dictionary_limit) -> "Column":
+        """Dictionary encode ``values``, unless they have more than ``limit``
+        distinct values or are not hashable."""
+
+        index: Dict[Any, int] = {}
+        codes = array("I")
+        try:
+            for start in range(0, len(values), _encode_block):
+                block = values[start : start + _encode_block]
+                codes.extend([index.setdefault(v, len(index)) for v in block])
+                if len(index) > limit:
+                    return cls(list(values))
+        except TypeError:
+            return cls(list(values))
+        return cls(list(index), codes)
+
+    def __len__(self) -> int:
+        return len(self.values if self.codes is None else self.codes)
+
+    def __iter__(self) -> Iterator[Any]:
+        if self.codes is None:
+            return iter(self.values)
+        return map(self.values.__getitem__, self.codes)
+
+    def __getitem__(self, row: int) -> Any:
+        if self.codes is None:
+            return self.values[row]
+        return self.values[self.codes[row]]
+
+    def map(self, function: Callable[[Any], Any]) -> "Column":
+        """Return a column of ``function`` applied to the values, once per
+        distinct value of a dictionary encoded column."""
+
+        return Column([function(v) for v in self.values], self.codes)
+
+    def find_invalid(self, valid: Callable[[Any], bool]) -> int:
+        """Return the first row whose value is not ``valid``, -1 if there is
+        none. ``valid`` runs once per distinct value of a dictionary encoded
+        column."""
+
+        if self.codes is None:
+            return next(
+                (i for i, ok in enumerate(map(valid, self.values)) if not ok), -1
+            )
+        invalid = {c for c, v in enumerate(self.values) if not valid(v)}
+        if not invalid:
+            return -1
+        return next(i for i, c in enumerate(self.codes) if c in invalid)
+
+    def slice(self, start: int, end: int) -> "Column":
+        if self.codes is None:
+            return Column(self.values[start:end])
+        return Column(self.values, self.codes[start:end])
+
+
+class Columns:
+    """Columns of a table by name, all of the same length."""
+
+    __slots__ = ("columns", "length")
+
+    def __init__(self, columns: Dict[str, Column], length: int):
+        self.columns = columns
+        self.length = length
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[dict]) -> Optional["Columns"]:
+        """Transpose rows into columns, return None if the rows do not all
+        have the same fields."""
+
+        if not rows:
+            return cls({}, 0)
+        if not all(isinstance(r, dict) for r in rows):
+            return None
+        keys = rows[0].keys()
+        if any(r.keys() != keys for r in rows):
+            return None
+        return cls(
+            {
+                name: Column.encode(
+                    [tuple(v) if isinstance(v, list) else v for v in values]
+                )
+                for name, values in zip(keys, zip(*(r.values() for r in rows)))
+            },
+            len(rows),
+        )
+
+    @classmethod
+    def from_items(cls, items: Sequence[ChainmetaItem]) -> "Columns":
+        """Return the columns of items of the common schema."""
+
+        if not items:
+            return cls({f: Column([]) for f in common_fields}, 0)
+        columns = cls.from_rows([i.__dict__ for i in items])
+        assert columns is not None
+        return columns
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, name: str) -> Column:
+        return self.columns[name]
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.columns
+
+    @property
+    def names(self) -> List[str]:
+        return list(self.columns)
+
+    def row(self, row: int) -> dict:
+        return {n: json_value(c[row]) for n, c in self.columns.items()}
+
+    def rows(self) -> List[dict]:
+        """Return the rows of the table, as loaded by the row-oriented API."""
+
+        names = self.names
+        values: List[Iterable] = [
+            map(json_value, c)
+            if any(isinstance(v, tuple) for v in c.values)
+            else iter(c)
+            for c in self.columns.values()
+        ]
+        return [dict(zip(names, r)) for r in zip(*values)]
+
+    def to_items(self) -> List[ChainmetaItem]:
+        """Return the rows of columns of the common schema as items."""
+
+        return [ChainmetaItem(**r) for r in self.rows()]
+
+    def slice(self, start: int, end: int) -> "Columns":
+        end = min(end, self.length)
+        return Columns(
+            {n: c.slice(start, end) for n, c in self.columns.items()},
+            max(end - start, 0),
+        )
+
+    def chunks(self, size: int) -> Iterator["Columns"]:
+        """Split the table into tables of ``size`` rows, the last one may be
+        shorter."""
+
+        if self.length <= size:
+            yield self
+            return
+        for start in range(0, self.length, size):
+            yield self.slice(start, start + size)
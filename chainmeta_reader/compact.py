@@ -0,0 +1,135 @@
+# Copyright 2023 The chainmetareader Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from dataclasses import fields
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from chainmeta_reader.config import default_config
+from chainmeta_reader.metadata import ChainmetaItem
+
+"""This module provides a compact in-memory representation of chain metadata
+items, to hold large datasets in memory.
+
+Values repeated across items (chain, entity, categories, source, submitted_by
+and submitted_on) are interned: all items share a single instance of each
+value, and keys of the default config resolve to the config strings. Each
+combination of categories is stored once, as a tuple, which keeps the order
+of the categories.
+"""
+
+_fields = tuple(f.name for f in fields(ChainmetaItem))
+
+# Interned values are never released, only values which repeat across items,
+# and thus are bounded by the taxonomy and the submitters, are interned
+_strings: Dict[str, str] = {
+    i.key: i.key
+    for i in [
+        *default_config.Chains,
+        *default_config.Entities,
+        *default_config.Categories,
+        *default_config.Sources,
+    ]
+}
+_categories: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    if value is None:
+        return None
+    return _strings.setdefault(value, value)
+
+
+def _intern_categories(categories: Iterable[str]) -> Tuple[str, ...]:
+    key = tuple(_strings.setdefault(c, c) for c in categories)
+    return _categories.setdefault(key, key)
+
+
+class CompactChainmetaItem:
+    """Slotted, interned equivalent of ChainmetaItem.
+
+    It has the attributes of ChainmetaItem, with ``categories`` as a tuple, so
+    it can be uploaded with upload_chainmeta() as is. Use from_item() and
+    to_item(), or from_dict() and to_dict(), to convert from and to the common
+    schema.
+    """
+
+    __slots__ = _fields
+
+    chain: str
+    address: str
+    entity: Optional[str]
+    name: Optional[str]
+    categories: Tuple[str, ...]
+    source: str
+    submitted_by: str
+    submitted_on: str
+
+    def __init__(
+        self,
+        chain: str,
+        address: str,
+        entity: Optional[str],
+        name: Optional[str],
+        categories: Iterable[str],
+        source: str,
+        submitted_by: str,
+        submitted_on: str,
+    ):
+        self.chain = _strings.setdefault(chain, chain)
+        self.address = address
+        self.entity = _intern(entity)
+        self.name = name
+        self.categories = _intern_categories(categories)
+        self.source = _strings.setdefault(source, source)
+        self.submitted_by = _strings.setdefault(submitted_by, submitted_by)
+        self.submitted_on = _strings.setdefault(submitted_on, submitted_on)
+
+    @classmethod
+    def from_item(cls, item: ChainmetaItem) -> "CompactChainmetaItem":
+        return cls(*(getattr(item, f) for f in _fields))
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "CompactChainmetaItem":
+        """Create an item from the ``__dict__`` form of ChainmetaItem."""
+
+        return cls(**d)
+
+    def to_item(self) -> ChainmetaItem:
+        return ChainmetaItem(**self.to_dict())
+
+    def to_dict(self) -> dict:
+        """Return the ``__dict__`` form of the equivalent ChainmetaItem."""
+
+        d = {f: getattr(self, f) for f in _fields}
+        d["categories"] = list(self.categories)
+        return d
+
+    def _values(self) -> tuple:
+        return tuple(getattr(self, f) for f in _fields)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, CompactChainmetaItem):
+            return NotImplemented
+        return self._values() == other._values()
+
+    def __repr__(self) -> str:
+        values = ", ".join(f"{f}={getattr(self, f)!r}" for f in _fields)
+        return f"CompactChainmetaItem({values})"
+
+    def __reduce__(self):
+        # Values are interned again when unpickled, in worker processes
+        return CompactChainmetaItem, self._values()
+
+
+def compact(items: Iterable[ChainmetaItem]) -> List[CompactChainmetaItem]:
+    return [CompactChainmetaItem.from_item(i) for i in items]
@@ -11,11 +11,19 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import hashlib
 import json
+import marshal
 import os
 import re
-from dataclasses import dataclass
-from typing import Set
+from dataclasses import astuple, dataclass, field
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, Optional, Set, Tuple
+
+from chainmeta_reader.constants import Field
+
+# Bump when the format of the compiled config changes
+_compiled_version = 1
 
 
 @dataclass
@@ -55,12 +63,64 @@ class Category(KeyedItem):
         return super().__eq__(__value)
 
 
+class KeyTable:
+    """The keys of a config attribute, as a frozenset, and their integer ids,
+    which are the positions of the keys in sorted order."""
+
+    __slots__ = ("keys", "ids", "key_set")
+
+    def __init__(
+        self, keys: Tuple[str, ...], ids: Dict[str, int], key_set: FrozenSet[str]
+    ):
+        self.keys = keys
+        self.ids = ids
+        self.key_set = key_set
+
+    @classmethod
+    def from_keys(cls, keys: Iterable[str]) -> "KeyTable":
+        ordered = tuple(sorted(keys))
+        return cls(ordered, {k: i for i, k in enumerate(ordered)}, frozenset(ordered))
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.key_set
+
+    def id(self, key: str) -> int:
+        """Return the id of a key, raise KeyError if it is not in the table"""
+
+        return self.ids[key]
+
+    def key(self, id: int) -> str:
+        """Return the key of an id, raise IndexError if it is not in the table"""
+
+        return self.keys[id]
+
+
+# Field of each config attribute
+_attributes = {
+    "Categories": Field.CATEGORY.value,
+    "Entities": Field.ENTITY.value,
+    "Sources": Field.SOURCE.value,
+    "Chains": Field.CHAIN.value,
+}
+
+
 @dataclass
 class Config:
     Categories: Set[Category]
     Entities: Set[KeyedItem]
     Sources: Set[KeyedItem]
     Chains: Set[KeyedItem]
+    # Key table of each attribute, by field (see constants.Field)
+    Keys: Dict[str, KeyTable] = field(default_factory=dict, repr=False, compare=False)
+
+    def __post_init__(self):
+        for attribute, f in _attributes.items():
+            if f not in self.Keys:
+                items = getattr(self, attribute)
+                self.Keys[f] = KeyTable.from_keys(i.key for i in items)
 
 
 def validate_config(config: Config):
@@ -83,34 +143,141 @@ def validate_config(config: Config):
             raise ValueError(f"Invalid chain key: {chain.key}")
 
 
-def load_config() -> Config:
-    """Load the config from the json files"""
+_config_dir = os.path.dirname(os.path.realpath(__file__))
+
 
-    dir_path = os.path.dirname(os.path.realpath(__file__))
+def _json_path(config_dir: str, attribute: str) -> str:
+    return os.path.join(config_dir, f"{attribute.lower()}.json")
+
+
+def _load_json(config_dir: str = _config_dir) -> Config:
+    def _load(attribute: str) -> list:
+        with open(_json_path(config_dir, attribute)) as f:
+            return json.load(f)
 
     config = Config(
         set(
             Category(i["key"], i["display_name"], i["description"])
-            for i in json.load(open(dir_path + "/categories.json"))
-        ),
-        set(
-            KeyedItem(i["key"], i["display_name"])
-            for i in json.load(open(dir_path + "/entities.json"))
-        ),
-        set(
-            KeyedItem(i["key"], i["display_name"])
-            for i in json.load(open(dir_path + "/sources.json"))
-        ),
-        set(
-            KeyedItem(i["key"], i["display_name"])
-            for i in json.load(open(dir_path + "/chains.json"))
+            for i in _load("Categories")
         ),
+        set(KeyedItem(i["key"], i["display_name"]) for i in _load("Entities")),
+        set(KeyedItem(i["key"], i["display_name"]) for i in _load("Sources")),
+        set(KeyedItem(i["key"], i["display_name"]) for i in _load("Chains")),
     )
 
     validate_config(config)
     return config
 
 
-default_config = load_config()
+def config_hash(config_dir: str = _config_dir) -> str:
+    """Return the hash of the content of the json files of the config, which
+    keys the compiled config"""
+
+    h = hashlib.sha256(f"{_compiled_version}:{marshal.version}".encode())
+    for attribute in _attributes:
+        with open(_json_path(config_dir, attribute), "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def config_cache_dir() -> Path:
+    """Return the folder of the compiled configs, CHAINMETA_CONFIG_CACHE or
+    chainmeta_reader in the user cache folder"""
+
+    path = os.environ.get("CHAINMETA_CONFIG_CACHE")
+    if path:
+        return Path(path)
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return Path(cache_home, "chainmeta_reader")
+
+
+def _compiled_path(cache_dir: Optional[Path] = None) -> Path:
+    return (cache_dir or config_cache_dir()).joinpath(f"config-{config_hash()}.bin")
+
+
+def _write_compiled(path: Path, config: Config):
+    # Only builtin types, which marshal loads faster than json or pickle
+    compiled = {
+        "items": {
+            attribute: tuple(astuple(i) for i in getattr(config, attribute))
+            for attribute in _attributes
+        },
+        "keys": {f: (t.keys, t.ids, t.key_set) for f, t in config.Keys.items()},
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(marshal.dumps(compiled))
+    os.replace(tmp, path)
+
+    # Compiled configs of other versions of the json files
+    for stale in path.parent.glob("config-*.bin"):
+        if stale != path:
+            try:
+                stale.unlink()
+            except OSError:
+                pass
+
+
+def _read_compiled(path: Path) -> Config:
+    with open(path, "rb") as f:
+        compiled = marshal.loads(f.read())
+    items = compiled["items"]
+    return Config(
+        set(Category(*i) for i in items["Categories"]),
+        set(KeyedItem(*i) for i in items["Entities"]),
+        set(KeyedItem(*i) for i in items["Sources"]),
+        set(KeyedItem(*i) for i in items["Chains"]),
+        Keys={f: KeyTable(*t) for f, t in compiled["keys"].items()},
+    )
+
+
+def compile_config(cache_dir: Optional[Path] = None) -> Path:
+    """Compile the config into the cache folder, return the path of the
+    compiled config"""
+
+    path = _compiled_path(cache_dir)
+    _write_compiled(path, _load_json())
+    return path
+
+
+def load_config(*, use_cache: bool = True) -> Config:
+    """Load the config from the compiled config of the json files if it
+    exists, see compile_config(). The compiled config is only written when
+    missing if CHAINMETA_CONFIG_CACHE is set"""
+
+    if not use_cache:
+        return _load_json()
+
+    path = _compiled_path()
+    try:
+        return _read_compiled(path)
+    except (OSError, EOFError, ValueError, TypeError, KeyError):
+        # Missing, or written by another version
+        pass
+
+    config = _load_json()
+    if os.environ.get("CHAINMETA_CONFIG_CACHE"):
+        try:
+            _write_compiled(path, config)
+        except OSError:
+            # The cache folder is not writable, the json files are loaded each
+            # time
+            pass
+    return config
+
+
+def __getattr__(name: str):
+    # default_config is loaded on first use, not when the package is imported
+    if name == "default_config":
+        global default_config
+        default_config = load_config()
+        return default_config
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+default_config: Config
 
 __all__ = ["Config", "default_config"]
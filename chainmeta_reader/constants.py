@@ -32,3 +32,4 @@ MetaSchemaFile = "meta_schema.json"
 ArtifactSchemaFile = "artifact_schema.json"
 SchemaFolder = "schema"
 ContribFolder = "contrib"
+SchemaEntryPointGroup = "chainmeta_reader.schemas"
@@ -13,11 +13,41 @@
 
 import re
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 
+from chainmeta_reader.columnar import Columns
 from chainmeta_reader.metadata import ChainmetaItem, ITranslator
+from chainmeta_reader.utils import Memo
 from chainmeta_reader.validator import JsonValidator
 
+_chains = {
+    "ETH": "ethereum_mainnet",
+    "BTC": "bitcoin_mainnet",
+}
+_denormalized_chains = {v: k for k, v in _chains.items()}
+
+_categories = {
+    "Financial Services": "business_or_services",
+    "Services": "business_or_services",
+    "Exchange": "cex",
+    "Law Enforcement": "le",
+    "Coinswapper": "coin_swapper",
+    "Financial Crime": "financial_crime",
+    "Constrainted": "constrained_by_service",
+    "High Risk": "high_risk",
+    "Dapp": "dapp",
+}
+_denormalized_categories = {
+    "business_or_services": "Services",
+    "cex": "Exchange",
+    "le": "Law Enforcement",
+    "coin_swapper": "Coinswapper",
+    "financial_crime": "Financial Crime",
+    "constrained_by_service": "Constrainted",
+    "high_risk": "High Risk",
+    "dapp": "Dapp",
+}
+
 
 class ChaintoolTranslator(ITranslator):
     @staticmethod
@@ -32,63 +62,82 @@ class ChaintoolTranslator(ITranslator):
 
     @staticmethod
     def normalize_chain(chain: str) -> str:
-        return {
-            "ETH": "ethereum_mainnet",
-            "BTC": "bitcoin_mainnet",
-        }.get(chain, chain)
+        return _chains.get(chain, chain)
 
     @staticmethod
     def denormalize_chain(chain: str) -> str:
-        return {
-            "ethereum_mainnet": "ETH",
-            "bitcoin_mainnet": "BTC",
-        }.get(chain, chain)
+        return _denormalized_chains.get(chain, chain)
 
     @staticmethod
     def normalize_category(category: str) -> str:
-        category = {
-            "Financial Services": "business_or_services",
-            "Services": "business_or_services",
-            "Exchange": "cex",
-            "Law Enforcement": "le",
-            "Coinswapper": "coin_swapper",
-            "Financial Crime": "financial_crime",
-            "Constrainted": "constrained_by_service",
-            "High Risk": "high_risk",
-            "Dapp": "dapp",
-        }.get(category, category)
-
+        category = _categories.get(category, category)
         return ChaintoolTranslator.normalize_not_none_key(category)
 
     @staticmethod
     def denormalize_category(category: str) -> str:
-        return {
-            "business_or_services": "Services",
-            "cex": "Exchange",
-            "le": "Law Enforcement",
-            "coin_swapper": "Coinswapper",
-            "financial_crime": "Financial Crime",
-            "constrained_by_service": "Constrainted",
-            "high_risk": "High Risk",
-            "dapp": "Dapp",
-        }.get(category, category)
+        return _denormalized_categories.get(category, category)
+
+    @staticmethod
+    def normalize_categories(categories: str) -> Tuple[str, ...]:
+        return tuple(
+            ChaintoolTranslator.normalize_category(i) for i in categories.split(",")
+        )
 
     def to_common_schema(self, raw_metadata: Dict[str, str]) -> Optional[ChainmetaItem]:
         # Translate Chaintool formatted metadata into the common schema
         return ChainmetaItem(
-            chain=ChaintoolTranslator.normalize_chain(raw_metadata["chain"]),
+            chain=_normalized_chains[raw_metadata["chain"]],
             address=raw_metadata["address"],
-            entity=ChaintoolTranslator.normalize_key(raw_metadata["entity"]),
+            entity=_normalized_keys[raw_metadata["entity"]],
             name=raw_metadata["entity_name"],
-            categories=[
-                ChaintoolTranslator.normalize_category(i)
-                for i in raw_metadata["categories"].split(",")
-            ],
-            source=ChaintoolTranslator.normalize_not_none_key(raw_metadata["source"]),
+            categories=list(_normalized_categories[raw_metadata["categories"]]),
+            source=_normalized_sources[raw_metadata["source"]],
             submitted_by=raw_metadata["submitted_by"],
             submitted_on=raw_metadata["tagged_on"],
         )
 
+    def to_common_schema_batch(
+        self, rows: Iterable[Dict[str, str]]
+    ) -> List[Optional[ChainmetaItem]]:
+        # Normalized values are looked up in the memos, by their raw value
+        chains, keys, categories, sources = (
+            _normalized_chains,
+            _normalized_keys,
+            _normalized_categories,
+            _normalized_sources,
+        )
+        return [
+            ChainmetaItem(
+                chains[r["chain"]],
+                r["address"],
+                keys[r["entity"]],
+                r["entity_name"],
+                list(categories[r["categories"]]),
+                sources[r["source"]],
+                r["submitted_by"],
+                r["tagged_on"],
+            )
+            for r in rows
+        ]
+
+    def to_common_columns(self, columns: Columns) -> Columns:
+        # Normalized values are computed once per distinct raw value
+        return Columns(
+            {
+                "chain": columns["chain"].map(_normalized_chains.__getitem__),
+                "address": columns["address"],
+                "entity": columns["entity"].map(_normalized_keys.__getitem__),
+                "name": columns["entity_name"],
+                "categories": columns["categories"].map(
+                    _normalized_categories.__getitem__
+                ),
+                "source": columns["source"].map(_normalized_sources.__getitem__),
+                "submitted_by": columns["submitted_by"],
+                "submitted_on": columns["tagged_on"],
+            },
+            len(columns),
+        )
+
     def from_common_schema(
         self, common_schema_metadata: ChainmetaItem
     ) -> Optional[object]:
@@ -113,6 +162,13 @@ class ChaintoolTranslator(ITranslator):
         }
 
 
+# Raw values of chaintool are from a small vocabulary, their normalized values
+# are computed once
+_normalized_chains = Memo(ChaintoolTranslator.normalize_chain)
+_normalized_keys = Memo(ChaintoolTranslator.normalize_key)
+_normalized_categories = Memo(ChaintoolTranslator.normalize_categories)
+_normalized_sources = Memo(ChaintoolTranslator.normalize_not_none_key)
+
 schema_path = [
     "https://github.com/openchainmeta/chainmetareader/chainmeta_reader/schemas/chaintool_schema.json"  # noqa: E501
 ]
@@ -0,0 +1,149 @@
+# Copyright 2023 The chainmetareader Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from chainmeta_reader import db
+from chainmeta_reader.db import SearchKey
+from chainmeta_reader.metadata import ChainmetaItem
+
+"""This module provides a read-only in-memory index of chain metadata, for
+lookups by address without querying the database.
+"""
+
+# Filters that can be served by the index
+_index_filters = [{"address"}, {"address", "chain"}]
+
+
+def _key(chain: str, address: str) -> str:
+    # Sorted by address first, so that the items of an address on all chains
+    # are contiguous
+    return f"{address}\0{chain}"
+
+
+class LabelLookup(ABC):
+    """Lookups of chain metadata items by (chain, address), implemented by
+    LabelIndex and LabelSnapshot."""
+
+    @abstractmethod
+    def lookup(self, address: str, chain: Optional[str] = None) -> List[ChainmetaItem]:
+        """Return the items of ``address`` on ``chain``, or on any chain if
+        ``chain`` is None."""
+
+    def lookup_many(
+        self, keys: Iterable[SearchKey]
+    ) -> Dict[SearchKey, List[ChainmetaItem]]:
+        """Look up (chain, address) pairs, see db.search_chainmeta_many()."""
+
+        return {(c, a): self.lookup(a, c) for c, a in keys}
+
+    def search(self, filter: dict) -> Optional[List[ChainmetaItem]]:
+        """Return the items matching a search filter, or None if the filter
+        cannot be served by the index."""
+
+        if set(filter) not in _index_filters:
+            return None
+        return self.lookup(filter["address"], filter.get("chain"))
+
+
+class LabelIndex(LabelLookup):
+    """Read-only index of chain metadata items by (chain, address).
+
+    Items are stored in columns sorted by address and chain, and looked up by
+    binary search. Repeated values (chain, entity, categories, source,
+    submitted_by and submitted_on) are stored once and referenced by integer
+    codes. Lookups return new ChainmetaItem objects, the index itself is never
+    modified: to refresh it, build a new one and replace the reference to the
+    old one.
+    """
+
+    def __init__(self, items: Iterable[ChainmetaItem]):
+        values: Dict[object, int] = {None: 0}
+        self._values: List[Any] = [None]
+
+        def _code(value) -> int:
+            code = values.get(value)
+            if code is None:
+                code = values[value] = len(self._values)
+                self._values.append(value)
+            return code
+
+        rows = sorted(
+            (
+                (
+                    _key(i.chain, i.address),
+                    i.address,
+                    i.name,
+                    (
+                        _code(i.chain),
+                        _code(i.entity),
+                        _code(tuple(i.categories)),
+                        _code(i.source),
+                        _code(i.submitted_by),
+                        _code(i.submitted_on),
+                    ),
+                )
+                for i in items
+            ),
+            # Stable, items of a key keep their order
+            key=lambda row: row[0],
+        )
+        self._keys: List[str] = [r[0] for r in rows]
+        self._addresses: List[str] = [r[1] for r in rows]
+        self._names: List[Optional[str]] = [r[2] for r in rows]
+        self._codes: Tuple[array, ...] = tuple(
+            array("I", (r[3][c] for r in rows)) for c in range(6)
+        )
+
+    @classmethod
+    def from_database(cls, *, page_size: int = 10_000) -> "LabelIndex":
+        """Build an index of all the chain metadata of the database."""
+
+        return cls(db.search_chainmeta(page_size=page_size))
+
+    @classmethod
+    async def from_database_async(cls, *, page_size: int = 10_000) -> "LabelIndex":
+        """Like from_database(), with the asynchronous engine."""
+
+        return cls([i async for i in db.search_chainmeta_async(page_size=page_size)])
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _item(self, row: int) -> ChainmetaItem:
+        chain, entity, categories, source, submitted_by, submitted_on = (
+            self._values[c[row]] for c in self._codes
+        )
+        return ChainmetaItem(
+            chain=chain,
+            address=self._addresses[row],
+            entity=entity,
+            name=self._names[row],
+            categories=list(categories),
+            source=source,
+            submitted_by=submitted_by,
+            submitted_on=submitted_on,
+        )
+
+    def lookup(self, address: str, chain: Optional[str] = None) -> List[ChainmetaItem]:
+        if chain is None:
+            start = bisect_left(self._keys, f"{address}\0")
+            end = bisect_left(self._keys, f"{address}\1", lo=start)
+        else:
+            key = _key(chain, address)
+            start = bisect_left(self._keys, key)
+            end = bisect_right(self._keys, key, lo=start)
+        return [self._item(row) for row in range(start, end)]
@@ -13,7 +13,10 @@
 
 from abc import ABC
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import TYPE_CHECKING, Iterable, List, Optional
+
+if TYPE_CHECKING:
+    from chainmeta_reader.columnar import Columns
 
 
 @dataclass
@@ -51,6 +54,23 @@ class ITranslator(ABC):
     def to_common_schema(self, raw_metadata) -> Optional[ChainmetaItem]:
         pass
 
+    def to_common_schema_batch(self, rows: Iterable) -> List[Optional[ChainmetaItem]]:
+        """Translate a batch of raw metadata, in order. Translators override it
+        to share work across rows, it calls to_common_schema() on each row by
+        default."""
+
+        return [self.to_common_schema(r) for r in rows]
+
+    def to_common_columns(self, columns: "Columns") -> "Columns":
+        """Translate an artifact loaded as columns into columns of the common
+        schema. Translators override it to translate column by column, it
+        translates the rows by default."""
+
+        from chainmeta_reader.columnar import Columns
+
+        items: list = self.to_common_schema_batch(columns.rows())
+        return Columns.from_items(items)
+
     def from_common_schema(
         self, common_schema_metadata: ChainmetaItem
     ) -> Optional[object]:
@@ -61,6 +81,14 @@ class Translator(ITranslator):
     def to_common_schema(self, raw_metadata) -> Optional[ChainmetaItem]:
         return ChainmetaItem(**raw_metadata)
 
+    def to_common_schema_batch(self, rows: Iterable) -> List[Optional[ChainmetaItem]]:
+        return [ChainmetaItem(**r) for r in rows]
+
+    def to_common_columns(self, columns: "Columns") -> "Columns":
+        from chainmeta_reader.columnar import Columns, common_fields
+
+        return Columns({f: columns[f] for f in common_fields}, len(columns))
+
     def from_common_schema(
         self, common_schema_metadata: ChainmetaItem
     ) -> Optional[object]:
@@ -0,0 +1,181 @@
+# Copyright 2023 The chainmetareader Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import bisect
+import os
+import threading
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+from time import perf_counter
+from typing import ContextManager, Dict, Iterator, List, Tuple
+
+"""This module provides the timings of the stages of the ingest and query
+pipeline, and counters of the items going through them.
+
+Metrics are disabled by default, timed() and count() then do nothing. Enable
+them with enable() or the CHAINMETA_METRICS=1 environment variable. Metrics
+are collected per process: stages run in worker processes, with load(...,
+workers=N), are not recorded.
+"""
+
+# Upper bounds of the latency histogram buckets, in seconds
+buckets: Tuple[float, ...] = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+
+@dataclass
+class StageStats:
+    """Snapshot of the timings of a stage."""
+
+    count: int
+    total: float
+    max: float
+    # Number of timings in each bucket, not cumulative, the last one is for
+    # timings above the largest bucket bound
+    buckets: List[int]
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+@dataclass
+class MetricsSnapshot:
+    stages: Dict[str, StageStats]
+    counters: Dict[str, int]
+
+
+class _Histogram:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(buckets) + 1)
+
+    def observe(self, value: float):
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        self.buckets[bisect.bisect_left(buckets, value)] += 1
+
+    def stats(self) -> StageStats:
+        return StageStats(self.count, self.total, self.max, list(self.buckets))
+
+
+_enabled = os.environ.get("CHAINMETA_METRICS") == "1"
+_lock = threading.Lock()
+_histograms: Dict[str, _Histogram] = {}
+_counters: Dict[str, int] = {}
+
+
+def enable(enabled: bool = True):
+    global _enabled
+    _enabled = enabled
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+
+
+def observe(stage: str, seconds: float):
+    """Record a timing of ``stage``."""
+
+    with _lock:
+        histogram = _histograms.get(stage)
+        if histogram is None:
+            histogram = _histograms[stage] = _Histogram()
+        histogram.observe(seconds)
+
+
+@contextmanager
+def _timed(stage: str) -> Iterator[None]:
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage, perf_counter() - start)
+
+
+_disabled = nullcontext()
+
+
+def timed(stage: str) -> ContextManager[None]:
+    """Time the enclosed block as ``stage``, if metrics are enabled."""
+
+    return _timed(stage) if _enabled else _disabled
+
+
+def count(name: str, n: int = 1):
+    """Add ``n`` to the counter ``name``, if metrics are enabled."""
+
+    if _enabled:
+        with _lock:
+            _counters[name] = _counters.get(name, 0) + n
+
+
+def snapshot() -> MetricsSnapshot:
+    with _lock:
+        return MetricsSnapshot(
+            stages={k: h.stats() for k, h in sorted(_histograms.items())},
+            counters=dict(sorted(_counters.items())),
+        )
+
+
+def render_prometheus() -> str:
+    """Render the metrics in the Prometheus text exposition format."""
+
+    s = snapshot()
+    lines = [
+        "# HELP chainmeta_stage_seconds Time spent in the stages of the pipeline.",
+        "# TYPE chainmeta_stage_seconds histogram",
+    ]
+    for stage, stats in s.stages.items():
+        cumulative = 0
+        for bound, n in zip(buckets + (float("inf"),), stats.buckets):
+            cumulative += n
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(
+                f'chainmeta_stage_seconds_bucket{{stage="{stage}",le="{le}"}} '
+                f"{cumulative}"
+            )
+        lines.append(f'chainmeta_stage_seconds_sum{{stage="{stage}"}} {stats.total!r}')
+        lines.append(f'chainmeta_stage_seconds_count{{stage="{stage}"}} {stats.count}')
+
+    lines += [
+        "# HELP chainmeta_events_total Items going through the pipeline.",
+        "# TYPE chainmeta_events_total counter",
+    ]
+    for name, value in s.counters.items():
+        lines.append(f'chainmeta_events_total{{event="{name}"}} {value}')
+    return "\n".join(lines) + "\n"
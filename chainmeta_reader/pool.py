@@ -0,0 +1,138 @@
+# Copyright 2023 The chainmetareader Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+from dataclasses import asdict, dataclass
+from time import perf_counter
+from typing import Optional, Type
+
+from sqlalchemy import Engine, create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+"""This module provides configurable and instrumented connection pools.
+"""
+
+
+@dataclass
+class PoolConfig:
+    """Connection pool settings, see sqlalchemy.create_engine().
+
+    Settings left to None use the SQLAlchemy defaults. pool_pre_ping and
+    pool_recycle help with servers closing idle connections, e.g. MySQL's
+    wait_timeout.
+    """
+
+    pool_size: Optional[int] = None
+    max_overflow: Optional[int] = None
+    pool_timeout: Optional[float] = None
+    pool_recycle: Optional[int] = None
+    pool_pre_ping: Optional[bool] = None
+
+    def engine_kwargs(self) -> dict:
+        return {k: v for k, v in asdict(self).items() if v is not None}
+
+
+@dataclass
+class PoolStats:
+    """Snapshot of the state of a connection pool."""
+
+    size: int
+    checked_out: int
+    checked_in: int
+    overflow: int
+    checkouts: int
+    wait_time_total: float
+    wait_time_max: float
+
+
+class _InstrumentedPoolMixin:
+    """Measure the time spent waiting for a connection from the pool."""
+
+    def __init__(self, *args, **kw):
+        super().__init__(*args, **kw)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    def _do_get(self):
+        start = perf_counter()
+        try:
+            return super()._do_get()  # type: ignore
+        finally:
+            elapsed = perf_counter() - start
+            with self._stats_lock:
+                self.checkouts += 1
+                self.wait_time_total += elapsed
+                self.wait_time_max = max(self.wait_time_max, elapsed)
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncAdaptedQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+_instrumented_pools = {
+    QueuePool: InstrumentedQueuePool,
+    AsyncAdaptedQueuePool: InstrumentedAsyncAdaptedQueuePool,
+}
+
+
+def _pool_class(connection_string: str) -> Optional[Type[Pool]]:
+    url = make_url(connection_string)
+    pool_class = url.get_dialect().get_pool_class(url)  # type: ignore[attr-defined]
+    return _instrumented_pools.get(pool_class)
+
+
+def build_engine(connection_string: str, config: Optional[PoolConfig]) -> Engine:
+    """Create an engine whose pool is instrumented when the dialect uses a
+    queue pool."""
+
+    kw = config.engine_kwargs() if config else {}
+    pool_class = _pool_class(connection_string)
+    if pool_class is not None:
+        kw["poolclass"] = pool_class
+    return create_engine(connection_string, echo=False, **kw)
+
+
+def build_async_engine(
+    connection_string: str, config: Optional[PoolConfig]
+) -> AsyncEngine:
+    """Like build_engine(), for asyncio drivers."""
+
+    kw = config.engine_kwargs() if config else {}
+    pool_class = _pool_class(connection_string)
+    if pool_class is not None:
+        kw["poolclass"] = pool_class
+    return create_async_engine(connection_string, echo=False, **kw)
+
+
+def pool_stats(pool: Pool) -> Optional[PoolStats]:
+    """Return the statistics of a queue pool, None for other pools."""
+
+    if not isinstance(pool, QueuePool):
+        return None
+    return PoolStats(
+        size=pool.size(),
+        checked_out=pool.checkedout(),
+        checked_in=pool.checkedin(),
+        overflow=max(pool.overflow(), 0),
+        checkouts=getattr(pool, "checkouts", 0),
+        wait_time_total=getattr(pool, "wait_time_total", 0.0),
+        wait_time_max=getattr(pool, "wait_time_max", 0.0),
+    )
@@ -13,13 +13,16 @@
 
 import importlib
 import os
+import threading
+from functools import lru_cache, partial
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 
-from chainmeta_reader.constants import ContribFolder
+from chainmeta_reader import validator
+from chainmeta_reader.constants import ContribFolder, SchemaEntryPointGroup
 from chainmeta_reader.logger import logger
 from chainmeta_reader.metadata import ITranslator, Translator
-from chainmeta_reader.validator import IValidator, common_artifact_validator
+from chainmeta_reader.validator import IValidator
 
 
 class Schema:
@@ -31,44 +34,152 @@ class Schema:
         self.translator = translator
 
 
+SchemaLoader = Callable[[], Schema]
+
+common_schema_paths = [
+    "https://github.com/openchainmeta/chainmetareader/chainmeta_reader/schemas/artifact_schema.json",  # noqa: E501
+    "https://github.com/openchainmeta/chainmetareader/chainmeta_reader/schema/artifact_schema.json",  # noqa: E501
+]
+
+# Schema paths of the contrib modules, which are imported when one of their
+# schemas is first resolved. The table is only a fast path: all the contrib
+# modules are imported the first time an unknown schema is resolved, so
+# modules missing from it or whose schema_path changed are still found.
+contrib_schemas: Dict[str, str] = {
+    "https://github.com/openchainmeta/chainmetareader/chainmeta_reader/schemas/chaintool_schema.json": "chaintool",  # noqa: E501
+    "_schema.json": "messari",
+}
+
 schema_registry: Dict[str, Schema] = {}
+_schema_loaders: Dict[str, SchemaLoader] = {}
+_registry_lock = threading.RLock()
+_registry_loaded = False
+_plugins_loaded = False
+
+
+def _schema_of(plugin) -> Schema:
+    return Schema(plugin.validator, plugin.translator)
+
+
+def _schema_paths(plugin) -> List[str]:
+    if isinstance(plugin.schema_path, list):
+        return plugin.schema_path
+    return [plugin.schema_path]
+
+
+@lru_cache(maxsize=None)
+def _common_schema() -> Schema:
+    return Schema(validator.common_artifact_validator, Translator())
+
+
+@lru_cache(maxsize=None)
+def _contrib_schema(name: str) -> Schema:
+    return _schema_of(
+        importlib.import_module(f"chainmeta_reader.{ContribFolder}.{name}")
+    )
+
+
+def _load_registry():
+    """Register the loaders of the common schema and the contrib schemas, on
+    first use of the registry rather than when the package is imported."""
+
+    global _registry_loaded
+    with _registry_lock:
+        if _registry_loaded:
+            return
+        _registry_loaded = True
+
+        for path in common_schema_paths:
+            register_lazy(path, _common_schema)
+        for path, name in contrib_schemas.items():
+            register_lazy(path, partial(_contrib_schema, name))
+
+
+def _entry_points() -> Iterable:
+    from importlib.metadata import entry_points
+
+    eps = entry_points()
+    if hasattr(eps, "select"):
+        return eps.select(group=SchemaEntryPointGroup)
+    # Python < 3.10
+    return eps.get(SchemaEntryPointGroup, [])
+
+
+def _load_plugins():
+    """Register the schema paths of all the contrib modules which are not
+    registered yet, and the plugins of the entry point group, the first time
+    an unknown schema is resolved. Plugins failing to load are skipped with a
+    warning."""
+
+    global _plugins_loaded
+    with _registry_lock:
+        if _plugins_loaded:
+            return
+        _plugins_loaded = True
+
+        contrib_folder = Path(__file__).parent.parent.resolve().joinpath(ContribFolder)
+        plugins: List[Tuple[str, Callable[[], object], bool]] = []
+        for filename in sorted(map(os.fsdecode, os.listdir(contrib_folder))):
+            name, ext = os.path.splitext(filename)
+            if ext == ".py" and not name.startswith("_"):
+                module = f"chainmeta_reader.{ContribFolder}.{name}"
+                load = partial(importlib.import_module, module)
+                plugins.append((filename, load, True))
+        plugins += [(ep.name, ep.load, False) for ep in _entry_points()]
+
+        for name, load, contrib in plugins:
+            try:
+                plugin = load()
+                schema = _schema_of(plugin)
+                for path in _schema_paths(plugin):
+                    # Contrib paths listed in contrib_schemas are already known
+                    if contrib and (path in schema_registry or path in _schema_loaders):
+                        continue
+                    register(path, schema)
+            except Exception as e:
+                logger.warning(f"Failed to load {name}: {e}")
 
 
 def resolve(schema_path: str) -> Optional[Schema]:
-    """Resolve a schema by path."""
+    """Resolve a schema by path.
+
+    The validator and translator of a schema are built the first time it is
+    resolved, and cached. Errors raised while building them are raised here.
+    """
 
-    return schema_registry.get(schema_path)
+    schema = schema_registry.get(schema_path)
+    if schema is not None:
+        return schema
+
+    with _registry_lock:
+        _load_registry()
+        if schema_path not in schema_registry and schema_path not in _schema_loaders:
+            _load_plugins()
+        loader = _schema_loaders.get(schema_path)
+        if loader is not None:
+            schema_registry[schema_path] = loader()
+            del _schema_loaders[schema_path]
+        return schema_registry.get(schema_path)
+
+
+def _check_new(schema_path: str):
+    if schema_path in schema_registry or schema_path in _schema_loaders:
+        raise ValueError(f"Schema {schema_path} already exists")
 
 
 def register(schema_path: str, schema: Schema):
     """Register a schema."""
 
-    global schema_registry
-    if schema_path in schema_registry:
-        raise ValueError(f"Schema {schema_path} already exists")
-    schema_registry[schema_path] = schema
+    with _registry_lock:
+        _load_registry()
+        _check_new(schema_path)
+        schema_registry[schema_path] = schema
 
 
-common_schema = Schema(common_artifact_validator, Translator())
-register(
-    "https://github.com/openchainmeta/chainmetareader/chainmeta_reader/schemas/artifact_schema.json",  # noqa: E501
-    common_schema,
-)
-register(
-    "https://github.com/openchainmeta/chainmetareader/chainmeta_reader/schema/artifact_schema.json",  # noqa: E501
-    common_schema,
-)
-
-
-for f in os.listdir(Path(__file__).parent.parent.resolve().joinpath(ContribFolder)):
-    filename = os.fsdecode(f)
-    if f.endswith(".py"):
-        try:
-            m = importlib.import_module(f"chainmeta_reader.contrib.{filename[:-3]}")
-            if isinstance(m.schema_path, list):
-                for p in m.schema_path:
-                    register(p, Schema(m.validator, m.translator))
-            else:
-                register(m.schema_path, Schema(m.validator, m.translator))
-        except Exception as e:
-            logger.warning(f"Failed to load {filename}: {e}")
+def register_lazy(schema_path: str, loader: SchemaLoader):
+    """Register a schema built by ``loader`` the first time it is resolved."""
+
+    with _registry_lock:
+        _load_registry()
+        _check_new(schema_path)
+        _schema_loaders[schema_path] = loader
@@ -0,0 +1,224 @@
+# Copyright 2023 The chainmetareader Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import mmap
+import os
+import struct
+from array import array
+from pathlib import Path
+from typing import List, Optional, Union
+
+from chainmeta_reader.index import LabelIndex, LabelLookup
+from chainmeta_reader.metadata import ChainmetaItem
+
+"""This module provides a binary snapshot format of the chain metadata, which
+is memory-mapped to answer lookups without a database connection.
+
+A snapshot holds the columns of a LabelIndex: the keys, address and chain,
+sorted for binary search, the names, and the other values as integer codes
+into a table of distinct values, categories being stored as comma separated
+keys. Opening a snapshot only maps the file: lookups read the pages they need
+and decode the values of the items they return, and processes mapping the
+same file share its pages.
+
+Layout, in the byte order of the platform that wrote the snapshot, each
+section starting on an 8 bytes boundary:
+
+    header    magic, byte order mark, number of rows and values, then the
+              offset and length of each section
+    values    offsets (uint64, values + 1) and blob of the distinct values
+    keys      offsets (uint64, rows + 1) and blob of the sorted keys
+    names     offsets (uint64, rows + 1) and blob of the names
+    codes     one column (uint32, rows) per coded field, see _coded_fields
+"""
+
+magic = b"CMSNAP01"
+_byte_order_mark = 0x01020304
+_coded_fields = [
+    "chain",
+    "entity",
+    "categories",
+    "source",
+    "submitted_by",
+    "submitted_on",
+]
+_sections = ["value_offsets", "values", "key_offsets", "keys", "name_offsets", "names"]
+_sections += [f"{f}_codes" for f in _coded_fields]
+_header = struct.Struct(f"=8sIQQ{2 * len(_sections)}Q")
+
+
+def _blob(strings: List[bytes]) -> List[bytes]:
+    offsets = array("Q", [0])
+    for s in strings:
+        offsets.append(offsets[-1] + len(s))
+    return [offsets.tobytes(), b"".join(strings)]
+
+
+def _encode(value) -> bytes:
+    if value is None:
+        return b""
+    if isinstance(value, tuple):
+        return ",".join(value).encode()
+    return value.encode()
+
+
+def write_snapshot(path: Union[str, Path], index: LabelIndex):
+    """Write the items of ``index`` to a snapshot file.
+
+    The file is written next to ``path`` and then renamed, so that processes
+    opening ``path`` never see a partial snapshot.
+    """
+
+    sections = _blob([_encode(v) for v in index._values])
+    sections += _blob([k.encode() for k in index._keys])
+    sections += _blob([_encode(n) for n in index._names])
+    sections += [c.tobytes() for c in index._codes]
+
+    positions = []
+    offset = _header.size
+    for section in sections:
+        offset += -offset % 8
+        positions += [offset, len(section)]
+        offset += len(section)
+
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(
+            _header.pack(
+                magic, _byte_order_mark, len(index), len(index._values), *positions
+            )
+        )
+        for section, position in zip(sections, positions[::2]):
+            f.write(b"\0" * (position - f.tell()))
+            f.write(section)
+    os.replace(tmp, path)
+
+
+def export_snapshot(path: Union[str, Path], *, page_size: int = 10_000) -> int:
+    """Write all the chain metadata of the database to a snapshot file, return
+    the number of items written."""
+
+    index = LabelIndex.from_database(page_size=page_size)
+    write_snapshot(path, index)
+    return len(index)
+
+
+class LabelSnapshot(LabelLookup):
+    """Read-only, memory-mapped snapshot of chain metadata items, with the
+    lookups of LabelIndex.
+
+    Close it with close(), or use it as a context manager, once no lookups
+    are running anymore.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._open()
+        except Exception:
+            self._mmap.close()
+            raise
+
+    def _open(self):
+        if len(self._mmap) < _header.size:
+            raise ValueError("not a chainmeta snapshot")
+        file_magic, mark, self._rows, _, *positions = _header.unpack_from(self._mmap)
+        if file_magic != magic:
+            raise ValueError("not a chainmeta snapshot")
+        if mark != _byte_order_mark:
+            raise ValueError("snapshot written on a platform with another byte order")
+
+        data = memoryview(self._mmap)
+        self._views = [data]
+        sections = {}
+        for name, start, length in zip(_sections, positions[::2], positions[1::2]):
+            sections[name] = data[start : start + length]
+            self._views.append(sections[name])
+
+        def _cast(name: str, fmt: str) -> memoryview:
+            view = sections[name].cast(fmt)
+            self._views.append(view)
+            return view
+
+        self._value_offsets = _cast("value_offsets", "Q")
+        self._key_offsets = _cast("key_offsets", "Q")
+        self._name_offsets = _cast("name_offsets", "Q")
+        self._codes = [_cast(f"{f}_codes", "I") for f in _coded_fields]
+        self._values = sections["values"]
+        self._keys = sections["keys"]
+        self._names = sections["names"]
+
+    def close(self):
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._mmap.close()
+
+    def __enter__(self) -> "LabelSnapshot":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def _key(self, row: int) -> bytes:
+        return bytes(self._keys[self._key_offsets[row] : self._key_offsets[row + 1]])
+
+    def _bisect(self, key: bytes, lo: int, *, right: bool) -> int:
+        hi = self._rows
+        while lo < hi:
+            mid = (lo + hi) // 2
+            k = self._key(mid)
+            if k < key or (right and k == key):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _value(self, code: int) -> Optional[str]:
+        if code == 0:
+            return None
+        start, end = self._value_offsets[code], self._value_offsets[code + 1]
+        return str(self._values[start:end], "utf-8")
+
+    def _item(self, row: int) -> ChainmetaItem:
+        chain, entity, categories, source, submitted_by, submitted_on = (
+            self._value(c[row]) for c in self._codes
+        )
+        address = self._key(row).split(b"\0", 1)[0].decode()
+        name = str(
+            self._names[self._name_offsets[row] : self._name_offsets[row + 1]], "utf-8"
+        )
+        return ChainmetaItem(
+            chain=chain or "",
+            address=address,
+            entity=entity,
+            name=name or None,
+            categories=categories.split(",") if categories else [],
+            source=source or "",
+            submitted_by=submitted_by or "",
+            submitted_on=submitted_on or "",
+        )
+
+    def lookup(self, address: str, chain: Optional[str] = None) -> List[ChainmetaItem]:
+        if chain is None:
+            start = self._bisect(f"{address}\0".encode(), 0, right=False)
+            end = self._bisect(f"{address}\1".encode(), start, right=False)
+        else:
+            key = f"{address}\0{chain}".encode()
+            start = self._bisect(key, 0, right=False)
+            end = self._bisect(key, start, right=True)
+        return [self._item(row) for row in range(start, end)]
@@ -0,0 +1,78 @@
+# Copyright 2023 The chainmetareader Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from itertools import islice
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Union,
+)
+
+
+def chunked(iterable: Iterable, size: int) -> Iterator[List]:
+    """Split an iterable into lists of ``size`` items, the last one may be
+    shorter."""
+
+    it = iter(iterable)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+async def achunked(
+    iterable: Union[Iterable, AsyncIterable], size: int
+) -> AsyncIterator[List]:
+    """Like chunked(), for both regular and asynchronous iterables."""
+
+    if not isinstance(iterable, AsyncIterable):
+        for chunk in chunked(iterable, size):
+            yield chunk
+        return
+
+    chunk = []
+    async for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class Memo(Dict[Any, Any]):
+    """Memoize a function of one argument, as a dict: ``memo[key]`` returns
+    ``function(key)``, computed on first access.
+
+    Values are for inputs of a small vocabulary, e.g. the keys of a taxonomy:
+    once ``maxsize`` values are stored, other values are computed on each
+    access instead of growing the memo.
+    """
+
+    def __init__(self, function: Callable[[Any], Any], maxsize: int = 100_000):
+        super().__init__()
+        self.function = function
+        self.maxsize = maxsize
+
+    def __missing__(self, key):
+        value = self.function(key)
+        if len(self) < self.maxsize:
+            self[key] = value
+        return value
@@ -12,18 +12,15 @@
 # limitations under the License.
 import json
 from abc import ABC
+from functools import cached_property
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Dict, FrozenSet, Iterator, List, Optional, Tuple
 
-from jsonschema import Draft7Validator, TypeChecker, validators
+from jsonschema import Draft7Validator, TypeChecker, ValidationError, validators
 
-from chainmeta_reader.config import default_config
-from chainmeta_reader.constants import (
-    ArtifactSchemaFile,
-    Field,
-    MetaSchemaFile,
-    SchemaFolder,
-)
+from chainmeta_reader import config
+from chainmeta_reader.columnar import Columns, json_value
+from chainmeta_reader.constants import ArtifactSchemaFile, MetaSchemaFile, SchemaFolder
 
 
 def value_checker(valid_values):
@@ -36,35 +33,426 @@ class IValidator(ABC):
     def validate(self, metadata: object):
         pass
 
+    def validate_columns(self, columns: Columns):
+        """Validate an artifact loaded as columns. Validators override it to
+        check columns as a whole, it validates the rows by default."""
+
+        self.validate(columns.rows())
+
 
 class JsonValidator(IValidator):
     def __init__(self, *, schema: Path, type_checker: Optional[TypeChecker] = None):
+        self.schema = schema
+        self.type_checker = type_checker
+
+    @cached_property
+    def validator(self) -> Draft7Validator:
+        """The JSON schema validator, read and built on first validation."""
+
+        with open(self.schema) as sf:
+            if self.type_checker is None:
+                return Draft7Validator(schema=json.load(sf))
+            custom_validator = validators.extend(
+                Draft7Validator, type_checker=self.type_checker
+            )
+            return custom_validator(schema=json.load(sf))
+
+    @cached_property
+    def columns_validator(self) -> Optional["CompiledValidator"]:
+        """The schema compiled for columns, None if it has custom types."""
+
+        if self.type_checker is not None:
+            return None
+        return CompiledValidator(schema=self.schema, enums={})
+
+    def validate(self, metadata: object):
+        self.validator.validate(metadata)
+
+    def validate_columns(self, columns: Columns):
+        if self.columns_validator is None:
+            super().validate_columns(columns)
+        else:
+            self.columns_validator.validate_columns(columns)
+
+
+Check = Callable[[object], bool]
+
+
+def _always(instance: object) -> bool:
+    return True
+
+
+def _enum_check(keys: FrozenSet[str]) -> Check:
+    return lambda v: isinstance(v, str) and v in keys
+
+
+def _column_check(check: Check) -> Check:
+    # Arrays are tuples in columns, which no type check but "array" accepts
+    return lambda v: check(v) or (isinstance(v, tuple) and check(list(v)))
+
+
+def _error(message: str, keyword: str, path: tuple, instance: object):
+    return ValidationError(
+        message,
+        validator=keyword,  # type: ignore[arg-type]
+        path=path,
+        instance=instance,
+    )
+
+
+# Draft 7 keywords that assert something about the instance. Other keywords are
+# annotations (title, description, format, ...) and are ignored by jsonschema
+# as well.
+_assertion_keywords = frozenset(
+    [
+        "$ref",
+        "additionalItems",
+        "additionalProperties",
+        "allOf",
+        "anyOf",
+        "const",
+        "contains",
+        "dependencies",
+        "else",
+        "enum",
+        "exclusiveMaximum",
+        "exclusiveMinimum",
+        "if",
+        "items",
+        "maxItems",
+        "maxLength",
+        "maxProperties",
+        "maximum",
+        "minItems",
+        "minLength",
+        "minProperties",
+        "minimum",
+        "multipleOf",
+        "not",
+        "oneOf",
+        "pattern",
+        "patternProperties",
+        "properties",
+        "propertyNames",
+        "required",
+        "then",
+        "type",
+        "uniqueItems",
+    ]
+)
+
+_builtin_types: Dict[str, Check] = {
+    "string": lambda v: isinstance(v, str),
+    "null": lambda v: v is None,
+    "array": lambda v: isinstance(v, list),
+    "object": lambda v: isinstance(v, dict),
+    "boolean": lambda v: isinstance(v, bool),
+    "integer": lambda v: isinstance(v, int) and not isinstance(v, bool),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+}
+
+
+class CompiledValidator(IValidator):
+    """Validate an array of records against a json schema with plain Python checks.
+
+    The schema is compiled once into one check per property, enum types are
+    checked against frozensets of keys. Properties using keywords that cannot be
+    compiled are checked with jsonschema, as is the whole array if its schema is
+    not an array of objects. Records can be validated one by one with
+    iter_record_errors(), and errors carry the index of the record in their path.
+    """
+
+    def __init__(self, *, schema: Path, enums: Dict[str, FrozenSet[str]]):
         with open(schema) as sf:
-            if type_checker is None:
-                self.validator = Draft7Validator(schema=json.load(sf))
+            raw_schema = json.load(sf)
+        type_checker = Draft7Validator.TYPE_CHECKER.redefine_many(
+            {k: value_checker(v) for k, v in enums.items()}
+        )
+        self.fallback = validators.extend(Draft7Validator, type_checker=type_checker)(
+            schema=raw_schema
+        )
+        self.enums = enums
+        self.definitions = {
+            d["$id"]: d
+            for d in raw_schema.get("$defs", {}).values()
+            if isinstance(d, dict) and "$id" in d
+        }
+
+        self.compiled = False
+        self.required: FrozenSet[str] = frozenset()
+        self.properties: FrozenSet[str] = frozenset()
+        self.additional_properties = True
+        self.checks: List[Tuple[str, Check]] = []
+        self.fallback_checks: List[Tuple[str, Draft7Validator]] = []
+
+        if self._is_array_of_records(raw_schema):
+            self._compile_items(raw_schema["items"])
+
+    @staticmethod
+    def _is_array_of_records(schema: dict) -> bool:
+        if schema.get("type") != "array":
+            return False
+        if not _assertion_keywords.intersection(schema) <= {"type", "items"}:
+            return False
+
+        items = schema.get("items")
+        if not isinstance(items, dict) or items.get("type") != "object":
+            return False
+        keywords = _assertion_keywords.intersection(items)
+        if not keywords <= {"type", "required", "properties", "additionalProperties"}:
+            return False
+        return items.get("additionalProperties", True) in (True, False)
+
+    def _compile_items(self, items: dict):
+        properties: dict = items.get("properties", {})
+        self.required = frozenset(items.get("required", []))
+        self.properties = frozenset(properties)
+        self.additional_properties = items.get("additionalProperties", True)
+        for name, subschema in properties.items():
+            check = self._compile(subschema)
+            if check is None:
+                self.fallback_checks.append(
+                    (name, self.fallback.evolve(schema=subschema))
+                )
+            elif check is not _always:
+                self.checks.append((name, check))
+        self.compiled = True
+
+    def _compile(self, schema: object) -> Optional[Check]:
+        """Compile a schema into a check, or None if it cannot be compiled."""
+
+        if schema is True or schema == {}:
+            return _always
+        if not isinstance(schema, dict):
+            return None
+
+        if "$ref" in schema:
+            # In draft 7, $ref overrides all other keywords
+            target = self.definitions.get(schema["$ref"])
+            return None if target is None else self._compile(target)
+
+        keywords = _assertion_keywords.intersection(schema)
+        if not keywords <= {"type", "enum", "items", "anyOf"}:
+            return None
+
+        checks: List[Check] = []
+        if "type" in schema:
+            type_check = self._compile_type(schema["type"])
+            if type_check is None:
+                return None
+            checks.append(type_check)
+        if "enum" in schema:
+            values = schema["enum"]
+            checks.append(lambda v: v in values)
+        if "items" in schema:
+            compiled_item_check = self._compile(schema["items"])
+            if compiled_item_check is None:
+                return None
+            item_check: Check = compiled_item_check
+            if item_check is not _always:
+                checks.append(
+                    lambda v: not isinstance(v, list) or all(map(item_check, v))
+                )
+        if "anyOf" in schema:
+            branches = [self._compile(b) for b in schema["anyOf"]]
+            if any(b is None for b in branches):
+                return None
+            if _always not in branches:
+                checks.append(lambda v: any(b(v) for b in branches))  # type: ignore
+
+        if not checks:
+            return _always
+        if len(checks) == 1:
+            return checks[0]
+        return lambda v: all(c(v) for c in checks)
+
+    def _compile_type(self, types: object) -> Optional[Check]:
+        names = [types] if isinstance(types, str) else types
+        if not isinstance(names, list):
+            return None
+
+        checks: List[Check] = []
+        for name in names:
+            if name in self.enums:
+                checks.append(_enum_check(self.enums[name]))
+            elif name in _builtin_types:
+                checks.append(_builtin_types[name])
             else:
-                custom_validator = validators.extend(
-                    Draft7Validator, type_checker=type_checker
+                return None
+        if len(checks) == 1:
+            return checks[0]
+        return lambda v: any(c(v) for c in checks)
+
+    def iter_record_errors(
+        self, record: object, index: int = 0
+    ) -> Iterator[ValidationError]:
+        """Validate a single record, ``index`` is its position in the array."""
+
+        if not self.compiled:
+            for error in self.fallback.iter_errors([record]):
+                if error.path:
+                    error.path[0] = index
+                yield error
+            return
+
+        if not isinstance(record, dict):
+            yield _error(
+                f"{record!r} is not of type 'object'",
+                "type",
+                (index,),
+                record,
+            )
+            return
+
+        keys = record.keys()
+        if not self.required <= keys:
+            for name in sorted(self.required - keys):
+                yield _error(
+                    f"{name!r} is a required property",
+                    "required",
+                    (index,),
+                    record,
                 )
-                self.validator = custom_validator(schema=json.load(sf))
+        if not self.additional_properties and not keys <= self.properties:
+            extra = ", ".join(repr(k) for k in sorted(keys - self.properties))
+            yield _error(
+                f"Additional properties are not allowed ({extra} were unexpected)",
+                "additionalProperties",
+                (index,),
+                record,
+            )
+        for name, check in self.checks:
+            if name in record and not check(record[name]):
+                yield _error(
+                    f"{record[name]!r} is not valid under the schema of {name!r}",
+                    "properties",
+                    (index, name),
+                    record[name],
+                )
+        for name, validator in self.fallback_checks:
+            if name in record:
+                for error in validator.iter_errors(record[name]):
+                    error.path.extendleft([name, index])
+                    yield error
+
+    def iter_errors(self, metadata: object) -> Iterator[ValidationError]:
+        """Validate all records and yield every error found."""
+
+        if not self.compiled:
+            yield from self.fallback.iter_errors(metadata)
+            return
+        if not isinstance(metadata, list):
+            yield _error(f"{metadata!r} is not of type 'array'", "type", (), metadata)
+            return
+        for i, record in enumerate(metadata):
+            if not self._is_valid(record):
+                yield from self.iter_record_errors(record, i)
+
+    def _is_valid(self, record: object) -> bool:
+        """Fast path for valid records, errors are collected separately."""
+
+        if not isinstance(record, dict) or self.fallback_checks:
+            return False
+        keys = record.keys()
+        if not self.required <= keys:
+            return False
+        if not self.additional_properties and not keys <= self.properties:
+            return False
+        for name, check in self.checks:
+            if name in record and not check(record[name]):
+                return False
+        return True
 
     def validate(self, metadata: object):
-        self.validator.validate(metadata)
+        for error in self.iter_errors(metadata):
+            raise error
 
+    def validate_columns(self, columns: Columns):
+        """Validate the rows of columns, each check runs once per distinct
+        value of dictionary encoded columns. Raise the first error found."""
 
-common_metadata_validator = JsonValidator(
-    schema=Path(__file__).parent.resolve().joinpath(SchemaFolder, MetaSchemaFile)
-)
+        if not self.compiled or self.fallback_checks:
+            self.validate(columns.rows())
+            return
+        if not len(columns):
+            return
 
-type_checker = Draft7Validator.TYPE_CHECKER.redefine_many(
-    {
-        Field.CATEGORY.value: value_checker(default_config.Categories),
-        Field.ENTITY.value: value_checker(default_config.Entities),
-        Field.SOURCE.value: value_checker(default_config.Sources),
-        Field.CHAIN.value: value_checker(default_config.Chains),
-    }
-)
-common_artifact_validator = JsonValidator(
-    schema=Path(__file__).parent.resolve().joinpath(SchemaFolder, ArtifactSchemaFile),
-    type_checker=type_checker,
-)
+        names = frozenset(columns.names)
+        for name in sorted(self.required - names):
+            raise _error(
+                f"{name!r} is a required property", "required", (0,), columns.row(0)
+            )
+        if not self.additional_properties and not names <= self.properties:
+            extra = ", ".join(repr(k) for k in sorted(names - self.properties))
+            raise _error(
+                f"Additional properties are not allowed ({extra} were unexpected)",
+                "additionalProperties",
+                (0,),
+                columns.row(0),
+            )
+        for name, check in self.checks:
+            if name not in columns:
+                continue
+            column = columns[name]
+            row = column.find_invalid(_column_check(check))
+            if row >= 0:
+                value = json_value(column[row])
+                raise _error(
+                    f"{value!r} is not valid under the schema of {name!r}",
+                    "properties",
+                    (row, name),
+                    value,
+                )
+
+
+def _common_metadata_validator() -> JsonValidator:
+    return JsonValidator(
+        schema=Path(__file__).parent.resolve().joinpath(SchemaFolder, MetaSchemaFile)
+    )
+
+
+def _enums() -> Dict[str, FrozenSet[str]]:
+    return {f: t.key_set for f, t in config.default_config.Keys.items()}
+
+
+def _type_checker() -> TypeChecker:
+    return Draft7Validator.TYPE_CHECKER.redefine_many(
+        {k: value_checker(v) for k, v in _lazy("enums").items()}
+    )
+
+
+def _common_artifact_validator() -> CompiledValidator:
+    return CompiledValidator(
+        schema=Path(__file__)
+        .parent.resolve()
+        .joinpath(SchemaFolder, ArtifactSchemaFile),
+        enums=_lazy("enums"),
+    )
+
+
+# Module attributes built on first use, as they read the schemas and the config
+_lazy_attributes: Dict[str, Callable[[], object]] = {
+    "common_metadata_validator": _common_metadata_validator,
+    "enums": _enums,
+    "type_checker": _type_checker,
+    "common_artifact_validator": _common_artifact_validator,
+}
+
+
+def _lazy(name: str):
+    value = globals().get(name)
+    if value is None:
+        value = globals()[name] = _lazy_attributes[name]()
+    return value
+
+
+def __getattr__(name: str):
+    if name in _lazy_attributes:
+        return _lazy(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+common_metadata_validator: JsonValidator
+enums: Dict[str, FrozenSet[str]]
+type_checker: TypeChecker
+common_artifact_validator: CompiledValidator
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+
+# Copyright 2023 The chainmetareader Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from pathlib import Path
+from typing import Optional
+
+import click
+
+from chainmeta_reader.config import compile_config
+
+
+@click.command()
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False),
+    help="Folder of the compiled config, CHAINMETA_CONFIG_CACHE by default.",
+)
+def compile(cache_dir: Optional[str]):
+    """Compile the taxonomy config into the cache, which is otherwise only
+    done when the config is loaded with CHAINMETA_CONFIG_CACHE set."""
+
+    path = compile_config(Path(cache_dir) if cache_dir else None)
+    click.echo(click.style(f"Compiled the config to {path}", fg="green"))
+
+
+if __name__ == "__main__":
+    compile()
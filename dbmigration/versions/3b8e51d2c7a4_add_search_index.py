@@ -0,0 +1,42 @@
+# Copyright 2023 The chainmetareader Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""add search index
+
+Revision ID: 3b8e51d2c7a4
+Revises: f1e13c4fa803
+Create Date: 2026-10-18 10:12:41.503417
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "3b8e51d2c7a4"
+down_revision = "f1e13c4fa803"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Matches the sort order of search_chainmeta(), the primary key is
+    # implicitly part of the index
+    op.create_index(
+        op.f("idx_chainmeta_chain_address_source_submitted_by"),
+        "chainmeta",
+        ["chain", "address", "source", "submitted_by"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("idx_chainmeta_chain_address_source_submitted_by"), "chainmeta")
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+
+# Copyright 2023 The chainmetareader Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import click
+
+from chainmeta_reader.snapshot import export_snapshot
+
+
+@click.command()
+@click.argument("filename", type=click.Path(dir_okay=False))
+@click.option("--page-size", default=10_000, help="Number of items read per query.")
+def export(filename: str, page_size: int):
+    """Export the chain metadata of the database to a snapshot file, which the
+    API server serves from with CHAINMETA_LABEL_SNAPSHOT=FILENAME."""
+
+    n = export_snapshot(filename, page_size=page_size)
+    click.echo(click.style(f"Exported {n} items to {filename}", fg="green"))
+
+
+if __name__ == "__main__":
+    export()
@@ -0,0 +1,70 @@
+# Copyright 2023 The chainmetareader Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import shutil
+import tempfile
+from typing import List
+
+import pytest
+from sqlalchemy import func, select
+
+from chainmeta_reader import db
+from chainmeta_reader.metadata import ChainmetaItem
+
+
+def pytest_configure(config):
+    # Configs compiled by the tests are not written to the user cache folder
+    cache_dir = tempfile.mkdtemp(prefix="chainmeta-config-")
+    config.add_cleanup(lambda: shutil.rmtree(cache_dir, ignore_errors=True))
+    monkeypatch = pytest.MonkeyPatch()
+    monkeypatch.setenv("CHAINMETA_CONFIG_CACHE", cache_dir)
+    config.add_cleanup(monkeypatch.undo)
+
+
+@pytest.fixture
+def database(tmp_path):
+    db.init_db(f"sqlite:///{tmp_path.joinpath('chainmeta.db')}")
+    assert db._session_maker is not None
+    with db._session_maker() as session:
+        db.mapper_registry.metadata.create_all(session.get_bind())
+    yield db._session_maker
+
+
+@pytest.fixture
+def items():
+    items = make_items(30)
+    # The same address on another chain, and from another submitter
+    items.append(make_items(2, submitted_by="another tester")[1])
+    items[-1].chain = "bitcoin_mainnet"
+    items.append(make_items(2, submitted_by="another tester")[1])
+    return items
+
+
+def make_items(n: int, *, submitted_by: str = "tester") -> List[ChainmetaItem]:
+    return [
+        ChainmetaItem(
+            chain="ethereum_mainnet" if i % 2 else "bitcoin_mainnet",
+            address=f"0x{i:040x}",
+            entity="uniswap",
+            name=f"Name {i}" if i % 3 else None,
+            categories=["dex", "defi"][: i % 3],
+            source="ground_truth",
+            submitted_by=submitted_by,
+            submitted_on="2023-04-04",
+        )
+        for i in range(n)
+    ]
+
+
+def count_records(session_maker) -> int:
+    with session_maker() as session:
+        return session.scalar(select(func.count()).select_from(db.ChainmetaRecord))
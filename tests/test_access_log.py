@@ -0,0 +1,98 @@
+# Copyright 2023 The chainmetareader Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import asyncio
+import logging
+
+import pytest
+
+from api_server import access_log
+from api_server.access_log import AccessLogMiddleware, start_queued_logging
+
+
+def make_app(status: int, chunks):
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": status, "headers": []})
+        for chunk in chunks:
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+
+    return app
+
+
+def request(middleware):
+    scope = {"type": "http", "method": "GET", "path": "/v1/query"}
+    sent = []
+
+    async def receive():
+        return {"type": "http.request"}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(middleware(scope, receive, send))
+    return sent
+
+
+def test_access_log(caplog):
+    chunks = [b'{"a": 1}\n', b'{"b": 2}\n']
+    middleware = AccessLogMiddleware(make_app(200, chunks))
+    with caplog.at_level(logging.INFO, logger="chainmeta.access"):
+        sent = request(middleware)
+
+    # The response is passed through untouched
+    assert [m.get("body") for m in sent[1:]] == chunks + [b""]
+    assert len(caplog.records) == 1
+    assert caplog.records[0].getMessage().startswith("GET /v1/query 200 ")
+    assert caplog.records[0].getMessage().endswith(" 18B")
+
+
+@pytest.mark.parametrize(
+    "status,log_error_bodies,expected",
+    [(200, True, None), (404, False, None), (404, True, "'not found'")],
+)
+def test_access_log_sampling(caplog, status, log_error_bodies, expected):
+    middleware = AccessLogMiddleware(
+        make_app(status, [b"not found"]),
+        sample_rate=0,
+        log_error_bodies=log_error_bodies,
+        max_body_bytes=9,
+    )
+    with caplog.at_level(logging.INFO, logger="chainmeta.access"):
+        for _ in range(10):
+            request(middleware)
+
+    # Successful requests are sampled out, errors are always logged
+    if status < 400:
+        assert not caplog.records
+        return
+    assert len(caplog.records) == 10
+    message = caplog.records[0].getMessage()
+    assert message.endswith(expected) if expected else message.endswith("9B")
+
+
+def test_start_queued_logging(monkeypatch):
+    records = []
+
+    class Handler(logging.Handler):
+        def emit(self, record):
+            records.append(record.getMessage())
+
+    monkeypatch.setattr(access_log.access_logger, "handlers", [])
+    listener = start_queued_logging(Handler())
+    try:
+        request(AccessLogMiddleware(make_app(200, [b"ok"])))
+    finally:
+        listener.stop()
+        access_log.access_logger.propagate = True
+    assert len(records) == 1
+    assert records[0].startswith("GET /v1/query 200 ")
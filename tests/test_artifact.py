@@ -0,0 +1,81 @@
+# Copyright 2023 The chainmetareader Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import io
+
+import pytest
+
+from chainmeta_reader.artifact import (
+    ArtifactParseError,
+    csv_iter_columns,
+    csv_iter_parser,
+    csv_parser,
+)
+
+content = "a\tb\tc\nETH\t0x1\t\nETH\t0x2\tdex\n\nBTC\t0x3\tdex\n"
+expected = [
+    {"a": "ETH", "b": "0x1", "c": None},
+    {"a": "ETH", "b": "0x2", "c": "dex"},
+    {"a": "BTC", "b": "0x3", "c": "dex"},
+]
+
+
+@pytest.mark.parametrize("block_size", [1, 2, 5, 1 << 20])
+@pytest.mark.parametrize("newline", ["\n", "\r\n"])
+def test_csv_iter_parser(block_size: int, newline: str):
+    f = io.StringIO(content.replace("\n", newline))
+    rows = list(csv_iter_parser(f, block_size=block_size))
+    assert rows == expected
+
+
+def test_csv_parser_interns_values():
+    rows = csv_parser(content)
+    assert rows == expected
+    assert rows[0]["a"] is rows[1]["a"]  # type: ignore
+
+
+@pytest.mark.parametrize(
+    "malformed,line",
+    [
+        ("a\tb\tc\nETH\t0x1\t\nETH\t0x2\n", 3),
+        ("a\tb\tc\n\nETH\t0x1\t\t\n", 3),
+    ],
+)
+def test_csv_parser_malformed(malformed: str, line: int):
+    with pytest.raises(ArtifactParseError) as e:
+        csv_parser(malformed)
+    assert e.value.line == line
+
+
+@pytest.mark.parametrize("block_size", [1, 5, 1 << 20])
+@pytest.mark.parametrize("chunk_rows", [1, 2, 100])
+def test_csv_iter_columns(block_size: int, chunk_rows: int):
+    f = io.StringIO(content.replace("\n", "\r\n"))
+    tables = list(csv_iter_columns(f, block_size=block_size, chunk_rows=chunk_rows))
+
+    assert [len(t) for t in tables] == [
+        min(chunk_rows, len(expected) - i) for i in range(0, 3, chunk_rows)
+    ]
+    assert [r for t in tables for r in t.rows()] == expected
+
+
+@pytest.mark.parametrize(
+    "malformed,line",
+    [
+        ("a\tb\tc\nETH\t0x1\t\nETH\t0x2\n", 3),
+        ("a\tb\tc\n\nETH\t0x1\t\t\n", 3),
+    ],
+)
+def test_csv_iter_columns_malformed(malformed: str, line: int):
+    with pytest.raises(ArtifactParseError) as e:
+        list(csv_iter_columns(io.StringIO(malformed)))
+    assert e.value.line == line
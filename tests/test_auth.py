@@ -0,0 +1,153 @@
+# Copyright 2023 The chainmetareader Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import threading
+
+import pytest
+
+from api_server import auth
+from api_server.auth import TokenVerifier
+from chainmeta_reader import db
+
+
+@pytest.fixture
+def tokens(database):
+    db.add_api_token("valid", "tester")
+    db.add_api_token("revoked", "tester")
+    set_status("revoked", 1)
+    yield
+
+
+def set_status(token: str, status: int):
+    assert db._session_maker is not None
+    with db._session_maker() as session:
+        session.get(db.ApiToken, token).status = status
+        session.commit()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(auth, "monotonic", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def lookups(monkeypatch):
+    calls = []
+    find_valid_token = db.find_valid_token
+
+    def _find_valid_token(token):
+        calls.append(token)
+        return find_valid_token(token)
+
+    monkeypatch.setattr(db, "find_valid_token", _find_valid_token)
+    return calls
+
+
+def test_find_valid_tokens(tokens):
+    assert db.find_valid_token("valid") == {"token": "valid", "belongs_to": "tester"}
+    assert db.find_valid_token("revoked") == {}
+    assert db.find_valid_token("unknown") == {}
+    assert db.find_valid_tokens() == {"valid": "tester"}
+
+
+def test_token_verifier(tokens, clock, lookups):
+    verifier = TokenVerifier(ttl=60, negative_ttl=10, refresh_interval=300)
+    for _ in range(3):
+        assert verifier.verify("valid")
+        assert not verifier.verify("revoked")
+        assert not verifier.verify("unknown")
+    # Valid tokens come from the bulk refresh, invalid ones are looked up once
+    assert lookups == ["revoked", "unknown"]
+
+    # New tokens are found once the negative answer expires
+    db.add_api_token("unknown", "tester")
+    assert not verifier.verify("unknown")
+    clock[0] += 11
+    assert verifier.verify("unknown")
+    assert lookups == ["revoked", "unknown", "unknown"]
+
+    # Revoked tokens are rejected after the next refresh
+    set_status("valid", 1)
+    clock[0] += 200
+    assert verifier.verify("valid")
+    clock[0] += 101
+    assert not verifier.verify("valid")
+
+
+def test_token_verifier_invalidate(tokens):
+    verifier = TokenVerifier()
+    assert not verifier.verify("new")
+    db.add_api_token("new", "tester")
+    assert not verifier.verify("new")
+    verifier.invalidate("new")
+    assert verifier.verify("new")
+
+
+def test_token_verifier_single_refresh(tokens, monkeypatch):
+    refreshes = []
+    started = threading.Event()
+    release = threading.Event()
+    find_valid_tokens = db.find_valid_tokens
+
+    def _find_valid_tokens():
+        refreshes.append(threading.get_ident())
+        started.set()
+        release.wait(5)
+        return find_valid_tokens()
+
+    monkeypatch.setattr(db, "find_valid_tokens", _find_valid_tokens)
+    verifier = TokenVerifier()
+    results = []
+    refreshing = threading.Thread(
+        target=lambda: results.append(verifier.verify("valid"))
+    )
+    refreshing.start()
+    assert started.wait(5)
+
+    # Concurrent requests do not refresh again, and look the token up
+    others = [
+        threading.Thread(target=lambda: results.append(verifier.verify("valid")))
+        for _ in range(4)
+    ]
+    for t in others:
+        t.start()
+    for t in others:
+        t.join()
+    release.set()
+    refreshing.join()
+    assert results == [True] * 5
+    assert len(refreshes) == 1
+
+
+def test_token_verifier_refresh_failure(tokens, monkeypatch, clock, lookups):
+    refreshes = []
+    find_valid_tokens = db.find_valid_tokens
+
+    def _find_valid_tokens():
+        refreshes.append(clock[0])
+        if len(refreshes) == 1:
+            raise RuntimeError("database unavailable")
+        return find_valid_tokens()
+
+    monkeypatch.setattr(db, "find_valid_tokens", _find_valid_tokens)
+    verifier = TokenVerifier(ttl=60, refresh_interval=300)
+    # Looked up individually, the refresh is only retried after the interval
+    assert verifier.verify("valid")
+    clock[0] += 100
+    assert verifier.verify("valid")
+    assert lookups == ["valid", "valid"]
+    clock[0] += 201
+    assert verifier.verify("valid")
+    assert refreshes == [1000.0, 1301.0]
+    assert lookups == ["valid", "valid"]
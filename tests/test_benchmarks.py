@@ -0,0 +1,108 @@
+# Copyright 2023 The chainmetareader Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import json
+import pathlib
+
+import pytest
+from click.testing import CliRunner
+
+import chainmeta_reader
+from benchmarks import search, suite
+from benchmarks.generator import schemas, write_document
+from benchmarks.suite import benchmark, find_regressions
+from chainmeta_reader import db
+from tests.conftest import make_items
+
+
+@pytest.mark.parametrize("schema", sorted(schemas))
+@pytest.mark.parametrize("rows", [1, 100])
+def test_generated_document(tmp_path: pathlib.Path, schema: str, rows: int):
+    path = write_document(tmp_path, schema, rows, seed=1)
+    with open(path) as f:
+        metadata = chainmeta_reader.load(f, artifact_base_path=tmp_path)
+    items = metadata["chainmetadata"]["artifact"]
+    assert len(items) == rows
+
+    other = tmp_path.joinpath("other")
+    other.mkdir()
+    with open(write_document(other, schema, rows, seed=1)) as f:
+        assert chainmeta_reader.load(f, artifact_base_path=other) == metadata
+
+
+def test_find_regressions():
+    baseline = [
+        {"schema": "common", "rows": 10, "stage": "load", "seconds": 1.0},
+        {"schema": "common", "rows": 10, "stage": "upload", "seconds": 1.0},
+    ]
+    results = [
+        {"schema": "common", "rows": 10, "stage": "load", "seconds": 1.1},
+        {"schema": "common", "rows": 10, "stage": "upload", "seconds": 1.5},
+        {"schema": "common", "rows": 10, "stage": "search", "seconds": 9.0},
+    ]
+    regressions = find_regressions(results, baseline, threshold=0.2)
+    assert regressions == ["common 10 rows upload: 1.5000s, was 1.0000s"]
+
+
+def test_run_once_chunks(tmp_path: pathlib.Path, monkeypatch):
+    monkeypatch.setattr(suite, "chunk_rows", 7)
+    monkeypatch.setattr(suite, "lookup_keys", 5)
+    lookups = []
+    monkeypatch.setattr(
+        suite.LabelIndex, "lookup_many", lambda self, keys: lookups.extend(keys)
+    )
+
+    timings = suite.run_once(tmp_path, "common", 20, seed=1)
+    assert timings["upload"] > 0 and timings["flatten"] > 0
+    assert len(lookups) == len(set(lookups)) == 5
+
+
+def test_benchmark(tmp_path: pathlib.Path):
+    output = tmp_path.joinpath("results.json")
+    args = ["--rows", "20", "--schema", "chaintool", "--repeat", "1"]
+    result = CliRunner().invoke(benchmark, args + ["--output", str(output)])
+    assert result.exit_code == 0, result.output
+    with open(output) as f:
+        results = json.load(f)["results"]
+    assert {r["stage"] for r in results} == {
+        "load",
+        "validate",
+        "translate",
+        "flatten",
+        "upload",
+        "search",
+        "lookup",
+        "index_build",
+        "index_lookup",
+        "snapshot_write",
+        "snapshot_lookup",
+    }
+
+    baseline = tmp_path.joinpath("baseline.json")
+    with open(baseline, "w") as f:
+        json.dump({"results": [dict(r, seconds=0.0) for r in results]}, f)
+    result = CliRunner().invoke(benchmark, args + ["--baseline", str(baseline)])
+    assert result.exit_code == 1
+    assert "regression: chaintool 20 rows upload" in result.output
+
+
+@pytest.mark.parametrize("page_size", [3, 7, 100])
+def test_page_selects(database, page_size: int):
+    db.upload_chainmeta(make_items(20) + make_items(5, submitted_by="another"))
+    cursors = search.page_cursors(page_size)
+    assert len(cursors) == 25 // page_size + 1
+
+    with database() as session:
+        for page, cursor in enumerate(cursors):
+            keyset = session.execute(db._page_select({}, page_size, cursor)).all()
+            offset = session.execute(search.offset_page_select(page_size, page)).all()
+            assert keyset == offset
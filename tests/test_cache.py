@@ -0,0 +1,145 @@
+# Copyright 2023 The chainmetareader Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import asyncio
+
+import pytest
+
+from chainmeta_reader import cache
+from chainmeta_reader.cache import LabelCache, filter_key
+from chainmeta_reader.metadata import ChainmetaItem
+
+
+def make_item(address: str, chain: str = "ethereum_mainnet") -> ChainmetaItem:
+    return ChainmetaItem(
+        chain=chain,
+        address=address,
+        entity="binance",
+        name=None,
+        categories=["cex"],
+        source="ground_truth",
+        submitted_by="tester",
+        submitted_on="2023-04-04",
+    )
+
+
+@pytest.mark.parametrize(
+    "filter,key",
+    [
+        ({}, None),
+        ({"chain": "ethereum_mainnet"}, None),
+        ({"address": "0x1", "unknown": "x"}, None),
+        ({"address": "0x1"}, (("address", "0x1"),)),
+        (
+            {"chain": "ethereum_mainnet", "address": "0x1"},
+            (("address", "0x1"), ("chain", "ethereum_mainnet")),
+        ),
+    ],
+)
+def test_filter_key(filter, key):
+    assert filter_key(filter) == key
+
+
+def test_label_cache_hit_and_miss():
+    c = LabelCache()
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return [make_item("0x1")]
+
+    key = filter_key({"address": "0x1"})
+    first = c.get_or_load(key, loader)
+    first[0].categories.append("modified")
+    assert c.get_or_load(key, loader) == [make_item("0x1")]
+    assert len(loads) == 1
+
+    stats = c.stats()
+    assert (stats.hits, stats.misses, stats.entries) == (1, 1, 1)
+    assert stats.size_bytes > 0
+
+
+def test_label_cache_eviction():
+    key1 = filter_key({"address": "0x1"})
+    size = cache._sizeof(key1, [make_item("0x1")])
+    c = LabelCache(max_bytes=2 * size + size // 2)
+    for address in ["0x1", "0x2", "0x1", "0x3"]:
+        c.get_or_load(filter_key({"address": address}), lambda: [make_item(address)])
+
+    # 0x2 is the least recently used
+    stats = c.stats()
+    assert (stats.entries, stats.evictions, stats.hits) == (2, 1, 1)
+    assert stats.size_bytes <= c.max_bytes
+    c.get_or_load(filter_key({"address": "0x2"}), lambda: [])
+    assert c.stats().misses == 4
+
+
+def test_label_cache_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache, "monotonic", lambda: now[0])
+    c = LabelCache(ttl=10)
+    key = filter_key({"address": "0x1"})
+    c.get_or_load(key, lambda: [make_item("0x1")])
+    now[0] += 5
+    c.get_or_load(key, lambda: [])
+    now[0] += 10
+    assert c.get_or_load(key, lambda: []) == []
+    stats = c.stats()
+    assert (stats.hits, stats.misses, stats.expirations) == (1, 2, 1)
+
+
+def test_label_cache_invalidate():
+    c = LabelCache()
+    filters = [
+        {"address": "0x1"},
+        {"address": "0x1", "chain": "ethereum_mainnet"},
+        {"address": "0x1", "chain": "bitcoin_mainnet"},
+        {"address": "0x2"},
+    ]
+    for f in filters:
+        c.get_or_load(filter_key(f), lambda: [make_item(f["address"])])
+
+    c.invalidate("ethereum_mainnet", "0x1")
+    stats = c.stats()
+    assert (stats.entries, stats.invalidations) == (2, 2)
+
+
+def test_label_cache_invalidate_during_load():
+    c = LabelCache()
+    key = filter_key({"address": "0x1"})
+
+    def loader():
+        c.invalidate("ethereum_mainnet", "0x1")
+        return [make_item("0x1")]
+
+    assert c.get_or_load(key, loader) == [make_item("0x1")]
+    # The results may predate the invalidation, they are not cached
+    assert c.stats().entries == 0
+
+
+def test_label_cache_async():
+    c = LabelCache()
+    key = filter_key({"address": "0x1"})
+
+    async def loader():
+        return [make_item("0x1")]
+
+    async def failing_loader():
+        raise RuntimeError("database is down")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(c.get_or_load_async(key, failing_loader))
+    assert asyncio.run(c.get_or_load_async(key, loader)) == [make_item("0x1")]
+    assert asyncio.run(c.get_or_load_async(key, failing_loader)) == [make_item("0x1")]
+    stats = c.stats()
+    assert (stats.hits, stats.misses, stats.entries) == (1, 2, 1)
+    assert not c._loading
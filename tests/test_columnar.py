@@ -0,0 +1,154 @@
+# Copyright 2023 The chainmetareader Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import pathlib
+from dataclasses import replace
+
+import pytest
+from jsonschema import ValidationError
+
+import chainmeta_reader
+from chainmeta_reader import db
+from chainmeta_reader.columnar import Column, Columns
+from chainmeta_reader.validator import common_artifact_validator
+from tests.conftest import count_records, make_items
+
+data_folder = pathlib.Path(__file__).parent.resolve().joinpath("data")
+
+
+def test_column_encode():
+    values = ["eth", "btc", "eth", None, "eth"]
+    column = Column.encode(values)
+
+    assert column.codes is not None
+    assert column.values == ["eth", "btc", None]
+    assert list(column) == values
+    assert [column[i] for i in range(len(column))] == values
+    assert list(column.slice(1, 4)) == values[1:4]
+    assert list(column.map(str)) == [str(v) for v in values]
+
+
+@pytest.mark.parametrize(
+    "values, limit",
+    [([str(i) for i in range(10)], 5), ([[1], [2], [1]], 100)],
+)
+def test_column_plain(values, limit):
+    column = Column.encode(values, limit=limit)
+
+    assert column.codes is None
+    assert list(column) == values
+    assert list(column.slice(1, 3)) == values[1:3]
+
+
+@pytest.mark.parametrize("limit", [2, 100])
+def test_column_find_invalid(limit):
+    column = Column.encode(["a", "b", "a", "c", "b", "c"], limit=limit)
+
+    assert column.find_invalid(lambda v: v != "c") == 3
+    assert column.find_invalid(lambda v: v != "b") == 1
+    assert column.find_invalid(lambda v: True) == -1
+
+
+def test_columns_from_rows():
+    rows = [{"a": 1, "b": ["x"]}, {"a": 2, "b": ["x"]}]
+    columns = Columns.from_rows(rows)
+
+    assert columns is not None
+    assert columns.names == ["a", "b"]
+    assert columns["b"].values == [("x",)]
+    assert columns.rows() == rows
+    # Rows do not share their lists
+    a, b = columns.rows()
+    assert a["b"] is not b["b"]
+
+    assert Columns.from_rows([{"a": 1}, {"b": 2}]) is None
+    assert Columns.from_rows([{"a": 1}, ["b"]]) is None
+
+
+@pytest.mark.parametrize("size", [1, 3, 10])
+def test_columns_chunks(size):
+    items = make_items(10)
+    chunks = list(Columns.from_items(items).chunks(size))
+
+    assert [len(c) for c in chunks] == [min(size, 10 - i) for i in range(0, 10, size)]
+    assert [i for c in chunks for i in c.to_items()] == items
+
+
+@pytest.mark.parametrize(
+    "input_file",
+    ["chaintool_sample.json", "coinbase_sample.json", "goplus_sample.json"],
+)
+@pytest.mark.parametrize("chunk_rows", [7, 100_000])
+def test_iter_load_columns(input_file: str, chunk_rows: int):
+    with open(data_folder.joinpath(input_file)) as f:
+        expected = list(chainmeta_reader.iter_load(f, artifact_base_path=data_folder))
+    with open(data_folder.joinpath(input_file)) as f:
+        tables = chainmeta_reader.iter_load_columns(
+            f, artifact_base_path=data_folder, chunk_rows=chunk_rows
+        )
+        assert [i for t in tables for i in t.to_items()] == expected
+
+
+@pytest.mark.parametrize(
+    "input_file", ["chaintool_invalid_sample.json", "coinbase_invalid_sample.json"]
+)
+def test_iter_load_columns_invalid(input_file: str):
+    with open(data_folder.joinpath(input_file)) as f:
+        with pytest.raises(ValidationError):
+            list(chainmeta_reader.iter_load_columns(f, artifact_base_path=data_folder))
+
+
+@pytest.mark.parametrize(
+    "field, value",
+    [
+        ("chain", "not_a_chain"),
+        ("address", None),
+        ("categories", ["cex", "not_a_category"]),
+        ("source", None),
+    ],
+)
+def test_validate_columns(field, value):
+    rows = [i.__dict__ for i in make_items(20)]
+    rows[13] = dict(rows[13], **{field: value})
+
+    with pytest.raises(ValidationError) as e:
+        common_artifact_validator.validate_columns(Columns.from_rows(rows))
+    assert list(e.value.path) == [13, field]
+    assert e.value.instance == value
+
+
+def test_flatten_columns():
+    items = make_items(30)
+    items[4] = replace(items[4], submitted_on="not a date")
+    items[5] = replace(items[5], entity=None, categories=["cex", ""])
+
+    record_columns = db.flatten_columns(Columns.from_items(items))
+    records = [dict(zip(record_columns, r)) for r in zip(*record_columns.values())]
+
+    def _key(r: dict):
+        return tuple(str(r[k]) for k in sorted(r))
+
+    assert sorted(records, key=_key) == sorted(db.flatten_values(items), key=_key)
+
+
+def test_upload_columns(database):
+    items = make_items(500)
+    stats = db.UploadStats()
+    inserted = db.upload_columns(
+        [Columns.from_items(items)], batch_size=64, max_concurrency=1, stats=stats
+    )
+
+    assert inserted == count_records(database) == len(db.flatten_values(items))
+    assert stats.items == 500
+    assert stats.batches == 8
+    # Already uploaded
+    assert db.upload_columns([Columns.from_items(items)], max_concurrency=1) == 0
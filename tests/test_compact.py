@@ -0,0 +1,50 @@
+# Copyright 2023 The chainmetareader Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import pickle
+
+import pytest
+
+from chainmeta_reader.compact import CompactChainmetaItem, compact
+from tests.conftest import make_items
+
+
+@pytest.mark.parametrize("n", [1, 10])
+def test_round_trip(n: int):
+    items = make_items(n)
+    compact_items = compact(items)
+    assert [i.to_item() for i in compact_items] == items
+    assert [i.to_dict() for i in compact_items] == [i.__dict__ for i in items]
+    assert [CompactChainmetaItem.from_dict(i.__dict__) for i in items] == compact_items
+    assert pickle.loads(pickle.dumps(compact_items)) == compact_items
+
+
+def test_interned():
+    a, b = compact(make_items(5)[3:5])
+    assert not hasattr(a, "__dict__")
+    assert a.source is b.source
+    assert a.submitted_on is b.submitted_on
+    assert isinstance(a.categories, tuple)
+
+    # Equal values built separately share a single instance
+    other = CompactChainmetaItem(
+        "".join(["ethereum", "_mainnet"]),
+        "0x1",
+        None,
+        None,
+        ["".join(["d", "ex"])],
+        "ground_truth",
+        "tester",
+        "2023-04-04",
+    )
+    assert other.chain is a.chain
+    assert other.categories is compact(make_items(2))[1].categories
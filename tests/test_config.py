@@ -10,9 +10,115 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import json
+import shutil
+
+import pytest
+
+from chainmeta_reader import config
+from chainmeta_reader.constants import Field
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("CHAINMETA_CONFIG_CACHE", str(tmp_path))
+    return tmp_path
 
 
 def test_config():
     from chainmeta_reader.config import default_config
 
     assert default_config is not None
+
+
+def test_compiled_config(cache_dir, monkeypatch):
+    expected = config.load_config(use_cache=False)
+
+    assert config.load_config() == expected
+    path = config._compiled_path()
+    assert list(cache_dir.iterdir()) == [path]
+
+    def _load_json():
+        raise AssertionError("the compiled config is not used")
+
+    monkeypatch.setattr(config, "_load_json", _load_json)
+    compiled = config.load_config()
+    assert compiled == expected
+    assert compiled.Categories == expected.Categories
+    for f, t in expected.Keys.items():
+        assert compiled.Keys[f].keys == t.keys
+        assert compiled.Keys[f].ids == t.ids
+        assert compiled.Keys[f].key_set == t.key_set
+    assert {c.description for c in compiled.Categories} == {
+        c.description for c in expected.Categories
+    }
+
+
+@pytest.mark.parametrize("content", [b"", b"garbage", b"\xe9" * 100])
+def test_invalid_compiled_config(cache_dir, content):
+    path = config._compiled_path()
+    path.write_bytes(content)
+
+    assert config.load_config() == config.load_config(use_cache=False)
+    # Compiled again
+    assert path.read_bytes() != content
+
+
+def test_cache_dir_not_writable(cache_dir, monkeypatch):
+    not_a_folder = cache_dir.joinpath("file")
+    not_a_folder.write_text("")
+    monkeypatch.setenv("CHAINMETA_CONFIG_CACHE", str(not_a_folder))
+
+    assert config.load_config() == config.load_config(use_cache=False)
+
+
+def test_compile_config(tmp_path):
+    stale = tmp_path.joinpath("config-stale.bin")
+    stale.write_bytes(b"")
+    path = config.compile_config(tmp_path)
+    assert list(tmp_path.iterdir()) == [path]
+    assert config._read_compiled(path) == config.load_config(use_cache=False)
+
+
+def test_default_cache_dir(tmp_path, monkeypatch):
+    monkeypatch.delenv("CHAINMETA_CONFIG_CACHE")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    expected = config.load_config(use_cache=False)
+
+    # Only read
+    assert config.load_config() == expected
+    assert list(tmp_path.iterdir()) == []
+
+    path = config.compile_config()
+    assert path.parent == tmp_path.joinpath("chainmeta_reader")
+
+    def _load_json():
+        raise AssertionError("the compiled config is not used")
+
+    monkeypatch.setattr(config, "_load_json", _load_json)
+    assert config.load_config() == expected
+
+
+def test_config_hash(tmp_path):
+    for f in config._attributes:
+        shutil.copy(config._json_path(config._config_dir, f), tmp_path)
+    assert config.config_hash(str(tmp_path)) == config.config_hash()
+
+    chains = tmp_path.joinpath("chains.json")
+    items = json.loads(chains.read_text())
+    items.append({"key": "new_chain", "display_name": "New Chain"})
+    chains.write_text(json.dumps(items))
+    assert config.config_hash(str(tmp_path)) != config.config_hash()
+
+
+@pytest.mark.parametrize("field", [f.value for f in Field])
+def test_key_table(field):
+    table = config.load_config(use_cache=False).Keys[field]
+
+    assert list(table.keys) == sorted(table.key_set)
+    for key in table.keys:
+        assert key in table
+        assert table.key(table.id(key)) == key
+    assert "not_a_key" not in table
+    with pytest.raises(KeyError):
+        table.id("not_a_key")
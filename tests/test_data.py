@@ -0,0 +1,156 @@
+# Copyright 2023 The chainmetareader Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from api_server import data
+from chainmeta_reader import db
+from chainmeta_reader.index import LabelIndex
+from tests.conftest import make_items
+
+
+@pytest.fixture(params=["thread", "async"])
+def backend(request, database, tmp_path, monkeypatch):
+    db.upload_chainmeta(make_items(20))
+    db.add_api_token("valid", "tester")
+
+    data.token_verifier.invalidate()
+    monkeypatch.setattr(db, "_async_session_maker", None)
+    if request.param == "async":
+        pytest.importorskip("aiosqlite")
+        db.init_async_db(f"sqlite+aiosqlite:///{tmp_path.joinpath('chainmeta.db')}")
+    yield request.param
+
+
+def test_search(backend):
+    items = make_items(20)
+    search_filter = {"address": items[3].address}
+    assert asyncio.run(data.search(search_filter)) == [items[3]]
+
+    async def _iter_search():
+        return [i async for i in data.iter_search({}, chunk_size=3)]
+
+    results = asyncio.run(_iter_search())
+    assert results == list(db.search_chainmeta())
+    assert len(results) == 20
+
+
+def test_iter_search_concurrent(backend, monkeypatch):
+    if backend == "async":
+        pytest.skip("streams the asynchronous engine")
+
+    # Both streams are read on the same thread
+    executor = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(data, "_executor", executor)
+    sessions = []
+    session_maker = db._read_session_maker
+
+    def _session_maker():
+        sessions.append(session_maker())
+        return sessions[-1]
+
+    monkeypatch.setattr(db, "_read_session_maker", _session_maker)
+
+    async def _iter_search_concurrent():
+        first = data.iter_search({}, chunk_size=3)
+        results = [await first.__anext__()]
+        second = [i async for i in data.iter_search({}, chunk_size=3)]
+        results += [i async for i in first]
+        return results, second
+
+    try:
+        first, second = asyncio.run(_iter_search_concurrent())
+    finally:
+        executor.shutdown()
+    assert first == second == list(db.search_chainmeta())
+    assert len(sessions) == 3 and sessions[0] is not sessions[1]
+
+
+def test_iter_search_cancelled(backend, monkeypatch):
+    if backend == "async":
+        pytest.skip("streams the asynchronous engine")
+
+    reading = threading.Event()
+    release = threading.Event()
+    closed = []
+
+    def _search_chainmeta(*, filter):
+        try:
+            yield from make_items(3)
+            reading.set()
+            release.wait(5)
+            yield from make_items(6)[3:]
+        finally:
+            closed.append(True)
+
+    monkeypatch.setattr(db, "search_chainmeta", _search_chainmeta)
+    monkeypatch.setattr(data, "_label_index", None)
+
+    async def _consume(results):
+        async for item in data.iter_search({}, chunk_size=3):
+            results.append(item)
+
+    async def _cancel_while_reading():
+        results = []
+        task = asyncio.create_task(_consume(results))
+        await asyncio.get_running_loop().run_in_executor(None, reading.wait, 5)
+        task.cancel()
+        # The read of the second chunk ends after the cancellation
+        threading.Timer(0.1, release.set).start()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return results
+
+    assert asyncio.run(_cancel_while_reading()) == make_items(3)
+    assert closed == [True]
+
+
+def test_search_many(backend):
+    items = make_items(20)
+    keys = [(items[1].chain, items[1].address), (None, "0xunknown")]
+    results = asyncio.run(data.search_many(keys))
+    assert results == {keys[0]: [items[1]], keys[1]: []}
+
+
+def test_tokens(backend):
+    assert asyncio.run(data.find_token("valid")) == {
+        "token": "valid",
+        "belongs_to": "tester",
+    }
+    assert asyncio.run(data.find_token("invalid")) == {}
+    assert asyncio.run(data.verify_token("valid"))
+    assert not asyncio.run(data.verify_token("invalid"))
+
+
+def test_label_index(backend, monkeypatch):
+    monkeypatch.setattr(data, "_label_index", None)
+    items = make_items(20)
+    asyncio.run(data.refresh_label_index())
+    assert data._label_index is not None and len(data._label_index) == 20
+
+    # Served from the index, without the database
+    indexed = make_items(21)[20]
+    data.set_label_index(LabelIndex(items + [indexed]))
+    assert asyncio.run(data.search({"address": indexed.address})) == [indexed]
+
+    # Addresses missing from the index fall back to the database
+    data.set_label_index(LabelIndex(items[:10] + [indexed]))
+    assert asyncio.run(data.search({"address": items[15].address})) == [items[15]]
+    keys = [(None, indexed.address), (items[15].chain, items[15].address)]
+    assert asyncio.run(data.search_many(keys)) == {
+        keys[0]: [indexed],
+        keys[1]: [items[15]],
+    }
@@ -0,0 +1,306 @@
+# Copyright 2023 The chainmetareader Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+from sqlalchemy import CursorResult
+from sqlalchemy.orm import Session
+
+from chainmeta_reader import db
+from chainmeta_reader.cache import LabelCache
+from chainmeta_reader.compact import compact
+from chainmeta_reader.config import default_config
+from tests.conftest import count_records, make_items
+
+
+def test_upload_chainmeta(database):
+    items = make_items(500)
+    n_records = len(db.flatten_values(items))
+
+    assert db.upload_chainmeta(items, batch_size=64) == n_records
+    assert count_records(database) == n_records
+
+    # Existing records, and duplicates within a batch, are skipped
+    assert db.upload_chainmeta(items + items[:10], batch_size=64) == 0
+    more_items = make_items(10, submitted_by="another tester")
+    assert db.upload_chainmeta(items[:10] + more_items) == len(
+        db.flatten_values(more_items)
+    )
+    assert count_records(database) == n_records + len(db.flatten_values(more_items))
+
+
+def test_upload_chainmeta_stats(database):
+    items = make_items(100)
+    stats = db.UploadStats()
+    inserted = db.upload_chainmeta(
+        iter(items), batch_size=10, max_concurrency=3, stats=stats
+    )
+    assert inserted == stats.inserted == len(db.flatten_values(items))
+    assert stats.batches == 10
+    assert stats.items == 100
+    assert stats.failed_batches == 0
+    assert len(stats.batch_latencies) == 10
+
+
+def test_upload_compact_chainmeta(database):
+    items = make_items(10)
+    inserted = db.upload_chainmeta(compact(items))
+    assert inserted == count_records(database) == len(db.flatten_values(items))
+    assert list(db.search_chainmeta(filter={"address": items[4].address})) == [items[4]]
+
+
+def test_upload_chainmeta_unknown_rowcount(database, monkeypatch):
+    # As reported by drivers which do not count the rows of bulk inserts
+    monkeypatch.setattr(CursorResult, "rowcount", property(lambda self: -1))
+    items = make_items(20)
+    stats = db.UploadStats()
+
+    assert db.upload_chainmeta(items, batch_size=8, stats=stats) == 0
+    assert stats.failed_batches == 0
+    assert stats.skipped == stats.records == len(db.flatten_values(items))
+    assert count_records(database) == stats.records
+
+
+def test_upload_chainmeta_failed_commit(database, monkeypatch):
+    def _commit(self):
+        raise RuntimeError("commit failed")
+
+    monkeypatch.setattr(Session, "commit", _commit)
+    items = make_items(20)
+    stats = db.UploadStats()
+
+    assert db.upload_chainmeta(items, batch_size=8, stats=stats) == 0
+    assert stats.failed_batches == stats.batches == 3
+    assert stats.inserted == 0
+    monkeypatch.undo()
+    assert count_records(database) == 0
+
+
+def test_upload_chainmeta_async(database, tmp_path):
+    pytest.importorskip("aiosqlite")
+    import asyncio
+
+    db.init_async_db(f"sqlite+aiosqlite:///{tmp_path.joinpath('chainmeta.db')}")
+
+    async def _items():
+        for item in make_items(50):
+            yield item
+
+    async def _upload():
+        # Pooled connections belong to the event loop, both uploads use the
+        # same one
+        stats = db.UploadStats()
+        inserted = await db.upload_chainmeta_async(_items(), batch_size=8, stats=stats)
+        again = await db.upload_chainmeta_async(make_items(50))
+        return inserted, stats, again
+
+    inserted, stats, again = asyncio.run(_upload())
+    assert inserted == len(db.flatten_values(make_items(50)))
+    assert stats.batches == 7
+    assert count_records(database) == inserted
+    assert again == 0
+
+
+def test_pool_stats(tmp_path):
+    from chainmeta_reader.pool import PoolConfig
+
+    db_path = tmp_path.joinpath("chainmeta.db")
+    db.init_db(
+        f"sqlite:///{db_path}",
+        pool=PoolConfig(pool_size=2, max_overflow=1, pool_pre_ping=True),
+        read_pool=PoolConfig(pool_size=4),
+    )
+    assert db._session_maker is not None
+    with db._session_maker() as session:
+        db.mapper_registry.metadata.create_all(session.get_bind())
+    db.upload_chainmeta(make_items(10), batch_size=2, max_concurrency=3)
+    assert list(db.search_chainmeta())
+
+    stats = db.get_pool_stats()
+    assert stats["write"].size == 2
+    assert stats["read"].size == 4
+    assert stats["write"].checked_out == 0
+    assert stats["write"].checkouts >= 5
+    assert stats["read"].checkouts >= 1
+    assert stats["write"].wait_time_max >= 0
+
+
+def test_pool_after_fork(database):
+    import multiprocessing
+
+    db.upload_chainmeta(make_items(10))
+    expected = len(list(db.search_chainmeta()))
+
+    def _search(conn):
+        conn.send(len(list(db.search_chainmeta())))
+
+    parent_conn, child_conn = multiprocessing.Pipe()
+    process = multiprocessing.get_context("fork").Process(
+        target=_search, args=(child_conn,)
+    )
+    process.start()
+    process.join()
+    assert parent_conn.recv() == expected
+    # The parent's pooled connections are still usable
+    assert len(list(db.search_chainmeta())) == expected
+
+
+@pytest.mark.parametrize("page_size", [1, 2, 3, 7, 1000])
+def test_search_chainmeta_pagination(database, page_size: int):
+    items = make_items(40) + make_items(40, submitted_by="another tester")
+    db.upload_chainmeta(items)
+
+    results = list(db.search_chainmeta(page_size=page_size))
+    keys = [(r.chain, r.address, r.source, r.submitted_by) for r in results]
+    assert len(keys) == len(set(keys)) == len(items)
+    assert keys == sorted(keys)
+
+    expected = {(i.chain, i.address, i.submitted_by): i for i in items}
+    for r in results:
+        item = expected[(r.chain, r.address, r.submitted_by)]
+        assert r.entity == item.entity
+        assert r.name == item.name
+        assert r.categories == item.categories
+
+    filtered = list(
+        db.search_chainmeta(
+            filter={"chain": "ethereum_mainnet", "submitted_by": "tester"},
+            page_size=page_size,
+        )
+    )
+    assert len(filtered) == 20
+
+
+def test_search_chainmeta_matches_reduce(database):
+    items = make_items(30)
+    db.upload_chainmeta(items)
+    newer = make_items(5)
+    for i in newer:
+        i.categories = ["cex"]
+        i.submitted_on = "2023-05-01"
+    db.upload_chainmeta(newer)
+
+    with database() as session:
+        records = session.query(db.ChainmetaRecord).order_by(db.ChainmetaRecord.id)
+        expected = sorted(
+            db.reduce(records.all()),
+            key=lambda i: (i.chain, i.address, i.source, i.submitted_by),
+        )
+    assert list(db.search_chainmeta(page_size=4)) == expected
+
+
+def test_search_chainmeta_categories_order(database):
+    # Enough records for ids of several digits
+    db.upload_chainmeta(make_items(10))
+    categories = sorted(c.key for c in default_config.Categories)[:12]
+    items = make_items(12, submitted_by="another tester")
+    for n, i in enumerate(items):
+        i.categories = categories[n:] + categories[:n]
+    db.upload_chainmeta(items)
+
+    for i in items:
+        found = db.search_chainmeta(filter={"address": i.address, "chain": i.chain})
+        assert [r.categories for r in found if r.submitted_by == i.submitted_by] == [
+            i.categories
+        ]
+
+
+def test_search_chainmeta_label_cache(tmp_path):
+    label_cache = LabelCache()
+    db.init_db(
+        f"sqlite:///{tmp_path.joinpath('chainmeta.db')}", label_cache=label_cache
+    )
+    assert db._session_maker is not None
+    with db._session_maker() as session:
+        db.mapper_registry.metadata.create_all(session.get_bind())
+
+    items = make_items(10)
+    db.upload_chainmeta(items)
+    address = items[1].address
+    search_filter = {"chain": "ethereum_mainnet", "address": address}
+    assert list(db.search_chainmeta(filter=search_filter)) == [items[1]]
+    assert list(db.search_chainmeta(filter=search_filter)) == [items[1]]
+    list(db.search_chainmeta())
+
+    stats = db.get_label_cache_stats()
+    assert stats is not None
+    assert (stats.hits, stats.misses, stats.entries) == (1, 1, 1)
+
+    # Uploads invalidate the cached results of their addresses
+    more_items = make_items(2, submitted_by="another tester")
+    db.upload_chainmeta(more_items)
+    assert len(list(db.search_chainmeta(filter=search_filter))) == 2
+    assert label_cache.stats().invalidations == 1
+
+
+def test_search_chainmeta_many_label_cache(tmp_path, monkeypatch):
+    label_cache = LabelCache()
+    db.init_db(
+        f"sqlite:///{tmp_path.joinpath('chainmeta.db')}", label_cache=label_cache
+    )
+    assert db._session_maker is not None
+    with db._session_maker() as session:
+        db.mapper_registry.metadata.create_all(session.get_bind())
+    items = make_items(10)
+    db.upload_chainmeta(items)
+
+    # Warmed by a single search
+    single = list(db.search_chainmeta(filter={"address": items[1].address}))
+    keys = [(None, items[1].address), ("ethereum_mainnet", items[3].address)]
+    queried = []
+    search_many = db._search_chainmeta_many
+
+    def _search_chainmeta_many(keys, **kw):
+        queried.extend(keys)
+        return search_many(keys, **kw)
+
+    monkeypatch.setattr(db, "_search_chainmeta_many", _search_chainmeta_many)
+    results = db.search_chainmeta_many(keys)
+    assert results == {keys[0]: single, keys[1]: [items[3]]}
+    assert queried == keys[1:]
+
+    # All cached, and shared with single searches
+    assert db.search_chainmeta_many(keys) == results
+    search_filter = {"chain": "ethereum_mainnet", "address": items[3].address}
+    assert list(db.search_chainmeta(filter=search_filter)) == [items[3]]
+    assert queried == keys[1:]
+    stats = label_cache.stats()
+    assert (stats.hits, stats.misses, stats.entries) == (4, 2, 2)
+
+    # Uploads invalidate the cached results of their addresses
+    db.upload_chainmeta(make_items(4, submitted_by="another tester"))
+    assert [len(r) for r in db.search_chainmeta_many(keys).values()] == [2, 2]
+    assert queried == keys[1:] + keys
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 500])
+def test_search_chainmeta_many(database, chunk_size: int):
+    items = make_items(20) + make_items(20, submitted_by="another tester")
+    db.upload_chainmeta(items)
+
+    keys = [
+        ("ethereum_mainnet", items[1].address),
+        ("bitcoin_mainnet", items[1].address),
+        (None, items[2].address),
+        ("ethereum_mainnet", "0xunknown"),
+        ("bitcoin_mainnet", items[4].address),
+    ]
+    results = db.search_chainmeta_many(keys, chunk_size=chunk_size)
+
+    assert list(results) == keys
+    for key, found in results.items():
+        search_filter = {"address": key[1]}
+        if key[0] is not None:
+            search_filter["chain"] = key[0]
+        expected = db.search_chainmeta(filter=search_filter)
+        assert found == list(expected)
+    assert [len(r) for r in results.values()] == [2, 0, 2, 0, 2]
@@ -0,0 +1,86 @@
+# Copyright 2023 The chainmetareader Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+import pathlib
+import subprocess
+import sys
+from typing import Dict
+
+import pytest
+
+import chainmeta_reader
+
+# Modules which must not be imported by `import chainmeta_reader`, they are
+# imported on first use
+lazy_modules = [
+    "sqlalchemy",
+    "jsonschema",
+    "dateutil",
+    "chainmeta_reader.config",
+    "chainmeta_reader.contrib",
+    "chainmeta_reader.db",
+    "chainmeta_reader.schema",
+    "chainmeta_reader.validator",
+]
+
+# Generous budget for the cumulative import time of the package, importing it
+# eagerly took about 450ms
+import_time_budget_us = 200_000
+
+
+def import_times(statement: str, env: Dict[str, str]) -> Dict[str, int]:
+    """Return the cumulative import time of each module imported by
+    ``statement``, in microseconds, as reported by `python -X importtime`."""
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=env,
+        cwd=pathlib.Path(__file__).parent.parent,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line.split("|")
+            if cumulative.strip().isdigit():
+                times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_import_time(tmp_path):
+    db_path = tmp_path.joinpath("chainmeta.db")
+    env = dict(os.environ, CHAINMETA_DB_CONN=f"sqlite:///{db_path}")
+    # The fastest of a few runs, to be robust to a busy machine
+    runs = [import_times("import chainmeta_reader", env) for _ in range(3)]
+
+    for module in lazy_modules:
+        assert not [m for m in runs[0] if m == module or m.startswith(module + ".")]
+    assert min(r["chainmeta_reader"] for r in runs) < import_time_budget_us
+    # The database is connected to on first use
+    assert not db_path.exists()
+
+
+@pytest.mark.parametrize(
+    "name, module",
+    [
+        ("search_chainmeta", "chainmeta_reader.db"),
+        ("upload_chainmeta", "chainmeta_reader.db"),
+        ("ChaintoolTranslator", "chainmeta_reader.contrib.chaintool"),
+    ],
+)
+def test_lazy_attributes(name: str, module: str):
+    assert getattr(chainmeta_reader, name).__module__ == module
+    with pytest.raises(AttributeError):
+        chainmeta_reader.unknown_attribute
@@ -0,0 +1,68 @@
+# Copyright 2023 The chainmetareader Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import pytest
+
+from chainmeta_reader import db
+from chainmeta_reader.index import LabelIndex, LabelLookup
+
+
+def test_lookup(items):
+    index = LabelIndex(reversed(items))
+    assert len(index) == len(items)
+    address = items[1].address
+    assert index.lookup(address, "ethereum_mainnet") == [items[-1], items[1]]
+    assert index.lookup(address, "bitcoin_mainnet") == [items[-2]]
+    assert index.lookup(address) == [items[-2], items[-1], items[1]]
+    assert index.lookup("0xunknown") == []
+    assert index.lookup(items[2].address, "ethereum_mainnet") == []
+
+    # Results are copies
+    index.lookup(items[4].address)[0].categories.append("cex")
+    assert index.lookup(items[4].address) == [items[4]]
+
+
+def test_lookup_many(items):
+    index = LabelIndex(items)
+    keys = [(None, items[5].address), ("bitcoin_mainnet", "0xunknown")]
+    assert index.lookup_many(keys) == {keys[0]: [items[5]], keys[1]: []}
+
+
+@pytest.mark.parametrize(
+    "filter, supported",
+    [
+        ({"address": "0x1"}, True),
+        ({"address": "0x1", "chain": "ethereum_mainnet"}, True),
+        ({"chain": "ethereum_mainnet"}, False),
+        ({"address": "0x1", "submitted_by": "tester"}, False),
+        ({}, False),
+    ],
+)
+def test_search(filter, supported):
+    assert (LabelIndex([]).search(filter) is not None) == supported
+
+
+def test_from_database(database, items):
+    db.upload_chainmeta(items)
+    index = LabelIndex.from_database(page_size=7)
+    assert len(index) == len(items)
+    indexed = [i for a in sorted({i.address for i in items}) for i in index.lookup(a)]
+
+    def _key(item):
+        return item.chain, item.address, item.source, item.submitted_by
+
+    assert sorted(indexed, key=_key) == list(db.search_chainmeta())
+
+
+def test_label_lookup_is_abstract():
+    with pytest.raises(TypeError):
+        LabelLookup()  # type: ignore[abstract]
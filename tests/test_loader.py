@@ -0,0 +1,84 @@
+# Copyright 2023 The chainmetareader Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import pathlib
+
+import pytest
+from jsonschema import ValidationError
+
+import chainmeta_reader
+
+data_folder = pathlib.Path(__file__).parent.resolve().joinpath("data")
+
+
+@pytest.mark.parametrize(
+    "input_file",
+    [
+        "chaintool_sample.json",
+        "coinbase_sample.json",
+        "goplus_sample.json",
+        "messari_sample.json",
+    ],
+)
+@pytest.mark.parametrize("chunk_size", [1, 7, 1000])
+def test_iter_load(input_file: str, chunk_size: int):
+    with open(data_folder.joinpath(input_file)) as f:
+        metadata = chainmeta_reader.load(f, artifact_base_path=data_folder)
+    with open(data_folder.joinpath(input_file)) as f:
+        items = list(
+            chainmeta_reader.iter_load(
+                f, artifact_base_path=data_folder, chunk_size=chunk_size
+            )
+        )
+    assert items == metadata["chainmetadata"]["artifact"]
+
+
+@pytest.mark.parametrize(
+    "input_file",
+    [
+        "chaintool_invalid_sample.json",
+        "coinbase_invalid_sample.json",
+    ],
+)
+def test_iter_load_invalid(input_file: str):
+    with open(data_folder.joinpath(input_file)) as f:
+        items = chainmeta_reader.iter_load(f, artifact_base_path=data_folder)
+        with pytest.raises(ValidationError):
+            list(items)
+
+
+@pytest.mark.parametrize(
+    "input_file",
+    [
+        "chaintool_sample.json",
+        "coinbase_sample.json",
+    ],
+)
+@pytest.mark.parametrize("chunk_bytes", [4096, 64 << 20])
+def test_load_workers(input_file: str, chunk_bytes: int):
+    with open(data_folder.joinpath(input_file)) as f:
+        expected = chainmeta_reader.load(f, artifact_base_path=data_folder)
+    with open(data_folder.joinpath(input_file)) as f:
+        metadata = chainmeta_reader.load(
+            f, artifact_base_path=data_folder, workers=2, chunk_bytes=chunk_bytes
+        )
+    assert metadata == expected
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_load_workers_invalid(workers: int, caplog):
+    with open(data_folder.joinpath("coinbase_invalid_sample.json")) as f:
+        with pytest.raises(ValidationError) as e:
+            chainmeta_reader.load(f, artifact_base_path=data_folder, workers=workers)
+    assert e.value.artifact == "file:///artifacts/coinbase_invalid_artifact_sample.json"
+    # Reported once, by the caller handling the error
+    assert not caplog.records
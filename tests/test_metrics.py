@@ -0,0 +1,91 @@
+# Copyright 2023 The chainmetareader Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import pathlib
+
+import pytest
+
+import chainmeta_reader
+from chainmeta_reader import db, metrics
+from tests.conftest import make_items
+
+data_folder = pathlib.Path(__file__).parent.resolve().joinpath("data")
+
+
+@pytest.fixture
+def enabled():
+    metrics.reset()
+    metrics.enable()
+    yield
+    metrics.enable(False)
+    metrics.reset()
+
+
+def test_disabled():
+    metrics.reset()
+    with metrics.timed("stage"):
+        pass
+    metrics.count("event")
+    assert metrics.snapshot() == metrics.MetricsSnapshot({}, {})
+
+
+def test_timed(enabled):
+    for seconds in [0.0001, 0.001, 0.003, 100.0]:
+        metrics.observe("stage", seconds)
+    with pytest.raises(ValueError):
+        with metrics.timed("failing"):
+            raise ValueError()
+    metrics.count("event", 2)
+    metrics.count("event")
+
+    s = metrics.snapshot()
+    assert s.counters == {"event": 3}
+    assert s.stages["failing"].count == 1
+    stage = s.stages["stage"]
+    assert (stage.count, stage.max) == (4, 100.0)
+    assert stage.mean == pytest.approx(100.0041 / 4)
+    assert sum(stage.buckets) == 4
+    assert stage.buckets[0] == stage.buckets[1] == stage.buckets[3] == 1
+    assert stage.buckets[-1] == 1
+
+
+def test_render_prometheus(enabled):
+    metrics.observe("stage", 0.001)
+    metrics.observe("stage", 0.2)
+    metrics.count("event", 5)
+
+    lines = metrics.render_prometheus().splitlines()
+    assert "# TYPE chainmeta_stage_seconds histogram" in lines
+    assert 'chainmeta_stage_seconds_bucket{stage="stage",le="0.0005"} 0' in lines
+    assert 'chainmeta_stage_seconds_bucket{stage="stage",le="0.001"} 1' in lines
+    assert 'chainmeta_stage_seconds_bucket{stage="stage",le="0.25"} 2' in lines
+    assert 'chainmeta_stage_seconds_bucket{stage="stage",le="+Inf"} 2' in lines
+    assert 'chainmeta_stage_seconds_count{stage="stage"} 2' in lines
+    assert 'chainmeta_events_total{event="event"} 5' in lines
+
+
+def test_pipeline_stages(enabled, database):
+    with open(data_folder.joinpath("chaintool_sample.json")) as f:
+        metadata = chainmeta_reader.load(f, artifact_base_path=data_folder)
+    items = metadata["chainmetadata"]["artifact"]
+
+    db.upload_chainmeta(make_items(10), batch_size=5, max_concurrency=1)
+    list(db.search_chainmeta(page_size=4))
+
+    s = metrics.snapshot()
+    for stage in ["validates", "artifact_load", "artifact_validate", "translate"]:
+        assert s.stages[stage].count == 1
+    assert s.stages["flatten"].count == s.stages["upload_batch"].count == 2
+    assert s.stages["search_page"].count == 3
+    assert s.counters["items_loaded"] == len(items)
+    assert s.counters["records_inserted"] == len(db.flatten_values(make_items(10)))
+    assert s.counters["items_searched"] == 10
@@ -0,0 +1,144 @@
+# Copyright 2023 The chainmetareader Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import asyncio
+import json
+from dataclasses import asdict
+from typing import Dict, Tuple
+from urllib.parse import urlsplit
+
+import pytest
+
+from api_server import data
+from chainmeta_reader import db
+from tests.conftest import make_items
+
+try:
+    from fastapi import FastAPI
+
+    from api_server import query
+except (ImportError, ValueError):
+    # The pinned fastapi does not import on Python 3.11 and later
+    pytest.skip("fastapi is not available", allow_module_level=True)
+
+
+@pytest.fixture
+def app(database, monkeypatch):
+    db.upload_chainmeta(make_items(20))
+    db.add_api_token("valid", "tester")
+    data.token_verifier.invalidate()
+    monkeypatch.setattr(db, "_async_session_maker", None)
+
+    app = FastAPI()
+    app.include_router(query.router)
+    return app
+
+
+def get(app, url: str, headers: Dict[str, str]) -> Tuple[int, Dict[str, str], str]:
+    """Send a GET request to an ASGI app, and return the status, headers and
+    body of its response."""
+
+    url_parts = urlsplit(url)
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": url_parts.path,
+        "raw_path": url_parts.path.encode(),
+        "query_string": url_parts.query.encode(),
+        "root_path": "",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+        "client": ("testclient", 50000),
+        "server": ("testserver", 80),
+    }
+    messages = []
+
+    async def _get():
+        requested = False
+        sent = asyncio.Event()
+
+        async def receive():
+            nonlocal requested
+            if not requested:
+                requested = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            # Streaming responses listen for the client to disconnect
+            await sent.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            messages.append(message)
+            if message["type"] == "http.response.body" and not message.get("more_body"):
+                sent.set()
+
+        await app(scope, receive, send)
+
+    asyncio.run(_get())
+    start = messages[0]
+    response_headers = {k.decode(): v.decode() for k, v in start["headers"]}
+    body = b"".join(m.get("body", b"") for m in messages[1:]).decode()
+    return start["status"], response_headers, body
+
+
+def expected_ndjson(address: str) -> str:
+    return "".join(
+        json.dumps(asdict(i)) + "\n" for i in make_items(20) if i.address == address
+    )
+
+
+def test_search(app):
+    address = make_items(20)[3].address
+    status, headers, body = get(app, f"/v1/query?address={address}", {"token": "valid"})
+    assert status == 200
+    assert headers["content-type"] == "application/json"
+    assert json.loads(body) == [asdict(make_items(20)[3])]
+
+
+def test_search_stream(app):
+    address = make_items(20)[3].address
+    status, headers, body = get(
+        app, f"/v1/query?address={address}&stream=true", {"token": "valid"}
+    )
+    assert status == 200
+    assert headers["content-type"].startswith("application/x-ndjson")
+    assert body == expected_ndjson(address)
+
+
+@pytest.mark.parametrize(
+    "accept",
+    [
+        "application/x-ndjson",
+        "application/x-ndjson; charset=utf-8",
+        "application/json;q=0.5, application/x-ndjson",
+    ],
+)
+def test_search_accept_ndjson(app, accept: str):
+    address = make_items(20)[3].address
+    status, headers, body = get(
+        app, f"/v1/query?address={address}", {"token": "valid", "accept": accept}
+    )
+    assert status == 200
+    assert headers["content-type"].startswith("application/x-ndjson")
+    assert body == expected_ndjson(address)
+
+
+@pytest.mark.parametrize("accept", ["application/json", "*/*"])
+def test_search_accept_json(app, accept: str):
+    address = make_items(20)[3].address
+    status, headers, body = get(
+        app, f"/v1/query?address={address}", {"token": "valid", "accept": accept}
+    )
+    assert status == 200
+    assert headers["content-type"] == "application/json"
+    assert json.loads(body) == [asdict(make_items(20)[3])]
@@ -0,0 +1,159 @@
+# Copyright 2023 The chainmetareader Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import importlib
+import pathlib
+import subprocess
+import sys
+from importlib.metadata import EntryPoint
+from types import SimpleNamespace
+
+import pytest
+
+from chainmeta_reader import schema
+from chainmeta_reader.constants import SchemaEntryPointGroup
+from chainmeta_reader.metadata import Translator
+from chainmeta_reader.validator import IValidator, JsonValidator
+
+chaintool_schema = next(
+    p for p, name in schema.contrib_schemas.items() if name == "chaintool"
+)
+
+# Loaded by the entry points of test_entry_points
+plugin = SimpleNamespace(
+    schema_path=["plugin_schema.json", "plugin_schema_v2.json"],
+    validator=IValidator(),
+    translator=Translator(),
+)
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """An empty registry, restored after the test."""
+
+    monkeypatch.setattr(schema, "schema_registry", {})
+    monkeypatch.setattr(schema, "_schema_loaders", {})
+    monkeypatch.setattr(schema, "_registry_loaded", False)
+    monkeypatch.setattr(schema, "_plugins_loaded", False)
+    monkeypatch.setattr(schema, "_entry_points", lambda: [])
+
+
+@pytest.mark.parametrize("path, name", schema.contrib_schemas.items())
+def test_contrib_schemas(path, name):
+    m = importlib.import_module(f"chainmeta_reader.contrib.{name}")
+    assert path in schema._schema_paths(m)
+    assert schema.resolve(path).translator is m.translator
+
+
+def test_resolve_imports_on_first_use():
+    # In a new interpreter, as the modules may be imported by other tests
+    statement = (
+        "import sys; from chainmeta_reader import schema, validator; "
+        f"assert schema.resolve({chaintool_schema!r}); "
+        # The validators of the common schema are not built
+        "assert 'common_artifact_validator' not in vars(validator); "
+        "print(' '.join(sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=pathlib.Path(__file__).parent.parent,
+    )
+    modules = result.stdout.split()
+
+    assert "chainmeta_reader.contrib.chaintool" in modules
+    assert "chainmeta_reader.contrib.messari" not in modules
+
+
+def test_resolve_caches(registry):
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return schema.Schema(IValidator(), Translator())
+
+    schema.register_lazy("lazy_schema.json", loader)
+    assert not calls
+
+    resolved = schema.resolve("lazy_schema.json")
+    assert schema.resolve("lazy_schema.json") is resolved
+    assert len(calls) == 1
+
+
+def test_resolve_raises_errors_of_loader(registry):
+    def loader():
+        raise ImportError("broken")
+
+    schema.register_lazy("broken_schema.json", loader)
+    with pytest.raises(ImportError):
+        schema.resolve("broken_schema.json")
+
+
+def test_register_duplicate(registry):
+    with pytest.raises(ValueError):
+        schema.register(chaintool_schema, schema.Schema(IValidator(), Translator()))
+    with pytest.raises(ValueError):
+        schema.register_lazy(
+            schema.common_schema_paths[0], lambda: schema.Schema(None, None)
+        )
+
+
+def test_entry_points(registry, monkeypatch, caplog):
+    entry_points = [
+        EntryPoint("plugin", "tests.test_schema:plugin", SchemaEntryPointGroup),
+        EntryPoint("missing", "tests.missing_plugin", SchemaEntryPointGroup),
+    ]
+    loads = []
+
+    def _entry_points():
+        loads.append(1)
+        return entry_points
+
+    monkeypatch.setattr(schema, "_entry_points", _entry_points)
+
+    # Known schemas do not load the plugins
+    assert schema.resolve(chaintool_schema)
+    assert not loads
+
+    for path in plugin.schema_path:
+        resolved = schema.resolve(path)
+        assert resolved.validator is plugin.validator
+        assert resolved.translator is plugin.translator
+    assert "Failed to load missing" in caplog.text
+
+    assert schema.resolve("unknown_schema.json") is None
+    assert len(loads) == 1
+
+
+def test_unlisted_contrib_modules(registry, monkeypatch):
+    monkeypatch.setattr(schema, "contrib_schemas", {chaintool_schema: "chaintool"})
+
+    m = importlib.import_module("chainmeta_reader.contrib.messari")
+    assert schema.resolve(m.schema_path).translator is m.translator
+
+
+def test_stale_contrib_schemas(registry, monkeypatch):
+    # A path of the table no contrib module declares any more
+    monkeypatch.setattr(schema, "contrib_schemas", {"old_schema.json": "chaintool"})
+
+    m = importlib.import_module("chainmeta_reader.contrib.chaintool")
+    assert schema.resolve(chaintool_schema).translator is m.translator
+    assert schema.resolve("unknown_schema.json") is None
+
+
+def test_json_validator_is_lazy(tmp_path):
+    v = JsonValidator(schema=tmp_path.joinpath("missing.json"))
+    assert "validator" not in vars(v)
+    with pytest.raises(FileNotFoundError):
+        v.validate({})
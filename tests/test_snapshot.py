@@ -0,0 +1,61 @@
+# Copyright 2023 The chainmetareader Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import multiprocessing
+
+import pytest
+
+from chainmeta_reader import db
+from chainmeta_reader.index import LabelIndex
+from chainmeta_reader.snapshot import LabelSnapshot, export_snapshot, write_snapshot
+from tests.conftest import make_items
+
+
+@pytest.mark.parametrize("n", [0, 1, 32])
+def test_snapshot(tmp_path, items, n):
+    items = items[-n:] if n else []
+    items[0:0] = make_items(1, submitted_by="éè")[:1] if n else []
+    path = tmp_path.joinpath("chainmeta.snap")
+    index = LabelIndex(items)
+    write_snapshot(path, index)
+
+    with LabelSnapshot(path) as snapshot:
+        assert len(snapshot) == len(index)
+        for address in {i.address for i in items} | {"0xunknown", ""}:
+            assert snapshot.lookup(address) == index.lookup(address)
+            for chain in ["bitcoin_mainnet", "ethereum_mainnet"]:
+                assert snapshot.lookup(address, chain) == index.lookup(address, chain)
+        keys = [(i.chain, i.address) for i in items] + [(None, "0xunknown")]
+        assert snapshot.lookup_many(keys) == index.lookup_many(keys)
+
+
+def test_invalid_snapshot(tmp_path):
+    path = tmp_path.joinpath("chainmeta.snap")
+    path.write_bytes(b"not a snapshot" * 100)
+    with pytest.raises(ValueError, match="not a chainmeta snapshot"):
+        LabelSnapshot(path)
+
+
+def _lookup(path, address):
+    with LabelSnapshot(path) as snapshot:
+        return snapshot.lookup(address)
+
+
+def test_export_snapshot(tmp_path, database, items):
+    db.upload_chainmeta(items)
+    path = tmp_path.joinpath("chainmeta.snap")
+    assert export_snapshot(path, page_size=7) == len(items)
+
+    index = LabelIndex.from_database()
+    with multiprocessing.get_context("spawn").Pool(2) as pool:
+        results = pool.starmap(_lookup, [(path, i.address) for i in items])
+    assert results == [index.lookup(i.address) for i in items]
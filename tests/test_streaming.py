@@ -0,0 +1,68 @@
+# Copyright 2023 The chainmetareader Authors. All rights reserved.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import json
+from dataclasses import asdict
+
+import pytest
+
+from api_server.streaming import accepts_ndjson, ndjson_chunks
+from chainmeta_reader.metadata import ChainmetaItem
+
+
+def make_items(n: int):
+    for i in range(n):
+        yield ChainmetaItem(
+            chain="ethereum_mainnet",
+            address=f"0x{i:040x}",
+            entity="binance",
+            name=None,
+            categories=["cex"],
+            source="ground_truth",
+            submitted_by="tester",
+            submitted_on="2023-04-04",
+        )
+
+
+@pytest.mark.parametrize("n,chunk_size", [(0, 10), (1, 10), (25, 10), (30, 10)])
+def test_ndjson_chunks(n: int, chunk_size: int):
+    chunks = list(ndjson_chunks(make_items(n), chunk_size=chunk_size))
+    assert len(chunks) == -(-n // chunk_size)
+
+    lines = "".join(chunks).splitlines()
+    assert [json.loads(line) for line in lines] == [asdict(i) for i in make_items(n)]
+
+
+def test_ndjson_chunks_is_lazy():
+    items = make_items(1_000_000_000)
+    first = next(ndjson_chunks(items, chunk_size=2))
+    assert first.count("\n") == 2
+
+
+@pytest.mark.parametrize(
+    "accept,expected",
+    [
+        (None, False),
+        ("", False),
+        ("application/json", False),
+        ("*/*", False),
+        ("application/x-ndjson", True),
+        ("Application/X-NDJSON", True),
+        ("application/x-ndjson; charset=utf-8", True),
+        ("application/json, application/x-ndjson;q=0.9", True),
+        ("text/html,application/x-ndjson ; charset=utf-8 , */*", True),
+        ("application/x-ndjson; q=0", False),
+        ("application/x-ndjson;q=0.0, application/json", False),
+    ],
+)
+def test_accepts_ndjson(accept, expected: bool):
+    assert accepts_ndjson(accept) is expected
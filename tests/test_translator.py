@@ -16,6 +16,8 @@ import pytest
 
 import chainmeta_reader
 from chainmeta_reader.contrib.chaintool import ChaintoolTranslator
+from chainmeta_reader.metadata import ChainmetaItem, ITranslator, Translator
+from chainmeta_reader.utils import Memo
 
 
 @pytest.mark.parametrize(
@@ -41,3 +43,130 @@ def test_chaintool_translator(input_file: str):
         # compare raw_metadata with raw_metadata2
         # Note: the values of the 'categories' and 'entity' fields may not be exactly the same
         assert len(list(raw_metadata)) == len(raw_metadata2)
+
+
+# Raw chaintool rows and their translation, with the normalizations of keys,
+# chains and categories
+chaintool_rows = [
+    {
+        "submitted_by": "Chaintool",
+        "address": "0xabc",
+        "chain": "ETH",
+        "entity": "Uniswap",
+        "entity_name": "Uniswap V2",
+        "categories": "Dapp,Exchange",
+        "source": "ground truth",
+        "tagged_on": "2023-04-04",
+    },
+    {
+        "submitted_by": "Chaintool",
+        "address": "1btc",
+        "chain": "BTC",
+        "entity": None,
+        "entity_name": "",
+        "categories": "Financial Services,High Risk",
+        "source": "ground truth",
+        "tagged_on": "2023-04-05",
+    },
+    {
+        "submitted_by": "Chaintool",
+        "address": "0xdef",
+        "chain": "polygon_mainnet",
+        "entity": "Binance.US",
+        "entity_name": "Hot Wallet 3",
+        "categories": "Law Enforcement",
+        "source": "Some-Source",
+        "tagged_on": "2023-04-06",
+    },
+]
+chaintool_items = [
+    ChainmetaItem(
+        chain="ethereum_mainnet",
+        address="0xabc",
+        entity="uniswap",
+        name="Uniswap V2",
+        categories=["dapp", "cex"],
+        source="ground_truth",
+        submitted_by="Chaintool",
+        submitted_on="2023-04-04",
+    ),
+    ChainmetaItem(
+        chain="bitcoin_mainnet",
+        address="1btc",
+        entity=None,
+        name="",
+        categories=["business_or_services", "high_risk"],
+        source="ground_truth",
+        submitted_by="Chaintool",
+        submitted_on="2023-04-05",
+    ),
+    ChainmetaItem(
+        chain="polygon_mainnet",
+        address="0xdef",
+        entity="binance_us",
+        name="Hot Wallet 3",
+        categories=["le"],
+        source="some_source",
+        submitted_by="Chaintool",
+        submitted_on="2023-04-06",
+    ),
+]
+
+
+def test_chaintool_batch():
+    translator = ChaintoolTranslator()
+
+    assert [translator.to_common_schema(r) for r in chaintool_rows] == chaintool_items
+    # Memoized values are reused by the following rows
+    rows = chaintool_rows * 3
+    assert translator.to_common_schema_batch(rows) == chaintool_items * 3
+    assert translator.to_common_schema_batch([]) == []
+
+
+def test_chaintool_batch_sample():
+    data_folder = pathlib.Path(__file__).parent.resolve().joinpath("data")
+    with open(data_folder.joinpath("chaintool_sample.json")) as f:
+        metadata = chainmeta_reader.load(f, artifact_base_path=data_folder)
+    rows = metadata["chainmetadata"]["raw_artifact"]
+    translator = ChaintoolTranslator()
+
+    expected = [translator.to_common_schema(r) for r in rows]
+    assert translator.to_common_schema_batch(rows) == expected
+    assert expected == metadata["chainmetadata"]["artifact"]
+
+
+def test_chaintool_batch_categories_not_shared():
+    row = chaintool_rows[0]
+    a, b = ChaintoolTranslator().to_common_schema_batch([row, row])
+
+    a.categories.append("dapp")
+    assert b.categories != a.categories
+
+
+def test_default_batch():
+    class UpperTranslator(ITranslator):
+        def to_common_schema(self, raw_metadata):
+            return raw_metadata.upper()
+
+    assert UpperTranslator().to_common_schema_batch(["a", "b"]) == ["A", "B"]
+
+
+def test_common_batch():
+    item = ChainmetaItem("bitcoin_mainnet", "1abc", None, None, [], "", "", "")
+    translator = Translator()
+
+    assert translator.to_common_schema_batch([item.__dict__]) == [item]
+
+
+@pytest.mark.parametrize("maxsize, stored", [(0, 0), (2, 2), (10, 3)])
+def test_memo(maxsize, stored):
+    calls = []
+
+    def double(x):
+        calls.append(x)
+        return 2 * x
+
+    memo = Memo(double, maxsize=maxsize)
+    assert [memo[x] for x in [1, 2, 3, 1, 2, 3]] == [2, 4, 6, 2, 4, 6]
+    assert len(memo) == stored
+    assert len(calls) == 6 - stored
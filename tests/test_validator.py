@@ -42,3 +42,47 @@ def test_validate(input_file: str, is_valid: bool):
             assert is_valid is False
         else:
             assert is_valid
+
+
+valid_item = {
+    "chain": "ethereum_mainnet",
+    "address": "0xf177aa7b0602f787f6f01c65f4b2e267336fd349",
+    "entity": "uniswap",
+    "name": "Uniswap V2: Hmf",
+    "categories": ["defi", "dex"],
+    "source": "ground_truth",
+    "submitted_by": "coinbase",
+    "submitted_on": "2022-09-21 00:00:00",
+}
+
+
+@pytest.mark.parametrize(
+    "changes,error_path",
+    [
+        ({}, None),
+        ({"entity": None, "name": None}, None),
+        ({"chain": "not_a_chain"}, [1, "chain"]),
+        ({"categories": ["defi", "not_a_category"]}, [1, "categories"]),
+        ({"categories": "defi"}, [1, "categories"]),
+        ({"source": None}, [1, "source"]),
+        ({"submitted_by": 1}, [1, "submitted_by"]),
+        ({"address": ...}, [1]),
+        ({"unexpected": "value"}, [1]),
+    ],
+)
+def test_compiled_validator(changes: dict, error_path):
+    from chainmeta_reader.validator import common_artifact_validator
+
+    item = {k: v for k, v in {**valid_item, **changes}.items() if v is not ...}
+    metadata = [valid_item, item, valid_item]
+
+    assert common_artifact_validator.compiled
+    errors = list(common_artifact_validator.iter_errors(metadata))
+    fallback_errors = list(common_artifact_validator.fallback.iter_errors(metadata))
+    assert len(errors) == len(fallback_errors)
+    if error_path is None:
+        assert not errors
+    else:
+        assert list(errors[0].path)[: len(error_path)] == error_path
+        with pytest.raises(ValidationError):
+            common_artifact_validator.validate(metadata)
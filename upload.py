@@ -18,7 +18,7 @@ from pathlib import Path
 
 import click
 
-from chainmeta_reader import load, upload_chainmeta
+from chainmeta_reader import iter_load, upload_chainmeta
 
 # Set logging level
 logging.basicConfig(level=logging.DEBUG)
@@ -29,8 +29,7 @@ logging.basicConfig(level=logging.DEBUG)
 def upload(filename: str):
     folder_path = Path(filename).resolve().parent
     with open(filename) as f:
-        metadata = load(f, artifact_base_path=folder_path)
-        common_metadata = metadata["chainmetadata"]["artifact"]
+        common_metadata = iter_load(f, artifact_base_path=folder_path)
         n = upload_chainmeta(common_metadata)
         click.echo(click.style(f"Added {n} items to database", fg="green"))
 